@@ -3,32 +3,60 @@ RAG Implementation - Main Entry Point
 A modular RAG pipeline using LangChain and ChromaDB Cloud
 """
 
+import argparse
+import threading
 from src.core.config import Config
-from src.core.database import check_collection_exists
+from src.core.database import backend_name, check_collection_exists
+from src.core.registry import configure_cpu_threads, warm_up
 from src.retrieval.vectorstore import get_vectorstore
 from src.ingestion.pipeline import run_ingestion
+from src.ingestion.watcher import watch_and_ingest
 from src.retrieval.search import run_retrieval
 from src.generation.rag import run_generation
 
 
-def main():
-    """Main entry point for the RAG pipeline"""
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="RAG Document Pipeline (LangChain + ChromaDB Cloud)")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted ingestion instead of starting over"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep the collection in sync with the docs directory as files change"
+    )
+    return parser.parse_args()
+
+
+def main(resume=False):
+    """
+    Main entry point for the RAG pipeline
+    
+    Args:
+        resume: Resume an interrupted ingestion from its checkpoint
+    """
     print("=" * 60)
-    print("🚀 RAG Document Pipeline (LangChain + ChromaDB Cloud)")
+    print(f"🚀 RAG Document Pipeline (LangChain + {backend_name()})")
     print("=" * 60 + "\n")
 
-    print("📡 Connecting to ChromaDB Cloud...")
+    print(f"📡 Connecting to {backend_name()}...")
     
     collection_name = Config.DEFAULT_COLLECTION
     vectorstore_exists = check_collection_exists(collection_name)
     
     if vectorstore_exists:
-        print(f"✅ Connected to ChromaDB Cloud")
+        print(f"✅ Connected to {backend_name()}")
         
         try:
             vectorstore = get_vectorstore(collection_name)
             doc_count = vectorstore._collection.count()
             print(f"📊 Collection '{collection_name}' contains {doc_count} documents\n")
+            if Config.WARM_UP:
+                # Runs while the menu waits for input
+                threading.Thread(target=warm_up, args=(collection_name,), daemon=True).start()
         except Exception as e:
             print(f"⚠️  Could not load collection: {e}")
             vectorstore_exists = False
@@ -37,7 +65,7 @@ def main():
 
     # Menu
     print("What would you like to do?")
-    print("1. Ingest documents (character/semantic chunking)")
+    print("1. Ingest documents (character/token-aware chunking)")
     print("2. Ingest documents (semantic chunking)")
     print("3. Ingest documents (agentic/LLM chunking)")
     print("4. Search documents (query the collection)")
@@ -55,18 +83,18 @@ def main():
     
     # Handle choices
     if choice == "1":
-        run_ingestion(chunking_method="character")
+        run_ingestion(chunking_method="character", resume=resume)
     
     elif choice == "2":
-        run_ingestion(chunking_method="semantic")
+        run_ingestion(chunking_method="semantic", resume=resume)
     
     elif choice == "3":
-        run_ingestion(chunking_method="agentic")
+        run_ingestion(chunking_method="agentic", resume=resume)
 
     ###########################################################################################################################
     elif choice == "4":
         if not vectorstore_exists:
-            print("❌ Collection not found on ChromaDB Cloud. Please run ingestion first (option 1, 2, or 3).")
+            print(f"❌ Collection not found on {backend_name()}. Please run ingestion first (option 1, 2, or 3).")
             return
         query = input("\n🔎 Enter your search query: ").strip()
         if query:
@@ -78,7 +106,7 @@ def main():
     ###########################################################################################################################    
     elif choice == "5":
         if not vectorstore_exists:
-            print("❌ Collection not found on ChromaDB Cloud. Please run ingestion first (option 1, 2, or 3).")
+            print(f"❌ Collection not found on {backend_name()}. Please run ingestion first (option 1, 2, or 3).")
             return
         run_retrieval(interactive=True, collection_name=COLLECTION_NAME)
     ###########################################################################################################################
@@ -86,7 +114,7 @@ def main():
     ###########################################################################################################################
     elif choice == "6":
         if not vectorstore_exists:
-            print("❌ Collection not found on ChromaDB Cloud. Please run ingestion first (option 1, 2, or 3).")
+            print(f"❌ Collection not found on {backend_name()}. Please run ingestion first (option 1, 2, or 3).")
             return
         # Get last used chunking method
         last_method = get_last_chunking_method()
@@ -128,7 +156,7 @@ def main():
         run_generation(interactive=True)
     
     elif choice == "8":
-        vectorstore = run_ingestion()
+        vectorstore = run_ingestion(resume=resume)
         if vectorstore:
             print("\n" + "="*60)
             print("Now starting interactive Q&A...")
@@ -143,5 +171,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    configure_cpu_threads()
+    if args.watch:
+        watch_and_ingest()
+    else:
+        main(resume=args.resume)
 
@@ -2,8 +2,11 @@
 Chunking strategies for document splitting
 """
 
-from src.chunking.semantic import chunk_documents_semantic
-from src.chunking.agentic import chunk_documents_agentic
+from contextlib import nullcontext
+from src.core.config import Config
+from src.chunking.semantic import chunk_documents_semantic, chunk_documents_semantic_pooled
+from src.chunking.agentic import AgenticRun, chunk_documents_agentic
+from src.chunking.recursive import chunk_documents_recursive
 
 
 def chunk_documents(documents, method="semantic", **kwargs):
@@ -12,27 +15,68 @@ def chunk_documents(documents, method="semantic", **kwargs):
     
     Args:
         documents: List of LangChain Document objects
-        method: Chunking method - "semantic" or "agentic"
+        method: Chunking method - "character", "semantic" or "agentic"
         **kwargs: Additional arguments for the chosen method
     
     Returns:
         list: List of chunked Document objects
     """
-    if method in ["character", "semantic"]:
-        # Character-based is deprecated, redirect to semantic
-        if method == "character":
-            print("ℹ️  Character-based chunking deprecated, using semantic chunking")
+    if method == "character":
+        return chunk_documents_recursive(documents, **kwargs)
+    
+    elif method == "semantic":
         return chunk_documents_semantic(documents, **kwargs)
     
     elif method == "agentic":
         return chunk_documents_agentic(documents, **kwargs)
     
     else:
-        raise ValueError(f"Unknown chunking method: {method}. Choose 'semantic' or 'agentic'")
+        raise ValueError(f"Unknown chunking method: {method}. Choose 'character', 'semantic' or 'agentic'")
+
+
+def ingestion_run(chunking_method):
+    """
+    State shared by every chunking call of one ingestion run
+    
+    Args:
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+    
+    Returns:
+        Context manager yielding an AgenticRun for agentic chunking (one rate
+        limiter and thread pool across documents), None otherwise
+    """
+    return AgenticRun() if chunking_method == "agentic" else nullcontext()
+
+
+def chunk_for_ingestion(docs, chunking_method, run=None):
+    """
+    Chunk documents for ingestion, reusing semantic sentence vectors if configured
+    
+    Args:
+        docs: List of LangChain Document objects
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        run: Optional state from ingestion_run(), shared across calls
+    
+    Returns:
+        tuple: (chunks, precomputed embeddings or None)
+    """
+    if chunking_method == "semantic" and Config.SEMANTIC_REUSE_EMBEDDINGS:
+        return chunk_documents_semantic_pooled(
+            docs,
+            refine=Config.SEMANTIC_POOLING_REFINE,
+            verify_sample=Config.SEMANTIC_POOLING_VERIFY_SAMPLE
+        )
+    if chunking_method == "agentic" and run is not None:
+        return chunk_documents_agentic(docs, run=run), None
+    return chunk_documents(docs, method=chunking_method), None
 
 
 __all__ = [
     "chunk_documents",
+    "chunk_for_ingestion",
+    "ingestion_run",
     "chunk_documents_semantic",
+    "chunk_documents_semantic_pooled",
     "chunk_documents_agentic",
+    "chunk_documents_recursive",
 ]
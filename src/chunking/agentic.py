@@ -2,35 +2,210 @@
 Agentic chunking strategy - uses LLM to decide split points
 """
 
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
 from src.core.config import Config
+from src.core.registry import get_or_create
+from src.utils.disk_cache import DiskCache
+from src.utils.rate_limit import RateLimiter
 
 
-def get_agentic_chunker(model=None, chunk_size_guideline=200):
+# Bump when a prompt changes so cached boundaries from the old prompt are ignored
+PROMPT_VERSIONS = {
+    "offsets": "offsets-v1",
+    "echo": "echo-v1",
+}
+
+
+class AgenticBoundaryCache:
+    """
+    Persistent cache of LLM-chosen chunk boundaries.
+    Keyed by (text hash, model, chunk size guideline, prompt version), so
+    unchanged content costs no LLM calls and changing the prompt or model
+    misses cleanly.
     """
-    Create an agentic chunker that uses LLM to decide boundaries
     
-    Args:
-        model: OpenRouter model to use (defaults to config)
-        chunk_size_guideline: Target chunk size guideline
+    def __init__(self, model=None, chunk_size_guideline=200, protocol=None):
+        protocol = protocol or Config.AGENTIC_PROTOCOL
+        self.prefix = f"{model or Config.DEFAULT_LLM_MODEL}|{chunk_size_guideline}|{PROMPT_VERSIONS[protocol]}"
+        # One connection per process, shared by every chunking call
+        path = os.path.join(Config.AGENTIC_CACHE_DIR, "boundaries.sqlite3")
+        self.store = get_or_create("agentic_cache", path, lambda: DiskCache(path))
+        self.hits = 0
+        self.misses = 0
     
-    Returns:
-        function: Agentic chunking function
-    """
+    def _key(self, text):
+        return f"{self.prefix}|{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+    
+    def get(self, text):
+        """Return cached boundary offsets (relative to text), or None"""
+        value = self.store.get(self._key(text))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+    
+    def set(self, text, boundaries):
+        """Store boundary offsets (relative to text)"""
+        self.store.set(self._key(text), json.dumps(boundaries).encode("utf-8"))
+    
+    def evict(self):
+        """Apply the configured size and age limits"""
+        return self.store.evict(
+            max_entries=Config.AGENTIC_CACHE_MAX_ENTRIES,
+            max_age=Config.AGENTIC_CACHE_MAX_AGE_DAYS * 86400
+        )
+
+
+def _get_chunking_llm(model=None, max_tokens=None):
+    """Create the OpenRouter chat model used for chunking"""
     if model is None:
         model = Config.DEFAULT_LLM_MODEL
     
-    llm = ChatOpenAI(
+    return ChatOpenAI(
         model=model,
         openai_api_key=Config.OPEN_ROUTER_API,
         openai_api_base="https://openrouter.ai/api/v1",
         temperature=0,
+        max_tokens=max_tokens,
         default_headers={
             "HTTP-Referer": "http://localhost:3000",
             "X-Title": "RAG Pipeline - Agentic Chunking"
         }
     )
+
+
+def get_sentence_starts(text):
+    """Character offsets where each sentence of text begins"""
+    starts = [0] + [match.end() for match in re.finditer(r"(?<=[.?!])\s+", text)]
+    return [offset for offset in starts if offset < len(text)]
+
+
+def parse_split_indices(content, sentence_count):
+    """
+    Parse and validate the sentence indices returned by the LLM
+    
+    Args:
+        content: Raw model response, expected to contain {"splits": [...]}
+        sentence_count: Number of sentences that were sent
+    
+    Returns:
+        list or None: Sorted, de-duplicated indices in 1..sentence_count-1,
+            or None if the response isn't usable
+    """
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    try:
+        values = json.loads(match.group(0))["splits"] if match else json.loads(content)
+    except (ValueError, KeyError, TypeError):
+        array = re.search(r"\[[\d\s,]*\]", content)
+        if not array:
+            return None
+        values = json.loads(array.group(0))
+    
+    # bool is an int subclass: [true, 3] is not a list of indices
+    if not isinstance(values, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return None
+    return sorted({v for v in values if 0 < v < sentence_count})
+
+
+def group_sentences_by_size(starts, chunk_size_guideline):
+    """Local fallback: start a new chunk whenever the guideline size is reached"""
+    indices = []
+    chunk_start = 0
+    for i, offset in enumerate(starts[1:], 1):
+        if offset - chunk_start >= chunk_size_guideline:
+            indices.append(i)
+            chunk_start = offset
+    return indices
+
+
+class FallbackBoundaries(list):
+    """Boundaries chosen locally because the LLM reply was unusable (never cached)"""
+
+
+def get_agentic_boundary_finder(model=None, chunk_size_guideline=200, protocol=None):
+    """
+    Create a function that asks the LLM where text should be split
+    
+    Args:
+        model: OpenRouter model to use (defaults to config)
+        chunk_size_guideline: Target chunk size guideline
+        protocol: "offsets" (LLM returns sentence indices as JSON) or
+            "echo" (LLM returns the full text with split markers)
+    
+    Returns:
+        function: Maps text to a list of chunk start offsets (excluding 0),
+            a FallbackBoundaries list when the LLM reply couldn't be used
+    """
+    protocol = protocol or Config.AGENTIC_PROTOCOL
+    
+    if protocol == "echo":
+        echo_chunker = get_agentic_chunker(model, chunk_size_guideline, protocol="echo")
+        return lambda text: find_chunk_boundaries(text, echo_chunker(text))
+    
+    llm = _get_chunking_llm(model, max_tokens=512)
+    
+    def find_boundaries(text):
+        """Ask the LLM for split points only and map them to offsets"""
+        starts = get_sentence_starts(text)
+        if len(starts) < 2:
+            return []
+        
+        ends = starts[1:] + [len(text)]
+        numbered = "\n".join(f"[{i}] {text[a:b].strip()}" for i, (a, b) in enumerate(zip(starts, ends)))
+        prompt = f"""
+You are a text chunking expert. The text below is split into numbered sentences.
+Decide where new chunks should begin.
+
+Rules:
+- Each chunk should be around {chunk_size_guideline} characters or less
+- Split at natural topic boundaries
+- Keep related information together
+
+Sentences:
+{numbered}
+
+Respond with JSON only, listing the sentence numbers that start a new chunk:
+{{"splits": [3, 7, 12]}}
+"""
+        
+        response = llm.invoke(prompt)
+        indices = parse_split_indices(response.content, len(starts))
+        if indices is None:
+            print("  ⚠️  Unusable split points from LLM, falling back to size-based splits")
+            return FallbackBoundaries(starts[i] for i in group_sentences_by_size(starts, chunk_size_guideline))
+        
+        return [starts[i] for i in indices]
+    
+    return find_boundaries
+
+
+def get_agentic_chunker(model=None, chunk_size_guideline=200, protocol=None):
+    """
+    Create an agentic chunker that uses LLM to decide boundaries
+    
+    Args:
+        model: OpenRouter model to use (defaults to config)
+        chunk_size_guideline: Target chunk size guideline
+        protocol: "offsets" or "echo" (defaults to config)
+    
+    Returns:
+        function: Agentic chunking function
+    """
+    protocol = protocol or Config.AGENTIC_PROTOCOL
+    
+    if protocol == "offsets":
+        find_boundaries = get_agentic_boundary_finder(model, chunk_size_guideline, protocol)
+        return lambda text: slice_at_boundaries(text, find_boundaries(text))
+    
+    llm = _get_chunking_llm(model)
     
     def agentic_chunk(text):
         """Split text using LLM to determine boundaries"""
@@ -59,7 +234,206 @@ Return the text with <<<SPLIT>>> markers where you want to split:
     return agentic_chunk
 
 
-def chunk_documents_agentic(documents, model=None, chunk_size_guideline=200):
+def split_into_windows(text, window_chars, overlap_chars):
+    """
+    Split text into overlapping windows that fit the model context
+    
+    Args:
+        text: Text to split
+        window_chars: Maximum characters per window
+        overlap_chars: Characters shared by consecutive windows
+    
+    Returns:
+        list: (start, end) character offsets of each window
+    """
+    windows = []
+    start = 0
+    
+    while True:
+        end = min(start + window_chars, len(text))
+        if end < len(text):
+            # Prefer ending a window on a line break, then on a space
+            cut = text.rfind("\n", start + window_chars // 2, end)
+            if cut == -1:
+                cut = text.rfind(" ", start + window_chars // 2, end)
+            if cut != -1:
+                end = cut
+        windows.append((start, end))
+        
+        if end >= len(text):
+            return windows
+        
+        next_start = max(end - overlap_chars, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+
+def find_chunk_boundaries(text, chunks):
+    """
+    Locate where each LLM-returned chunk starts in the original text
+    
+    Args:
+        text: Text that was sent to the LLM
+        chunks: Chunk strings returned by the LLM
+    
+    Returns:
+        list: Character offsets of chunk starts (excluding 0); chunks the
+            model rewrote so they can't be found are skipped
+    """
+    boundaries = []
+    cursor = 0
+    
+    for chunk in chunks:
+        probe = chunk.strip()[:40]
+        position = text.find(probe, cursor) if probe else -1
+        if position == -1:
+            continue
+        if position > 0:
+            boundaries.append(position)
+        cursor = position + len(probe)
+    
+    return boundaries
+
+
+def stitch_window_boundaries(windows, window_boundaries, min_gap):
+    """
+    Merge per-window boundaries into one boundary list for the document
+    
+    Each overlap region is split at its midpoint: boundaries before the
+    midpoint come from the earlier window, boundaries after it from the
+    later one. Where two windows place boundaries closer than min_gap on
+    either side of a seam, only the first is kept so no sliver chunks appear.
+    
+    Args:
+        windows: (start, end) offsets of each window
+        window_boundaries: Absolute boundary offsets found in each window
+        min_gap: Minimum distance between boundaries from different windows
+    
+    Returns:
+        list: Sorted absolute boundary offsets
+    """
+    boundaries = []
+    previous_window = None
+    for i, (start, end) in enumerate(windows):
+        low = start if i == 0 else (start + windows[i - 1][1]) // 2
+        high = end if i == len(windows) - 1 else (windows[i + 1][0] + end) // 2
+        
+        for boundary in sorted(b for b in window_boundaries[i] if low <= b < high):
+            crosses_seam = previous_window is not None and previous_window != i
+            if boundaries and crosses_seam and boundary - boundaries[-1] < min_gap:
+                continue
+            boundaries.append(boundary)
+            previous_window = i
+    
+    return boundaries
+
+
+def slice_at_boundaries(text, boundaries):
+    """Cut text at the given offsets, dropping empty pieces"""
+    edges = [0] + list(boundaries) + [len(text)]
+    pieces = (text[a:b].strip() for a, b in zip(edges, edges[1:]))
+    return [piece for piece in pieces if piece]
+
+
+class AgenticRun:
+    """
+    Rate limiter and thread pool shared by every document of one ingestion
+    run, so the RPM limit and the concurrency cap hold across documents
+    chunked one call at a time (and from several threads)
+    """
+    
+    def __init__(self):
+        self.limiter = RateLimiter(Config.AGENTIC_REQUESTS_PER_MINUTE)
+        self.executor = ThreadPoolExecutor(max_workers=Config.AGENTIC_MAX_CONCURRENCY)
+    
+    def close(self):
+        self.executor.shutdown()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _chunk_window(find_boundaries, limiter, text, start, end, cache=None):
+    """Chunk one window, retrying it on its own if the LLM call fails"""
+    window_text = text[start:end]
+    
+    if cache is not None:
+        cached = cache.get(window_text)
+        if cached is not None:
+            return [start + offset for offset in cached]
+    
+    for attempt in range(Config.AGENTIC_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            boundaries = find_boundaries(window_text)
+            # A fallback for a bad reply isn't pinned: the next run asks the LLM again
+            if cache is not None and not isinstance(boundaries, FallbackBoundaries):
+                cache.set(window_text, boundaries)
+            return [start + offset for offset in boundaries]
+        except Exception as e:
+            if attempt == Config.AGENTIC_MAX_RETRIES:
+                print(f"  ⚠️  Window {start}-{end} failed ({e}), falling back to paragraph breaks")
+                return [start + match.end() for match in re.finditer(r"\n\s*\n", window_text)]
+            delay = 2 ** attempt
+            print(f"  ⚠️  Window {start}-{end} failed ({e}), retrying in {delay}s...")
+            time.sleep(delay)
+
+
+def chunk_documents_agentic_windowed(documents, find_boundaries, chunk_size_guideline=200, cache=None, run=None):
+    """
+    Chunk documents by sending overlapping windows to the LLM concurrently
+    
+    Args:
+        documents: List of LangChain Document objects
+        find_boundaries: Function returned by get_agentic_boundary_finder
+        chunk_size_guideline: Target chunk size guideline
+        cache: Optional AgenticBoundaryCache
+        run: Optional AgenticRun shared with other calls (a private one
+            is used otherwise)
+    
+    Returns:
+        list: List of chunked Document objects (exact slices of the source)
+    """
+    if run is None:
+        with AgenticRun() as run:
+            return chunk_documents_agentic_windowed(documents, find_boundaries, chunk_size_guideline, cache, run)
+    
+    doc_windows = [
+        split_into_windows(doc.page_content, Config.AGENTIC_WINDOW_CHARS, Config.AGENTIC_WINDOW_OVERLAP)
+        for doc in documents
+    ]
+    total_windows = sum(len(windows) for windows in doc_windows)
+    print(f"🤖 Agentic chunking: {total_windows} windows across {len(documents)} documents "
+          f"({Config.AGENTIC_MAX_CONCURRENCY} concurrent, {Config.AGENTIC_REQUESTS_PER_MINUTE} RPM)...")
+    
+    results = {}
+    futures = {
+        run.executor.submit(_chunk_window, find_boundaries, run.limiter, doc.page_content, start, end, cache): (d, w)
+        for d, (doc, windows) in enumerate(zip(documents, doc_windows))
+        for w, (start, end) in enumerate(windows)
+    }
+    for done, future in enumerate(as_completed(futures), 1):
+        results[futures[future]] = future.result()
+        print(f"  🔄 Chunked window {done}/{total_windows}", flush=True)
+    
+    all_chunks = []
+    for d, (doc, windows) in enumerate(zip(documents, doc_windows)):
+        boundaries = stitch_window_boundaries(
+            windows,
+            [results[(d, w)] for w in range(len(windows))],
+            min_gap=chunk_size_guideline // 4
+        )
+        for chunk_text in slice_at_boundaries(doc.page_content, boundaries):
+            all_chunks.append(Document(page_content=chunk_text, metadata=doc.metadata.copy()))
+    
+    print(f"📄 Agentic chunking: {len(all_chunks)} chunks (guideline: ~{chunk_size_guideline} chars)")
+    return all_chunks
+
+
+def chunk_documents_agentic(documents, model=None, chunk_size_guideline=200, windowed=None, run=None):
     """
     Chunk documents using agentic splitting
     
@@ -67,23 +441,40 @@ def chunk_documents_agentic(documents, model=None, chunk_size_guideline=200):
         documents: List of LangChain Document objects
         model: OpenRouter model to use
         chunk_size_guideline: Target chunk size guideline
+        windowed: Chunk overlapping windows in parallel (defaults to config)
+        run: Optional AgenticRun whose rate limiter and thread pool are
+            shared with the other documents of an ingestion run
     
     Returns:
         list: List of chunked Document objects
     """
-    agentic_chunker = get_agentic_chunker(model, chunk_size_guideline)
+    if windowed is None:
+        windowed = Config.AGENTIC_WINDOWED
     
-    all_chunks = []
-    for doc in documents:
-        print(f"🤖 Agentic chunking: {doc.metadata.get('source', 'Unknown')}...")
-        text_chunks = agentic_chunker(doc.page_content)
+    find_boundaries = get_agentic_boundary_finder(model, chunk_size_guideline)
+    cache = AgenticBoundaryCache(model, chunk_size_guideline) if Config.AGENTIC_CACHE_ENABLED else None
+    
+    if windowed:
+        all_chunks = chunk_documents_agentic_windowed(documents, find_boundaries, chunk_size_guideline, cache, run)
+    else:
+        limiter = run.limiter if run is not None else RateLimiter(Config.AGENTIC_REQUESTS_PER_MINUTE)
+        all_chunks = []
+        for doc in documents:
+            print(f"🤖 Agentic chunking: {doc.metadata.get('source', 'Unknown')}...")
+            text = doc.page_content
+            boundaries = _chunk_window(find_boundaries, limiter, text, 0, len(text), cache)
+            
+            for chunk_text in slice_at_boundaries(text, boundaries):
+                chunk_doc = Document(
+                    page_content=chunk_text,
+                    metadata=doc.metadata.copy()
+                )
+                all_chunks.append(chunk_doc)
         
-        for chunk_text in text_chunks:
-            chunk_doc = Document(
-                page_content=chunk_text,
-                metadata=doc.metadata.copy()
-            )
-            all_chunks.append(chunk_doc)
+        print(f"📄 Agentic chunking: {len(all_chunks)} chunks (guideline: ~{chunk_size_guideline} chars)")
+    
+    if cache is not None:
+        cache.evict()
+        print(f"💾 Agentic chunking cache: {cache.hits} hits, {cache.misses} misses")
     
-    print(f"📄 Agentic chunking: {len(all_chunks)} chunks (guideline: ~{chunk_size_guideline} chars)")
     return all_chunks
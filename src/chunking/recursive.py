@@ -0,0 +1,217 @@
+"""
+Recursive token-aware chunking strategy - fast, deterministic, no network
+"""
+
+import time
+import tiktoken
+from langchain_core.documents import Document
+from src.core.config import Config
+from src.core.registry import get_or_create
+
+
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+EMBEDDING_MODELS = {
+    "openai": "text-embedding-3-small",
+}
+
+# Rough English average, used when no BPE vocabulary is available
+CHARS_PER_TOKEN = 4
+
+
+class CharacterEncoding:
+    """
+    Character-based stand-in for a tiktoken encoding. Each "token" is a run
+    of CHARS_PER_TOKEN characters, so lengths approximate BPE counts without
+    needing the vocabulary file.
+    """
+    
+    name = "characters"
+    
+    def encode_ordinary(self, text):
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+    
+    def decode_with_offsets(self, tokens):
+        offsets = [i * CHARS_PER_TOKEN for i in range(len(tokens))]
+        return "".join(tokens), offsets
+
+
+def get_token_encoding(encoding_name=None):
+    """
+    Get the tiktoken encoding matching the configured embedding model
+    
+    tiktoken downloads its BPE files on first use. When that fails (offline
+    machine, no cached vocabulary) this falls back to CharacterEncoding, which
+    measures length as characters / CHARS_PER_TOKEN. The result is kept for
+    the process, so the download is only attempted once.
+    
+    Args:
+        encoding_name: Explicit tiktoken encoding name (optional)
+    
+    Returns:
+        tiktoken.Encoding or CharacterEncoding: Tokenizer used to measure chunk length
+    """
+    return get_or_create(
+        "tokenizer", (encoding_name, Config.EMBEDDING_PROVIDER), lambda: _load_token_encoding(encoding_name)
+    )
+
+
+def _load_token_encoding(encoding_name):
+    try:
+        if encoding_name:
+            return tiktoken.get_encoding(encoding_name)
+        
+        model = EMBEDDING_MODELS.get(Config.EMBEDDING_PROVIDER)
+        if model:
+            return tiktoken.encoding_for_model(model)
+        # Other providers don't ship a tiktoken vocabulary; cl100k is a close proxy
+        return tiktoken.get_encoding("cl100k_base")
+    except (ConnectionError, OSError) as e:
+        print(f"⚠️  tiktoken vocabulary unavailable ({type(e).__name__}); "
+              f"measuring chunks as {CHARS_PER_TOKEN} characters per token")
+        return CharacterEncoding()
+
+
+class RecursiveTokenSplitter:
+    """
+    Splits text recursively on structural separators (paragraphs, lines,
+    sentences, words) until every piece fits the token budget, then merges
+    neighbouring pieces back up to chunk_size tokens with chunk_overlap
+    tokens of overlap. Every chunk keeps its character offsets in the source.
+    """
+    
+    def __init__(self, chunk_size=None, chunk_overlap=None, encoding=None, separators=None):
+        self.chunk_size = chunk_size or Config.DEFAULT_CHUNK_SIZE
+        self.chunk_overlap = chunk_overlap if chunk_overlap is not None else Config.DEFAULT_CHUNK_OVERLAP
+        self.encoding = encoding or get_token_encoding()
+        self.separators = separators or SEPARATORS
+        
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+    
+    def _count(self, text, spans):
+        """Token count for each (start, end) span"""
+        encode = self.encoding.encode_ordinary
+        return [len(encode(text[start:end])) for start, end in spans]
+    
+    def _hard_split(self, text, start, end):
+        """Split a separator-free span at token boundaries"""
+        tokens = self.encoding.encode_ordinary(text[start:end])
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        cuts = [start + offsets[i] for i in range(self.chunk_size, len(tokens), self.chunk_size)]
+        edges = [start] + cuts + [end]
+        return [(a, b, min(self.chunk_size, len(tokens))) for a, b in zip(edges, edges[1:]) if b > a]
+    
+    def _split(self, text, start, end, separators):
+        """Recursively split text[start:end] into (start, end, tokens) pieces that fit"""
+        separator = next((sep for sep in separators if sep == "" or sep in text[start:end]), "")
+        if separator == "":
+            return self._hard_split(text, start, end)
+        
+        spans = []
+        position = start
+        while position < end:
+            found = text.find(separator, position, end)
+            # Keep the separator at the end of the piece so offsets stay contiguous
+            piece_end = end if found == -1 else found + len(separator)
+            spans.append((position, piece_end))
+            position = piece_end
+        
+        remaining = separators[separators.index(separator) + 1:]
+        pieces = []
+        for (piece_start, piece_end), count in zip(spans, self._count(text, spans)):
+            if count <= self.chunk_size:
+                pieces.append((piece_start, piece_end, count))
+            else:
+                pieces.extend(self._split(text, piece_start, piece_end, remaining))
+        return pieces
+    
+    def _tail(self, text, start, end, count):
+        """Last `count` tokens of text[start:end] as a (start, end, tokens) piece"""
+        tokens = self.encoding.encode_ordinary(text[start:end])
+        if count >= len(tokens):
+            return (start, end, len(tokens))
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        return (start + offsets[len(tokens) - count], end, count)
+    
+    def _merge(self, text, pieces):
+        """Greedily merge contiguous pieces into (start, end) chunks with overlap"""
+        chunks = []
+        window = []
+        window_tokens = 0
+        
+        for piece in pieces:
+            if window and window_tokens + piece[2] > self.chunk_size:
+                chunks.append((window[0][0], window[-1][1]))
+                # Carry trailing pieces forward as overlap
+                budget = min(self.chunk_overlap, self.chunk_size - piece[2])
+                dropped = None
+                while window and window_tokens > budget:
+                    dropped = window.pop(0)
+                    window_tokens -= dropped[2]
+                # A piece longer than the overlap still contributes its token tail
+                if dropped and window_tokens < budget:
+                    tail = self._tail(text, dropped[0], dropped[1], budget - window_tokens)
+                    window.insert(0, tail)
+                    window_tokens += tail[2]
+            window.append(piece)
+            window_tokens += piece[2]
+        
+        if window:
+            chunks.append((window[0][0], window[-1][1]))
+        return chunks
+    
+    def split_text_with_offsets(self, text):
+        """
+        Split text into token-bounded chunks
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            list: (chunk text, start offset, end offset) tuples
+        """
+        if not text:
+            return []
+        
+        results = []
+        for start, end in self._merge(text, self._split(text, 0, len(text), self.separators)):
+            chunk = text[start:end]
+            stripped = chunk.strip()
+            if stripped:
+                offset = start + (len(chunk) - len(chunk.lstrip()))
+                results.append((stripped, offset, offset + len(stripped)))
+        return results
+    
+    def split_text(self, text):
+        """Split text into token-bounded chunk strings"""
+        return [chunk for chunk, _, _ in self.split_text_with_offsets(text)]
+
+
+def chunk_documents_recursive(documents, chunk_size=None, chunk_overlap=None):
+    """
+    Chunk documents with the recursive token-aware splitter
+    
+    Args:
+        documents: List of LangChain Document objects
+        chunk_size: Maximum tokens per chunk (defaults to config)
+        chunk_overlap: Tokens shared by consecutive chunks (defaults to config)
+    
+    Returns:
+        list: List of chunked Document objects with "start_index"/"end_index" metadata
+    """
+    splitter = RecursiveTokenSplitter(chunk_size, chunk_overlap)
+    start = time.perf_counter()
+    
+    all_chunks = []
+    for doc in documents:
+        for chunk_text, chunk_start, chunk_end in splitter.split_text_with_offsets(doc.page_content):
+            metadata = doc.metadata.copy()
+            metadata["start_index"] = chunk_start
+            metadata["end_index"] = chunk_end
+            all_chunks.append(Document(page_content=chunk_text, metadata=metadata))
+    
+    print(f"📄 Character chunking: {len(all_chunks)} chunks "
+          f"(size: {splitter.chunk_size} tokens, overlap: {splitter.chunk_overlap}) "
+          f"in {time.perf_counter() - start:.2f}s")
+    return all_chunks
@@ -2,8 +2,298 @@
 Semantic chunking strategy - groups text by meaning
 """
 
+import codecs
+import hashlib
+import io
+import os
+import random
+import re
+import numpy as np
+from langchain_core.documents import Document
 from langchain_experimental.text_splitter import SemanticChunker
-from src.embeddings.models import LightweightEmbeddings
+from src.core.config import Config
+from src.embeddings.cache import cache_embeddings, print_cache_stats
+from src.embeddings.models import LightweightEmbeddings, get_embedding_model, get_local_embedding_model
+from src.ingestion.manifest import file_snapshot
+
+
+class PooledSemanticChunker(SemanticChunker):
+    """
+    SemanticChunker that keeps the sentence-window embeddings computed for
+    breakpoint detection and pools them into one vector per chunk, so the
+    chunks never need to be embedded a second time.
+    
+    split_text_with_vectors() follows SemanticChunker.split_text of
+    langchain-experimental 0.4.1 (pinned in requirements.txt) branch for
+    branch - gradient thresholds, number_of_chunks and min_chunk_size - and
+    returns the same chunks; re-check it when upgrading that package.
+    """
+    
+    def __init__(self, *args, refine=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refine = refine
+    
+    def _pool(self, group):
+        """Length-weighted mean of sentence-window vectors, L2-normalized"""
+        # Edge windows straddle the neighbouring chunks; refinement drops them
+        if self.refine and len(group) > 2:
+            group = group[1:-1]
+        
+        vectors = np.asarray([d["combined_sentence_embedding"] for d in group], dtype=np.float32)
+        weights = np.asarray([max(len(d["sentence"]), 1) for d in group], dtype=np.float32)
+        pooled = weights @ vectors / weights.sum()
+        norm = np.linalg.norm(pooled)
+        return (pooled / norm if norm else pooled).tolist()
+    
+    def split_text_with_vectors(self, text):
+        """
+        Split text and return a pooled embedding for every chunk
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            tuple: (list of chunk strings, list of chunk vectors)
+        """
+        single_sentences_list = self._get_single_sentences_list(text)
+        
+        # Too few distances for a percentile (or a gradient): one chunk per sentence
+        if len(single_sentences_list) == 1 or (
+            self.breakpoint_threshold_type == "gradient" and len(single_sentences_list) == 2
+        ):
+            return single_sentences_list, self.embeddings.embed_documents(single_sentences_list)
+        
+        distances, sentences = self._calculate_sentence_distances(single_sentences_list)
+        if self.number_of_chunks is not None:
+            threshold = self._threshold_from_clusters(distances)
+            breakpoint_array = distances
+        else:
+            threshold, breakpoint_array = self._calculate_breakpoint_threshold(distances)
+        breakpoints = [i for i, x in enumerate(breakpoint_array) if x > threshold]
+        
+        chunks, vectors = [], []
+        start_index = 0
+        for end_index in breakpoints:
+            group = sentences[start_index:end_index + 1]
+            combined_text = " ".join(d["sentence"] for d in group)
+            # A chunk below min_chunk_size is carried into the next one
+            if self.min_chunk_size is not None and len(combined_text) < self.min_chunk_size:
+                continue
+            chunks.append(combined_text)
+            vectors.append(self._pool(group))
+            start_index = end_index + 1
+        
+        if start_index < len(sentences):
+            group = sentences[start_index:]
+            chunks.append(" ".join(d["sentence"] for d in group))
+            vectors.append(self._pool(group))
+        
+        return chunks, vectors
+
+
+class _DistanceSketch:
+    """
+    Streaming summary of cosine distances: a fixed-bin histogram over the
+    [0, 2] distance range for quantiles plus running moments for the mean
+    and standard deviation. Memory is constant however many distances are seen.
+    """
+    
+    def __init__(self, bins=4096):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+    
+    def update(self, distances):
+        if not len(distances):
+            return
+        index = np.clip((distances * (self.bins / 2.0)).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+        self.n += len(distances)
+        self.total += float(distances.sum(dtype=np.float64))
+        self.total_sq += float(np.square(distances, dtype=np.float64).sum())
+    
+    def quantile(self, q):
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, q * self.n))
+        return (min(index, self.bins - 1) + 0.5) * 2.0 / self.bins
+    
+    def threshold(self, threshold_type, amount):
+        mean = self.total / self.n
+        if threshold_type == "percentile":
+            return self.quantile(amount / 100)
+        if threshold_type == "standard_deviation":
+            return mean + amount * max(self.total_sq / self.n - mean * mean, 0.0) ** 0.5
+        if threshold_type == "interquartile":
+            return mean + amount * (self.quantile(0.75) - self.quantile(0.25))
+        raise ValueError(f"Unsupported breakpoint_threshold_type for streaming: {threshold_type}")
+
+
+class StreamingSemanticChunker:
+    """
+    Semantic chunker for very large documents.
+    
+    Sentences are streamed from the input and embedded in bounded windows;
+    adjacent cosine distances are computed with vectorized NumPy on float32
+    arrays and compared against a breakpoint threshold maintained
+    incrementally over every distance seen so far. Chunks are yielded as soon
+    as they close, so peak memory is bounded by the window size rather than
+    the document size. A chunk's text is the exact source slice between its
+    start and end offsets, separators included.
+    """
+    
+    def __init__(self, embeddings, breakpoint_threshold_type="percentile", breakpoint_threshold_amount=70,
+                 buffer_size=1, window_size=256, max_chunk_chars=None,
+                 sentence_split_regex=r"(?<=[.?!])\s+"):
+        self.embeddings = embeddings
+        self.breakpoint_threshold_type = breakpoint_threshold_type
+        self.breakpoint_threshold_amount = breakpoint_threshold_amount
+        self.buffer_size = buffer_size
+        self.window_size = window_size
+        self.max_chunk_chars = max_chunk_chars
+        self.sentence_pattern = re.compile(sentence_split_regex)
+    
+    def iter_sentences(self, blocks):
+        """
+        Split a stream of text blocks into sentences
+        
+        Args:
+            blocks: Iterable of text pieces (e.g. [text] or a file read in blocks)
+        
+        Yields:
+            tuple: (sentence, start offset, end offset, separator text
+                between the previous sentence and this one)
+        """
+        pending, offset, gap = "", 0, ""
+        for block in blocks:
+            pending += block
+            last = 0
+            for match in self.sentence_pattern.finditer(pending):
+                # A separator touching the end of the buffer may continue in the next block
+                if match.end() == len(pending):
+                    break
+                if match.start() > last:
+                    yield pending[last:match.start()], offset + last, offset + match.start(), gap
+                    gap = ""
+                gap += pending[match.start():match.end()]
+                last = match.end()
+            pending = pending[last:]
+            offset += last
+        
+        if pending.strip():
+            yield pending, offset, offset + len(pending), gap
+    
+    def _embed_window(self, window, before, after):
+        """Embed each window sentence together with its buffer neighbours"""
+        texts = [sentence[0] for sentence in before + window + after]
+        first = len(before)
+        combined = [
+            " ".join(texts[max(0, i - self.buffer_size):i + self.buffer_size + 1])
+            for i in range(first, first + len(window))
+        ]
+        vectors = np.asarray(self.embeddings.embed_documents(combined), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def _chunk(self, sentences, vector_sum, weight):
+        # Re-inserting the separators makes the text equal source[start:end]
+        text = sentences[0][0] + "".join(gap + sentence for sentence, _, _, gap in sentences[1:])
+        vector = vector_sum / weight
+        return {
+            "text": text,
+            "start": sentences[0][1],
+            "end": sentences[-1][2],
+            "vector": (vector / max(np.linalg.norm(vector), 1e-12)).tolist(),
+        }
+    
+    def split_stream(self, blocks):
+        """
+        Split a stream of text into semantic chunks
+        
+        Args:
+            blocks: Iterable of text pieces
+        
+        Yields:
+            dict: Chunk with "text", "start"/"end" character offsets and a
+                pooled "vector" (length-weighted mean of its sentence windows)
+        """
+        sketch = _DistanceSketch()
+        previous_vector = None
+        current, vector_sum, weight = [], None, 0.0
+        context, buffer = [], []
+        sentences = self.iter_sentences(blocks)
+        
+        def windows():
+            nonlocal context, buffer
+            for sentence in sentences:
+                buffer.append(sentence)
+                # Hold back buffer_size sentences as look-ahead for the window's last sentence
+                if len(buffer) >= self.window_size + self.buffer_size:
+                    window = buffer[:self.window_size]
+                    yield window, context, buffer[self.window_size:self.window_size + self.buffer_size]
+                    context = (context + window)[-self.buffer_size:] if self.buffer_size else []
+                    buffer = buffer[self.window_size:]
+            if buffer:
+                yield buffer, context, []
+        
+        for window, before, after in windows():
+            vectors = self._embed_window(window, before, after)
+            
+            # distances[j] is the distance from the previous sentence into window[j]
+            stacked = vectors if previous_vector is None else np.vstack([previous_vector, vectors])
+            distances = 1.0 - np.einsum("ij,ij->i", stacked[:-1], stacked[1:])
+            if previous_vector is None:
+                distances = np.concatenate([[0.0], distances]).astype(np.float32)
+                sketch.update(distances[1:])
+            else:
+                sketch.update(distances)
+            
+            threshold = sketch.threshold(self.breakpoint_threshold_type, self.breakpoint_threshold_amount) if sketch.n else None
+            lengths = np.fromiter((max(len(s[0]), 1) for s in window), dtype=np.float32, count=len(window))
+            breaks = distances > threshold if threshold is not None else np.zeros(len(window), dtype=bool)
+            
+            for j, sentence in enumerate(window):
+                too_long = (
+                    self.max_chunk_chars is not None and current
+                    and sentence[2] - current[0][1] > self.max_chunk_chars
+                )
+                if current and (breaks[j] or too_long):
+                    yield self._chunk(current, vector_sum, weight)
+                    current, vector_sum, weight = [], None, 0.0
+                
+                current.append(sentence)
+                contribution = lengths[j] * vectors[j]
+                vector_sum = contribution if vector_sum is None else vector_sum + contribution
+                weight += float(lengths[j])
+            
+            previous_vector = vectors[-1:]
+        
+        if current:
+            yield self._chunk(current, vector_sum, weight)
+    
+    def split_text(self, text):
+        """Split a string, yielding chunk dicts"""
+        return self.split_stream([text])
+    
+    def split_file(self, path, block_size=1 << 20, digest=None):
+        """
+        Split a UTF-8 file read in fixed-size blocks, yielding chunk dicts
+        
+        Newlines are translated like a text-mode read. If given, `digest`
+        (a hashlib object) is updated with the raw bytes as they are read.
+        """
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+        
+        def blocks():
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(block_size), b""):
+                    if digest is not None:
+                        digest.update(block)
+                    yield decoder.decode(block)
+            yield decoder.decode(b"", final=True)
+        
+        yield from self.split_stream(block for block in blocks() if block)
 
 
 def get_semantic_splitter(breakpoint_threshold_type="percentile", breakpoint_threshold=70):
@@ -17,7 +307,13 @@ def get_semantic_splitter(breakpoint_threshold_type="percentile", breakpoint_thr
     Returns:
         SemanticChunker: Configured semantic splitter
     """
-    embeddings = LightweightEmbeddings(model="embeddinggemma-300m", batch_size=16)
+    if Config.SEMANTIC_EMBEDDING_PROVIDER == "local":
+        embeddings = cache_embeddings(get_local_embedding_model(), "local")
+    else:
+        embeddings = cache_embeddings(
+            LightweightEmbeddings(model="embeddinggemma-300m", batch_size=16),
+            "lightweight"
+        )
     
     return SemanticChunker(
         embeddings=embeddings,
@@ -26,7 +322,8 @@ def get_semantic_splitter(breakpoint_threshold_type="percentile", breakpoint_thr
     )
 
 
-def chunk_documents_semantic(documents, breakpoint_threshold_type="percentile", breakpoint_threshold=70):
+def chunk_documents_semantic(documents, breakpoint_threshold_type="percentile", breakpoint_threshold=70,
+                             streaming=None):
     """
     Chunk documents using semantic splitting
     
@@ -34,11 +331,177 @@ def chunk_documents_semantic(documents, breakpoint_threshold_type="percentile",
         documents: List of LangChain Document objects
         breakpoint_threshold_type: "percentile" or "standard_deviation"
         breakpoint_threshold: Threshold value
+        streaming: Use the windowed streaming chunker (defaults to config)
     
     Returns:
         list: List of chunked Document objects
     """
+    if streaming is None:
+        streaming = Config.SEMANTIC_STREAMING
+    
+    if streaming:
+        chunks = list(iter_semantic_chunks(documents, breakpoint_threshold_type, breakpoint_threshold))
+        print(f"📄 Semantic chunking (streaming): {len(chunks)} chunks "
+              f"(threshold: {breakpoint_threshold_type}={breakpoint_threshold})")
+        return chunks
+    
     splitter = get_semantic_splitter(breakpoint_threshold_type, breakpoint_threshold)
     chunks = splitter.split_documents(documents)
     print(f"📄 Semantic chunking: {len(chunks)} chunks (threshold: {breakpoint_threshold_type}={breakpoint_threshold})")
+    print_cache_stats(splitter.embeddings, "Chunking embedding cache")
     return chunks
+
+
+def get_streaming_semantic_chunker(breakpoint_threshold_type="percentile", breakpoint_threshold=70,
+                                   window_size=None):
+    """
+    Create a streaming semantic chunker on the semantic chunking embeddings
+    
+    Args:
+        breakpoint_threshold_type: "percentile", "standard_deviation" or "interquartile"
+        breakpoint_threshold: Threshold value
+        window_size: Sentences embedded per window (defaults to config)
+    
+    Returns:
+        StreamingSemanticChunker: Configured streaming chunker
+    """
+    splitter = get_semantic_splitter(breakpoint_threshold_type, breakpoint_threshold)
+    return StreamingSemanticChunker(
+        embeddings=splitter.embeddings,
+        breakpoint_threshold_type=breakpoint_threshold_type,
+        breakpoint_threshold_amount=breakpoint_threshold,
+        window_size=window_size or Config.SEMANTIC_STREAMING_WINDOW
+    )
+
+
+def _chunk_document(chunk, metadata):
+    metadata = dict(metadata)
+    metadata["start_index"] = chunk["start"]
+    metadata["end_index"] = chunk["end"]
+    return Document(page_content=chunk["text"], metadata=metadata)
+
+
+def iter_semantic_chunks(documents, breakpoint_threshold_type="percentile", breakpoint_threshold=70,
+                         window_size=None):
+    """
+    Lazily chunk documents with the streaming semantic chunker
+    
+    Args:
+        documents: Iterable of LangChain Document objects
+        breakpoint_threshold_type: "percentile", "standard_deviation" or "interquartile"
+        breakpoint_threshold: Threshold value
+        window_size: Sentences embedded per window (defaults to config)
+    
+    Yields:
+        Document: Chunk with its character offsets in "start_index"/"end_index" metadata
+    """
+    streaming = get_streaming_semantic_chunker(breakpoint_threshold_type, breakpoint_threshold, window_size)
+    for doc in documents:
+        for chunk in streaming.split_text(doc.page_content):
+            yield _chunk_document(chunk, doc.metadata)
+    
+    print_cache_stats(streaming.embeddings, "Chunking embedding cache")
+
+
+def iter_semantic_file_chunks(paths, breakpoint_threshold_type="percentile", breakpoint_threshold=70,
+                              window_size=None, snapshots=None):
+    """
+    Lazily chunk text files with the streaming semantic chunker
+    
+    Files are read in blocks and never loaded whole, so peak memory is
+    bounded by the embedding window rather than the file size.
+    
+    Args:
+        paths: Iterable of UTF-8 text file paths
+        breakpoint_threshold_type: "percentile", "standard_deviation" or "interquartile"
+        breakpoint_threshold: Threshold value
+        window_size: Sentences embedded per window (defaults to config)
+        snapshots: Optional dict filled with path -> file_snapshot() of the
+            content read, once a file has been read to the end
+    
+    Yields:
+        Document: Chunk with "source" and its character offsets in
+            "start_index"/"end_index" metadata
+    """
+    streaming = get_streaming_semantic_chunker(breakpoint_threshold_type, breakpoint_threshold, window_size)
+    for path in paths:
+        stat, digest = os.stat(path), hashlib.sha256()
+        for chunk in streaming.split_file(path, digest=digest):
+            yield _chunk_document(chunk, {"source": path})
+        if snapshots is not None:
+            snapshots[path] = file_snapshot(digest.hexdigest(), stat)
+
+
+def compare_pooled_vectors(embeddings, chunks, vectors, sample_size=20):
+    """
+    Report how close pooled chunk vectors are to directly computed ones
+    
+    Args:
+        embeddings: Embedding model used for the direct comparison
+        chunks: List of chunked Document objects
+        vectors: Pooled vectors aligned with chunks
+        sample_size: Number of chunks to embed directly
+    
+    Returns:
+        dict: Mean and minimum cosine similarity over the sample
+    """
+    sample = random.Random(0).sample(range(len(chunks)), min(sample_size, len(chunks)))
+    if not sample:
+        return {"mean_similarity": 0.0, "min_similarity": 0.0, "sample_size": 0}
+    
+    direct = np.asarray(embeddings.embed_documents([chunks[i].page_content for i in sample]), dtype=np.float32)
+    pooled = np.asarray([vectors[i] for i in sample], dtype=np.float32)
+    direct /= np.linalg.norm(direct, axis=1, keepdims=True)
+    pooled /= np.linalg.norm(pooled, axis=1, keepdims=True)
+    similarities = np.sum(direct * pooled, axis=1)
+    
+    report = {
+        "mean_similarity": round(float(similarities.mean()), 4),
+        "min_similarity": round(float(similarities.min()), 4),
+        "sample_size": len(sample),
+    }
+    print(f"🔬 Pooled vs direct embeddings ({report['sample_size']} chunks): "
+          f"mean cosine {report['mean_similarity']}, min {report['min_similarity']}")
+    return report
+
+
+def chunk_documents_semantic_pooled(documents, breakpoint_threshold_type="percentile", breakpoint_threshold=70,
+                                    refine=False, verify_sample=0):
+    """
+    Chunk documents semantically with the configured embedding model and
+    reuse its sentence embeddings as the chunk vectors
+    
+    Args:
+        documents: List of LangChain Document objects
+        breakpoint_threshold_type: "percentile" or "standard_deviation"
+        breakpoint_threshold: Threshold value
+        refine: Drop boundary-straddling sentence windows when pooling
+        verify_sample: If > 0, embed this many chunks directly and report
+            how close the pooled vectors come to them
+    
+    Returns:
+        tuple: (list of chunked Document objects, list of chunk vectors)
+    """
+    embeddings = get_embedding_model()
+    splitter = PooledSemanticChunker(
+        embeddings=embeddings,
+        breakpoint_threshold_type=breakpoint_threshold_type,
+        breakpoint_threshold_amount=breakpoint_threshold,
+        refine=refine
+    )
+    
+    chunks, vectors = [], []
+    for doc in documents:
+        texts, doc_vectors = splitter.split_text_with_vectors(doc.page_content)
+        for text, vector in zip(texts, doc_vectors):
+            chunks.append(Document(page_content=text, metadata=doc.metadata.copy()))
+            vectors.append(vector)
+    
+    print(f"📄 Semantic chunking (pooled vectors): {len(chunks)} chunks "
+          f"(threshold: {breakpoint_threshold_type}={breakpoint_threshold})")
+    print_cache_stats(embeddings, "Chunking embedding cache")
+    
+    if verify_sample:
+        compare_pooled_vectors(embeddings, chunks, vectors, verify_sample)
+    
+    return chunks, vectors
@@ -0,0 +1,195 @@
+"""
+Collection aliases - a logical collection name points at one versioned physical collection
+"""
+
+import json
+import re
+import time
+import uuid
+from src.core.config import Config
+from src.core.registry import get_or_create
+
+_VERSION_SUFFIX = re.compile(r"__v(\d+)$")
+
+# Generations of a record kept in the alias collection. A writer working from
+# one this old would be long stale; older ones are deleted after each write.
+_GENERATIONS_KEPT = 16
+
+
+class AliasConflictError(RuntimeError):
+    """Another process changed the alias record since it was loaded"""
+
+
+def version_name(collection_name, revision):
+    """Physical collection name of one version, e.g. rag-documents__v17"""
+    return f"{collection_name}__v{revision}"
+
+
+def logical_name(physical_name):
+    """Strip the version suffix from a physical collection name"""
+    return _VERSION_SUFFIX.sub("", physical_name)
+
+
+def _alias_collection():
+    """The collection holding every alias record, in the configured backend (never sharded)"""
+    from src.core.database import get_backend_client
+    
+    client = get_backend_client()
+    return get_or_create(
+        "alias_collection",
+        (id(client), Config.ALIAS_COLLECTION),
+        lambda: client.get_or_create_collection(name=Config.ALIAS_COLLECTION)
+    )
+
+
+class AliasRecord:
+    """
+    Which physical collection a logical name currently resolves to, the
+    version being built (if any) and every version that may still exist.
+    
+    Records are stored in the vector store itself (ALIAS_COLLECTION), so
+    every process using the same ChromaDB Cloud database - or local index -
+    sees the same target. Each save adds the next generation of the record
+    under its own ID ("<name>@<generation>") with add(), which never
+    replaces an existing ID: of two writers that loaded the same generation,
+    only the first one's save lands and the other gets AliasConflictError
+    (compare-and-set). Readers use the highest generation.
+    
+    A logical name without a record resolves to itself (collections built
+    before versioning keep working until their first rebuild).
+    """
+    
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.generation = 0
+        self.target = collection_name
+        self.revision = 0
+        self.building = None
+        self.versions = [collection_name]
+    
+    @classmethod
+    def load(cls, collection_name):
+        """Load the record for a logical collection (a pass-through one if none exists)"""
+        record = cls(collection_name)
+        stored = _alias_collection().get(where={"alias": collection_name}, include=["documents", "metadatas"])
+        if stored["ids"]:
+            generation, document = max(
+                (metadata["generation"], document)
+                for metadata, document in zip(stored["metadatas"], stored["documents"])
+            )
+            data = json.loads(document)
+            record.generation = generation
+            record.target = data["target"]
+            record.revision = data["revision"]
+            record.building = data.get("building")
+            record.versions = data.get("versions", [record.target])
+        return record
+    
+    def save(self):
+        """
+        Write the next generation of the record if nobody else has
+        
+        Raises:
+            AliasConflictError: The record changed since it was loaded
+        """
+        generation = self.generation + 1
+        record_id = f"{self.collection_name}@{generation}"
+        writer = uuid.uuid4().hex
+        collection = _alias_collection()
+        collection.add(
+            ids=[record_id],
+            embeddings=[[1.0]],
+            metadatas=[{"alias": self.collection_name, "generation": generation}],
+            documents=[json.dumps({
+                "writer": writer,
+                "target": self.target,
+                "revision": self.revision,
+                "building": self.building,
+                "versions": self.versions,
+            })]
+        )
+        stored = collection.get(ids=[record_id], include=["documents"])
+        if not stored["ids"] or json.loads(stored["documents"][0]).get("writer") != writer:
+            raise AliasConflictError(
+                f"Alias '{self.collection_name}' was changed by another process; reload it and retry"
+            )
+        self.generation = generation
+        _remember(self.collection_name, self.target)
+        
+        if generation > _GENERATIONS_KEPT:
+            collection.delete(where={"$and": [
+                {"alias": self.collection_name},
+                {"generation": {"$lte": generation - _GENERATIONS_KEPT}},
+            ]})
+    
+    def start_build(self):
+        """
+        Reserve the physical name for the next version
+        
+        Returns:
+            str: Name of the collection to build
+        """
+        self.building = version_name(self.collection_name, self.revision + 1)
+        if self.building not in self.versions:
+            self.versions.append(self.building)
+        self.save()
+        return self.building
+    
+    def switch(self, physical_name):
+        """Point the alias at a completed version"""
+        self.target = physical_name
+        match = _VERSION_SUFFIX.search(physical_name)
+        self.revision = int(match.group(1)) if match else self.revision + 1
+        self.building = None
+        self.save()
+    
+    def retired(self, keep):
+        """
+        Versions that can be garbage-collected
+        
+        Args:
+            keep: How many versions before the current one to keep (for
+                rollback and for readers that resolved the alias earlier)
+        
+        Returns:
+            list: Physical collection names, oldest first
+        """
+        previous = [name for name in self.versions if name not in (self.target, self.building)]
+        return previous[:max(0, len(previous) - keep)]
+    
+    def forget(self, physical_names):
+        """Drop deleted versions from the record"""
+        self.versions = [name for name in self.versions if name not in set(physical_names)]
+        self.save()
+
+
+def _resolved(collection_name):
+    """This process's cached resolution of an alias: {"target", "expires"}"""
+    return get_or_create("alias_target", (Config.VECTOR_BACKEND, Config.ALIAS_COLLECTION, collection_name), dict)
+
+
+def _remember(collection_name, target):
+    _resolved(collection_name).update(target=target, expires=time.monotonic() + Config.ALIAS_CACHE_SECONDS)
+
+
+def resolve_collection(collection_name):
+    """
+    Physical collection a logical name currently points at
+    
+    Query sessions resolve the alias on every search; the answer is reused
+    for ALIAS_CACHE_SECONDS instead of asking the vector store each time.
+    Old versions outlive a switch (COLLECTION_VERSIONS_KEPT), so a slightly
+    stale target is still queryable.
+    
+    Args:
+        collection_name: Logical (or already physical) collection name
+    
+    Returns:
+        str: Physical collection name
+    """
+    if _VERSION_SUFFIX.search(collection_name):
+        return collection_name
+    cached = _resolved(collection_name)
+    if cached.get("expires", 0) < time.monotonic():
+        _remember(collection_name, AliasRecord.load(collection_name).target)
+    return cached["target"]
@@ -12,6 +12,20 @@ load_dotenv()
 class Config:
     """Configuration class for RAG pipeline"""
     
+    # Vector store backend: "chroma" (ChromaDB Cloud) or "local" (embedded
+    # index on disk - memory-mapped vectors, exact or HNSW search, no network)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+    LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", ".cache/index")
+    LOCAL_INDEX_HNSW = os.getenv("LOCAL_INDEX_HNSW", "false").lower() == "true"  # needs hnswlib
+    LOCAL_INDEX_HNSW_MIN_ITEMS = 50000  # smaller collections always use exact search
+    LOCAL_INDEX_HNSW_EF = 64
+    
+    # Sharding: new collections are hash-partitioned by chunk ID over this many
+    # physical collections and queried concurrently (1 = no sharding)
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+    # Once this has passed and one shard has answered, slower shards are left out of a query
+    SHARD_TIMEOUT_SECONDS = float(os.getenv("SHARD_TIMEOUT_SECONDS", "5"))
+    
     # ChromaDB Cloud Configuration
     CHROMA_DATABASE = os.getenv("CHROMA_DATABASE", "rag-learn")
     CHROMA_TENANT = os.getenv("CHROMA_TENANT")
@@ -27,20 +41,163 @@ class Config:
     OPEN_ROUTER_API = os.getenv("OPEN_ROUTER_API")
     
     # Embedding settings
-    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")  # "openai" or "google"
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")  # "openai", "google" or "local"
+    SEMANTIC_EMBEDDING_PROVIDER = os.getenv("SEMANTIC_EMBEDDING_PROVIDER", "lightweight")  # "lightweight" or "local"
+    
+    # Embedding cache
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+    EMBEDDING_CACHE_MEMORY_ITEMS = 10000
+    
+    # Lightweight (chunking) embedding API
+    LIGHTWEIGHT_EMBEDDING_CONCURRENCY = int(os.getenv("LIGHTWEIGHT_EMBEDDING_CONCURRENCY", "4"))
+    LIGHTWEIGHT_EMBEDDING_MAX_BATCH_CHARS = 8000
+    LIGHTWEIGHT_EMBEDDING_MAX_RETRIES = 5
+    
+    # Local CPU embedding model
+    LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    LOCAL_EMBEDDING_BACKEND = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch")  # "torch" or "onnx"
+    LOCAL_EMBEDDING_BATCH_SIZE = 64
+    LOCAL_EMBEDDING_MAX_BATCH_CHARS = 64000
+    LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", str(os.cpu_count() or 1)))
     
     # Default settings
     DEFAULT_COLLECTION = "rag-documents"
     DOCS_DIRECTORY = "docs"
     
-    # Chunking defaults
+    # Incremental ingestion: only re-process files whose content changed (opt-in)
+    INCREMENTAL_INGESTION = os.getenv("INCREMENTAL_INGESTION", "false").lower() == "true"
+    MANIFEST_DIRECTORY = os.getenv("MANIFEST_DIRECTORY", ".cache/manifests")
+    
+    # Watch mode: ingest files as they change (bursts end after a quiet period)
+    WATCH_DEBOUNCE_MS = int(os.getenv("WATCH_DEBOUNCE_MS", "1600"))
+    WATCH_RETRY_SECONDS = 5  # failed batches are retried after this long without events
+    
+    # Streaming ingestion: load -> chunk -> embed -> upsert stages overlap,
+    # connected by bounded queues (memory stays proportional to queue depth; opt-in)
+    STREAMING_INGESTION = os.getenv("STREAMING_INGESTION", "false").lower() == "true"
+    INGESTION_QUEUE_DEPTH = 8
+    INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "64"))
+    INGESTION_LOAD_WORKERS = 2
+    INGESTION_CHUNK_WORKERS = int(os.getenv("INGESTION_CHUNK_WORKERS", "2"))  # threads, when INGESTION_WORKERS is 1
+    INGESTION_EMBED_WORKERS = int(os.getenv("INGESTION_EMBED_WORKERS", "4"))
+    INGESTION_UPSERT_WORKERS = 2
+    
+    # Parallel loading + chunking across processes (1 = in-process)
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "1"))
+    INGESTION_GROUP_BYTES = 1024 * 1024  # small files are batched into tasks of about this size
+    
+    # Document store: chunks are byte-offset records over memory-mapped source
+    # files and their text is only decoded when something reads it (opt-in)
+    DOCSTORE_ENABLED = os.getenv("DOCSTORE_ENABLED", "false").lower() == "true"
+    # "false" leaves chunk text out of Chroma; results are re-read from the local files
+    DOCSTORE_STORE_TEXT = os.getenv("DOCSTORE_STORE_TEXT", "true").lower() == "true"
+    
+    # Batched upserts: retried with backoff and checkpointed so an
+    # interrupted rebuild can be resumed (capped at the server's max batch size)
+    UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "256"))
+    UPSERT_MAX_RETRIES = 5
+    UPSERT_CHECKPOINT_DIR = os.getenv("UPSERT_CHECKPOINT_DIR", ".cache/checkpoints")
+    
+    # Blue/green rebuilds: a full rebuild writes a new "<name>__v<N>" collection
+    # and switches the alias once it's complete
+    # Alias records live in the vector store itself, so every reader sees the same target
+    ALIAS_COLLECTION = os.getenv("ALIAS_COLLECTION", "collection-aliases")
+    ALIAS_CACHE_SECONDS = 5  # how long a query session may keep using a resolved alias
+    COLLECTION_VERSIONS_KEPT = 1  # previous versions kept after a switch (rollback, in-flight readers)
+    
+    # Dedup stage: drop exact and near-duplicate chunks (MinHash-LSH) before embedding (opt-in)
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))  # estimated Jaccard similarity
+    DEDUP_NUM_PERM = 128
+    DEDUP_BANDS = 32
+    DEDUP_SHINGLE_SIZE = 5
+    
+    # Chunking defaults (character chunking sizes are in embedding-model tokens)
     DEFAULT_CHUNK_SIZE = 500
     DEFAULT_CHUNK_OVERLAP = 50
     DEFAULT_CHUNKING_METHOD = "semantic"
     
+    # Semantic chunking: stream sentences through bounded embedding windows,
+    # reading files in blocks during ingestion (chunks differ from the default chunker's)
+    SEMANTIC_STREAMING = os.getenv("SEMANTIC_STREAMING", "false").lower() == "true"
+    SEMANTIC_STREAMING_WINDOW = 256
+    
+    # Semantic chunking: reuse the configured embedding model's sentence
+    # vectors as chunk vectors instead of embedding every chunk again
+    SEMANTIC_REUSE_EMBEDDINGS = os.getenv("SEMANTIC_REUSE_EMBEDDINGS", "false").lower() == "true"
+    SEMANTIC_POOLING_REFINE = False
+    SEMANTIC_POOLING_VERIFY_SAMPLE = int(os.getenv("SEMANTIC_POOLING_VERIFY_SAMPLE", "0"))
+    
+    # Agentic chunking: "echo" (LLM returns the text with split markers, the
+    # original prompt) or "offsets" (LLM returns sentence numbers only - far
+    # fewer output tokens; opt in). Either way chunks are cut from the source
+    # text at the boundaries the LLM chose.
+    AGENTIC_PROTOCOL = os.getenv("AGENTIC_PROTOCOL", "echo")
+    
+    # Agentic chunking: send each document whole (default), or as overlapping
+    # windows chunked concurrently (opt in; needed for documents longer than
+    # the model context)
+    AGENTIC_WINDOWED = os.getenv("AGENTIC_WINDOWED", "false").lower() == "true"
+    AGENTIC_WINDOW_CHARS = 12000
+    AGENTIC_WINDOW_OVERLAP = 1000
+    AGENTIC_MAX_CONCURRENCY = int(os.getenv("AGENTIC_MAX_CONCURRENCY", "4"))
+    AGENTIC_REQUESTS_PER_MINUTE = int(os.getenv("AGENTIC_REQUESTS_PER_MINUTE", "20"))
+    AGENTIC_MAX_RETRIES = 3
+    
+    # Agentic chunking: persistent cache of LLM-chosen boundaries
+    AGENTIC_CACHE_ENABLED = os.getenv("AGENTIC_CACHE_ENABLED", "true").lower() == "true"
+    AGENTIC_CACHE_DIR = os.getenv("AGENTIC_CACHE_DIR", ".cache/agentic")
+    AGENTIC_CACHE_MAX_ENTRIES = 50000
+    AGENTIC_CACHE_MAX_AGE_DAYS = 30
+    
+    # Open vector store, embedding and LLM connections in the background at startup
+    WARM_UP = os.getenv("WARM_UP", "true").lower() == "true"
+    
     # Retrieval defaults
     DEFAULT_TOP_K = 5
     
+    # Lexical (BM25) index written next to each collection at ingest time
+    LEXICAL_INDEX_ENABLED = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+    LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", ".cache/lexical")
+    LEXICAL_MERGE_FACTOR = 8  # segments of one size merged into the next tier
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    
+    # Search mode: "vector" or "hybrid" (BM25 and vector search run concurrently,
+    # merged with reciprocal rank fusion; collections without a lexical index use vector)
+    SEARCH_MODE = os.getenv("SEARCH_MODE", "vector")
+    HYBRID_CANDIDATES = 20  # results taken from each retriever before fusion
+    HYBRID_RRF_K = 60
+    
+    # Diversity: fetch MMR_FETCH_K candidates with their embeddings in the same
+    # request and pick the top-k locally by maximal marginal relevance (off by
+    # default: it changes the order of results)
+    DIVERSITY_ENABLED = os.getenv("DIVERSITY_ENABLED", "false").lower() == "true"
+    MMR_FETCH_K = 20
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))  # 1 = relevance only, 0 = diversity only
+    MAX_CHUNKS_PER_SOURCE = int(os.getenv("MAX_CHUNKS_PER_SOURCE", "0"))  # 0 = no cap
+    
+    # Re-ranking: a CPU cross-encoder re-orders the top candidates, within a
+    # latency budget (what doesn't fit keeps its retrieval order)
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_BACKEND = os.getenv("RERANK_BACKEND", "torch")  # "torch" or "onnx"
+    RERANK_TOP_N = 20
+    RERANK_MAX_TOKENS = 256  # per (query, chunk) pair
+    RERANK_BATCH_SIZE = 4  # pairs scored between budget checks
+    RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+    
+    # Query result cache: repeated questions skip the query embedding and the
+    # vector store round-trip (entries are dropped when the collection changes)
+    QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+    QUERY_CACHE_MAX_ENTRIES = 1024
+    QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "600"))
+    # Similar-query hits cost a (cached) query embedding; off by default because
+    # queries that differ only in a ticker or year can embed almost identically
+    QUERY_CACHE_SEMANTIC = os.getenv("QUERY_CACHE_SEMANTIC", "false").lower() == "true"
+    QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.97"))
+    
     # Generation defaults
     DEFAULT_LLM_MODEL = "meta-llama/llama-3.1-8b-instruct:free"
     DEFAULT_TEMPERATURE = 0.7
@@ -49,10 +206,11 @@ class Config:
     def validate(cls):
         """Validate required environment variables"""
         required = {
-            "CHROMA_TENANT": cls.CHROMA_TENANT,
-            "CHROMA_API_KEY": cls.CHROMA_API_KEY,
             "OPEN_ROUTER_API": cls.OPEN_ROUTER_API,
         }
+        if cls.VECTOR_BACKEND == "chroma":
+            required["CHROMA_TENANT"] = cls.CHROMA_TENANT
+            required["CHROMA_API_KEY"] = cls.CHROMA_API_KEY
         
         # Validate embedding provider
         if cls.EMBEDDING_PROVIDER == "google" and not cls.GEMINI_API_KEY:
@@ -3,21 +3,62 @@ ChromaDB Cloud client management
 """
 
 import chromadb
+from chromadb.errors import NotFoundError
+from src.core.aliases import resolve_collection
 from src.core.config import Config
+from src.core.local_index import get_local_client
+from src.core.registry import get_or_create
+from src.core.sharding import ShardedClient
 
 
-def get_chromadb_client():
+def get_backend_client():
     """
-    Get ChromaDB Cloud client
+    Get the unsharded client of the configured backend
     
     Returns:
-        chromadb.Client: Connected ChromaDB client
+        chromadb.Client: Connected ChromaDB Cloud client, or the LocalClient
+            of the embedded index when VECTOR_BACKEND is "local"
     """
-    client = chromadb.CloudClient(
-        database=Config.CHROMA_DATABASE,
-        tenant=Config.CHROMA_TENANT,
-        api_key=Config.CHROMA_API_KEY,
+    if Config.VECTOR_BACKEND == "local":
+        return get_local_client()
+    return get_or_create(
+        "client",
+        (Config.CHROMA_DATABASE, Config.CHROMA_TENANT, Config.CHROMA_API_KEY),
+        lambda: chromadb.CloudClient(
+            database=Config.CHROMA_DATABASE,
+            tenant=Config.CHROMA_TENANT,
+            api_key=Config.CHROMA_API_KEY,
+        )
     )
+
+
+
+def backend_name():
+    """
+    Get a display name for the configured backend
+    
+    Returns:
+        str: "local index" when VECTOR_BACKEND is "local", else "ChromaDB Cloud"
+    """
+    return "local index" if Config.VECTOR_BACKEND == "local" else "ChromaDB Cloud"
+
+
+def get_chromadb_client():
+    """
+    Get the vector store client for the configured backend
+    
+    The client is built once per configuration and reused (see
+    src.core.registry).
+    
+    Returns:
+        chromadb.Client: Client from get_backend_client(), wrapped in a
+            ShardedClient when SHARD_COUNT > 1
+    """
+    client = get_backend_client()
+    
+    if Config.SHARD_COUNT > 1:
+        # New collections are spread over SHARD_COUNT physical collections
+        return get_or_create("sharded_client", (id(client), Config.SHARD_COUNT), lambda: ShardedClient(client))
     return client
 
 
@@ -32,9 +73,11 @@ def check_collection_exists(collection_name):
         bool: True if collection exists, False otherwise
     """
     try:
-        client = get_chromadb_client()
-        collections = client.list_collections()
-        return any(c.name == collection_name for c in collections)
+        # One direct lookup instead of listing every collection in the tenant
+        get_chromadb_client().get_collection(name=resolve_collection(collection_name))
+        return True
+    except (NotFoundError, ValueError):
+        return False
     except Exception as e:
-        print(f"⚠️  Error connecting to ChromaDB Cloud: {e}")
+        print(f"⚠️  Error connecting to {backend_name()}: {e}")
         return False
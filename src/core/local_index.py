@@ -0,0 +1,666 @@
+"""
+Embedded local vector index - a drop-in for the ChromaDB client on local disk
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+import numpy as np
+from chromadb.errors import InvalidDimensionException, NotFoundError
+from src.core.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so use one writing process at a time
+    fcntl = None
+
+# Same rule ChromaDB applies to collection names (they become directory names here)
+_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{1,510}[a-zA-Z0-9]$")
+
+MAX_BATCH_SIZE = 10000
+_INITIAL_CAPACITY = 1024
+
+
+def _matches(metadata, where):
+    """Evaluate a ChromaDB-style `where` filter against one metadata dict"""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            if op == "$eq":
+                ok = value == operand
+            elif op == "$ne":
+                ok = value != operand
+            elif op == "$in":
+                ok = value in operand
+            elif op == "$nin":
+                ok = value not in operand
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                ok = {"$gt": value > operand, "$gte": value >= operand,
+                      "$lt": value < operand, "$lte": value <= operand}[op]
+            else:
+                raise ValueError(f"Unsupported where operator: {op}")
+            if not ok:
+                return False
+    return True
+
+
+def _matches_document(document, where_document):
+    """Evaluate a ChromaDB-style `where_document` filter"""
+    document = document or ""
+    for op, operand in where_document.items():
+        if op == "$contains" and operand not in document:
+            return False
+        if op == "$not_contains" and operand in document:
+            return False
+        if op == "$and" and not all(_matches_document(document, clause) for clause in operand):
+            return False
+        if op == "$or" and not any(_matches_document(document, clause) for clause in operand):
+            return False
+    return True
+
+
+class LocalCollection:
+    """
+    A collection stored as a memory-mapped float32 matrix (`vectors.f32`)
+    plus an append-only JSON log of ids, metadata and documents
+    (`log.jsonl`). Queries are exact: one matmul over all rows and
+    `argpartition` for the top k. With LOCAL_INDEX_HNSW, large collections
+    are searched through an in-memory HNSW graph (hnswlib) instead.
+    
+    Implements the subset of chromadb.Collection the pipeline and
+    langchain_chroma use: upsert/add, update, delete, get, query, count.
+    
+    Several processes (e.g. a watch daemon and a search session) may share a
+    collection: writes hold an exclusive lock on the collection's `lock`
+    file, and every operation first replays log entries other processes
+    appended since the last one.
+    """
+    
+    def __init__(self, path, name, metadata=None):
+        self.path = path
+        self.name = name
+        self._lock = threading.RLock()
+        self._log_path = os.path.join(path, "log.jsonl")
+        self._lock_path = os.path.join(path, "lock")
+        # Cleared for this collection only if hnswlib turns out to be missing
+        self._hnsw_available = True
+        self._reset()
+        
+        info_path = os.path.join(path, "collection.json")
+        if os.path.exists(info_path):
+            with open(info_path, "r") as f:
+                info = json.load(f)
+            self.metadata = info.get("metadata") or {}
+            self.dim = info.get("dim")
+            with self._writing():
+                pass  # replays the log and drops a torn last write
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.metadata = metadata or {"hnsw:space": "cosine"}
+            self.dim = None
+            self._save_info()
+        
+        self.space = self.metadata.get("hnsw:space", "cosine")
+    
+    @property
+    def configuration(self):
+        return {"hnsw": {"space": self.space}}
+    
+    def _save_info(self):
+        tmp_path = os.path.join(self.path, "collection.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"name": self.name, "dim": self.dim, "metadata": self.metadata}, f)
+        os.replace(tmp_path, os.path.join(self.path, "collection.json"))
+    
+    def _open_vectors(self, capacity):
+        """Map the vector file, growing it to `capacity` rows"""
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        with open(vectors_path, "ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+        self._norms = np.resize(getattr(self, "_norms", np.zeros(0, dtype=np.float32)), capacity)
+    
+    def _reset(self):
+        """Forget the in-memory state so the whole log is replayed"""
+        self._vectors = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._capacity = 0
+        self._rows = 0
+        self._ids = []
+        self._metadatas = []
+        self._documents = []
+        self._row_of = {}
+        self._hnsw = None
+        self._hnsw_stale = set()
+        # Bytes of the log replayed so far, and which file they came from
+        self._offset = 0
+        self._log_id = None
+    
+    @contextmanager
+    def _file_lock(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    @contextmanager
+    def _writing(self):
+        """Hold the collection for writing, caught up with other processes' writes"""
+        with self._lock, self._file_lock(exclusive=True):
+            self._catch_up()
+            # Whatever is left past the last complete line is a torn write of a
+            # crashed writer; appending after it would corrupt the next entry
+            if os.path.exists(self._log_path) and os.path.getsize(self._log_path) > self._offset:
+                os.truncate(self._log_path, self._offset)
+            yield
+    
+    def _refresh(self):
+        """Replay log entries other processes appended (a stat when there are none)"""
+        with self._lock:
+            try:
+                stat = os.stat(self._log_path)
+            except FileNotFoundError:
+                return
+            if (stat.st_ino, stat.st_dev) == self._log_id and stat.st_size == self._offset:
+                return
+            with self._file_lock(exclusive=False):
+                self._catch_up()
+    
+    def _catch_up(self):
+        """Replay the unread part of the log on top of the mapped vectors"""
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            return
+        if self._log_id is not None and ((stat.st_ino, stat.st_dev) != self._log_id or stat.st_size < self._offset):
+            self._reset()  # compacted by another process
+        self._log_id = (stat.st_ino, stat.st_dev)
+        if self.dim is None:
+            with open(os.path.join(self.path, "collection.json"), "r") as f:
+                self.dim = json.load(f).get("dim")
+            if self.dim is None:
+                return
+        
+        touched = set()
+        with open(self._log_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn or still being written
+                self._offset += len(line)
+                entry = json.loads(line)
+                if entry["op"] == "put":
+                    row = entry["row"]
+                    while len(self._ids) <= row:
+                        self._ids.append(None)
+                        self._metadatas.append(None)
+                        self._documents.append(None)
+                    touched.update(self._set_row(row, entry["id"], entry["metadata"], entry["document"]))
+                elif entry["op"] == "update":
+                    row = self._row_of.get(entry["id"])
+                    if row is not None:
+                        self._metadatas[row] = entry.get("metadata", self._metadatas[row])
+                        self._documents[row] = entry.get("document", self._documents[row])
+                        touched.add(row)
+                elif entry["op"] == "delete":
+                    for chunk_id in entry["ids"]:
+                        row = self._row_of.pop(chunk_id, None)
+                        if row is not None:
+                            self._ids[row] = self._metadatas[row] = self._documents[row] = None
+                            touched.add(row)
+        
+        self._rows = len(self._ids)
+        if self._vectors is None or self._rows > self._capacity:
+            vectors_path = os.path.join(self.path, "vectors.f32")
+            size = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+            self._open_vectors(max(self._rows, size // (self.dim * 4), _INITIAL_CAPACITY))
+        if touched:
+            rows = np.asarray(sorted(touched))
+            self._norms[rows] = np.linalg.norm(self._vectors[rows], axis=1)
+            self._hnsw_stale.update(touched)
+    
+    def _set_row(self, row, chunk_id, metadata, document):
+        """Point chunk_id at row, retiring the row it had before; returns the touched rows"""
+        touched = [row]
+        previous = self._ids[row]
+        if previous is not None and self._row_of.get(previous) == row:
+            del self._row_of[previous]
+        old_row = self._row_of.get(chunk_id)
+        if old_row is not None and old_row != row:
+            self._ids[old_row] = self._metadatas[old_row] = self._documents[old_row] = None
+            touched.append(old_row)
+        self._ids[row] = chunk_id
+        self._metadatas[row] = metadata
+        self._documents[row] = document
+        self._row_of[chunk_id] = row
+        return touched
+    
+    def _new_rows(self, count):
+        """Append count empty rows, growing the vector file if needed; called inside _writing()"""
+        rows = list(range(self._rows, self._rows + count))
+        self._rows += count
+        self._ids.extend([None] * count)
+        self._metadatas.extend([None] * count)
+        self._documents.extend([None] * count)
+        if self._rows > self._capacity:
+            self._open_vectors(max(self._rows, self._capacity * 2, _INITIAL_CAPACITY))
+        return rows
+    
+    def _put(self, ids, vectors, metadatas, documents):
+        """
+        Write records to fresh rows and commit them; called inside _writing()
+        
+        Vectors never overwrite a live row: a crash before the log line leaves
+        the previous version of a replaced ID intact.
+        """
+        rows = self._new_rows(len(ids))
+        rows_array = np.asarray(rows)
+        self._vectors[rows_array] = vectors
+        self._vectors.flush()
+        self._norms[rows_array] = np.linalg.norm(vectors, axis=1)
+        
+        # The log line is the commit point: vectors are written first
+        entries = []
+        for row, chunk_id, metadata, document in zip(rows, ids, metadatas, documents):
+            self._hnsw_stale.update(self._set_row(row, chunk_id, metadata, document))
+            entries.append({"op": "put", "row": row, "id": chunk_id, "metadata": metadata, "document": document})
+        self._append_log(entries)
+        self._compact_if_sparse()
+    
+    def _compact_if_sparse(self):
+        """Compact once dead rows outnumber live ones; called inside _writing()"""
+        dead = self._rows - len(self._row_of)
+        if dead > _INITIAL_CAPACITY and dead > len(self._row_of):
+            self._compact_locked()
+    
+    def _append_log(self, entries):
+        """Append entries; called inside _writing()"""
+        if not entries:
+            return
+        with open(self._log_path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        stat = os.stat(self._log_path)
+        self._offset = stat.st_size
+        self._log_id = (stat.st_ino, stat.st_dev)
+    
+    def count(self):
+        """Number of records in the collection"""
+        self._refresh()
+        return len(self._row_of)
+    
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        """
+        Insert or replace records
+        
+        Args:
+            ids: Record IDs
+            embeddings: Vectors aligned with ids (required - there is no
+                embedding function on a local collection)
+            metadatas: Optional metadata dicts aligned with ids
+            documents: Optional texts aligned with ids
+        """
+        self._write(ids, embeddings, metadatas, documents, replace=True)
+    
+    def add(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        """Insert records; IDs that already exist are left as they are, like chromadb"""
+        self._write(ids, embeddings, metadatas, documents, replace=False)
+    
+    def _write(self, ids, embeddings, metadatas, documents, replace):
+        if embeddings is None:
+            raise ValueError("Local collections need precomputed embeddings")
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if not len(ids):
+            return
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique within one upsert")
+        metadatas = metadatas or [None] * len(ids)
+        documents = documents or [None] * len(ids)
+        
+        with self._writing():
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._save_info()
+            if vectors.shape[1] != self.dim:
+                raise InvalidDimensionException(
+                    f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self.dim}"
+                )
+            keep = [i for i, chunk_id in enumerate(ids) if replace or chunk_id not in self._row_of]
+            if not keep:
+                return
+            self._put(
+                [ids[i] for i in keep], vectors[keep], [metadatas[i] for i in keep], [documents[i] for i in keep]
+            )
+    
+    def update(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        """
+        Update existing records; metadata is merged and a None value removes a key
+        
+        Args:
+            ids: Record IDs (unknown IDs are ignored)
+            embeddings: Optional new vectors
+            metadatas: Optional metadata updates aligned with ids
+            documents: Optional new texts aligned with ids
+        """
+        with self._writing():
+            entries, puts = [], []
+            for i, chunk_id in enumerate(ids):
+                row = self._row_of.get(chunk_id)
+                if row is None:
+                    continue
+                metadata, document = self._metadatas[row], self._documents[row]
+                if metadatas is not None:
+                    metadata = dict(metadata or {})
+                    for key, value in (metadatas[i] or {}).items():
+                        if value is None:
+                            metadata.pop(key, None)
+                        else:
+                            metadata[key] = value
+                if documents is not None:
+                    document = documents[i]
+                
+                if embeddings is not None:
+                    # A new vector goes to a fresh row, like an upsert
+                    puts.append((chunk_id, embeddings[i], metadata, document))
+                    continue
+                entry = {"op": "update", "id": chunk_id}
+                if metadatas is not None:
+                    self._metadatas[row] = entry["metadata"] = metadata
+                if documents is not None:
+                    self._documents[row] = entry["document"] = document
+                entries.append(entry)
+            self._append_log(entries)
+            
+            if puts:
+                put_ids, vectors, put_metadatas, put_documents = zip(*puts)
+                self._put(list(put_ids), np.asarray(vectors, dtype=np.float32), put_metadatas, put_documents)
+    
+    def _live_rows(self, ids=None, where=None, where_document=None):
+        if ids is not None:
+            rows = [self._row_of[chunk_id] for chunk_id in ids if chunk_id in self._row_of]
+        else:
+            rows = sorted(self._row_of.values())
+        if where:
+            rows = [row for row in rows if _matches(self._metadatas[row] or {}, where)]
+        if where_document:
+            rows = [row for row in rows if _matches_document(self._documents[row], where_document)]
+        return rows
+    
+    def delete(self, ids=None, where=None, where_document=None, **kwargs):
+        """Delete records by ID and/or filter"""
+        with self._writing():
+            rows = self._live_rows(ids, where, where_document)
+            if not rows:
+                return
+            deleted = [self._ids[row] for row in rows]
+            for row, chunk_id in zip(rows, deleted):
+                del self._row_of[chunk_id]
+                self._ids[row] = self._metadatas[row] = self._documents[row] = None
+            self._append_log([{"op": "delete", "ids": deleted}])
+            self._hnsw_stale.update(rows)
+            self._compact_if_sparse()
+    
+    def get(self, ids=None, where=None, limit=None, offset=None, where_document=None, include=None, **kwargs):
+        """
+        Fetch records
+        
+        Returns:
+            dict: "ids" plus the included fields, as flat lists
+        """
+        include = include if include is not None else ["metadatas", "documents"]
+        self._refresh()
+        with self._lock:
+            rows = self._live_rows(ids, where, where_document)
+            rows = rows[offset or 0:(offset or 0) + limit if limit is not None else None]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+                "documents": [self._documents[row] for row in rows] if "documents" in include else None,
+                "embeddings": np.array(self._vectors[rows]) if "embeddings" in include and rows else None,
+                "include": include,
+            }
+    
+    def _distances(self, queries, rows):
+        """Distances between each query and the given rows, in the collection's space"""
+        vectors = self._vectors[rows] if rows is not None else self._vectors[:self._rows]
+        norms = self._norms[rows] if rows is not None else self._norms[:self._rows]
+        dots = queries @ vectors.T
+        if self.space == "cosine":
+            query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            return 1.0 - dots / np.maximum(query_norms * norms, 1e-12)
+        if self.space == "ip":
+            return 1.0 - dots
+        return (queries ** 2).sum(axis=1, keepdims=True) + norms ** 2 - 2.0 * dots
+    
+    def _exact_search(self, queries, k, rows):
+        if rows is None:
+            distances = self._distances(queries, None)
+            dead = np.ones(self._rows, dtype=bool)
+            dead[list(self._row_of.values())] = False
+            distances[:, dead] = np.inf
+            candidates = np.arange(self._rows)
+        else:
+            candidates = np.asarray(rows)
+            distances = self._distances(queries, candidates)
+        
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1)
+        return candidates[np.take_along_axis(top, order, axis=1)], np.take_along_axis(top_distances, order, axis=1)
+    
+    def _hnsw_search(self, queries, k):
+        """Approximate top-k; returns None to fall back to exact search"""
+        index = self._hnsw_index()
+        if index is None:
+            return None
+        index.set_ef(max(Config.LOCAL_INDEX_HNSW_EF, k))
+        rows, distances = index.knn_query(queries, k=k)
+        return rows.astype(np.int64), distances
+    
+    def _hnsw_index(self):
+        """Build or refresh the HNSW graph for stale rows"""
+        try:
+            import hnswlib
+        except ImportError:
+            print("⚠️  LOCAL_INDEX_HNSW is set but hnswlib is not installed - using exact search")
+            self._hnsw_available = False
+            return None
+        
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space=self.space, dim=self.dim)
+            self._hnsw.init_index(max_elements=self._capacity, M=16, ef_construction=200, allow_replace_deleted=False)
+            self._hnsw_stale = set(range(self._rows))
+        if self._hnsw.get_max_elements() < self._capacity:
+            self._hnsw.resize_index(self._capacity)
+        
+        if self._hnsw_stale:
+            stale = np.asarray(sorted(self._hnsw_stale))
+            live = np.asarray([row for row in stale if self._ids[row] is not None], dtype=np.int64)
+            if len(live):
+                self._hnsw.add_items(np.asarray(self._vectors[live]), live)
+            for row in stale:
+                if self._ids[row] is None:
+                    try:
+                        self._hnsw.mark_deleted(int(row))
+                    except RuntimeError:
+                        pass  # never added or already deleted
+            self._hnsw_stale = set()
+        return self._hnsw
+    
+    def query(self, query_embeddings=None, query_texts=None, n_results=10, where=None,
+              where_document=None, include=None, **kwargs):
+        """
+        Nearest neighbours of each query embedding
+        
+        Returns:
+            dict: "ids", "distances" and the included fields, one list per query
+        """
+        if query_embeddings is None:
+            raise ValueError("Local collections need query_embeddings (there is no embedding function)")
+        include = include if include is not None else ["metadatas", "documents", "distances"]
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        
+        self._refresh()
+        with self._lock:
+            rows = self._live_rows(where=where, where_document=where_document) if (where or where_document) else None
+            available = len(rows) if rows is not None else len(self._row_of)
+            k = min(n_results, available)
+            if k == 0:
+                empty = [[] for _ in queries]
+                return {"ids": empty, "distances": empty, "metadatas": empty, "documents": empty,
+                        "embeddings": None, "include": include}
+            
+            result = None
+            if (Config.LOCAL_INDEX_HNSW and self._hnsw_available and rows is None
+                    and len(self._row_of) >= Config.LOCAL_INDEX_HNSW_MIN_ITEMS):
+                result = self._hnsw_search(queries, k)
+            top_rows, top_distances = result if result is not None else self._exact_search(queries, k, rows)
+            
+            return {
+                "ids": [[self._ids[row] for row in found] for found in top_rows],
+                "distances": top_distances.tolist(),
+                "metadatas": [[self._metadatas[row] for row in found] for found in top_rows],
+                "documents": [[self._documents[row] for row in found] for found in top_rows],
+                "embeddings": [np.array(self._vectors[found]) for found in top_rows] if "embeddings" in include else None,
+                "include": include,
+            }
+    
+    def compact(self):
+        """Rewrite the vector file and log without deleted rows"""
+        with self._writing():
+            self._compact_locked()
+    
+    def _compact_locked(self):
+        """compact() for a caller already inside _writing()"""
+        rows = sorted(self._row_of.values())
+        capacity = max(len(rows), _INITIAL_CAPACITY)
+        vectors_tmp = os.path.join(self.path, "vectors.f32.tmp")
+        log_tmp = os.path.join(self.path, "log.jsonl.tmp")
+        
+        compacted = np.memmap(vectors_tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        if rows:
+            compacted[:len(rows)] = self._vectors[rows]
+        compacted.flush()
+        del compacted
+        with open(log_tmp, "w") as f:
+            for new_row, row in enumerate(rows):
+                f.write(json.dumps({"op": "put", "row": new_row, "id": self._ids[row],
+                                    "metadata": self._metadatas[row], "document": self._documents[row]}) + "\n")
+        
+        self._vectors = None
+        os.replace(vectors_tmp, os.path.join(self.path, "vectors.f32"))
+        os.replace(log_tmp, os.path.join(self.path, "log.jsonl"))
+        
+        self._ids = [self._ids[row] for row in rows]
+        self._metadatas = [self._metadatas[row] for row in rows]
+        self._documents = [self._documents[row] for row in rows]
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._rows = len(rows)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._open_vectors(capacity)
+        self._norms[:self._rows] = np.linalg.norm(self._vectors[:self._rows], axis=1)
+        stat = os.stat(self._log_path)
+        self._offset = stat.st_size
+        self._log_id = (stat.st_ino, stat.st_dev)
+        self._hnsw = None
+        self._hnsw_stale = set()
+    
+    def close(self):
+        with self._lock:
+            self._vectors = None
+
+
+class LocalClient:
+    """
+    Stand-in for chromadb's client backed by LocalCollection directories,
+    so langchain_chroma.Chroma and the pipeline work on it unchanged
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or Config.LOCAL_INDEX_DIR
+        self._collections = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+    
+    def _collection_path(self, name):
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid collection name: {name!r}")
+        return os.path.join(self.path, name)
+    
+    def get_collection(self, name, **kwargs):
+        """Open an existing collection"""
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                path = self._collection_path(name)
+                if not os.path.exists(os.path.join(path, "collection.json")):
+                    raise NotFoundError(f"Collection [{name}] does not exist")
+                collection = self._collections[name] = LocalCollection(path, name)
+            return collection
+    
+    def get_or_create_collection(self, name, metadata=None, **kwargs):
+        """Open a collection, creating it empty if needed"""
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = LocalCollection(self._collection_path(name), name, metadata)
+            return collection
+    
+    create_collection = get_or_create_collection
+    
+    def delete_collection(self, name):
+        """Delete a collection and its files"""
+        with self._lock:
+            path = self._collection_path(name)
+            if not os.path.exists(path):
+                raise NotFoundError(f"Collection [{name}] does not exist")
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(path)
+    
+    def list_collections(self):
+        """All collections in the index directory"""
+        names = sorted(
+            name for name in os.listdir(self.path)
+            if os.path.exists(os.path.join(self.path, name, "collection.json"))
+        )
+        return [self.get_collection(name) for name in names]
+    
+    def get_max_batch_size(self):
+        return MAX_BATCH_SIZE
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_local_client(path=None):
+    """One LocalClient per index directory, shared by the whole process"""
+    path = os.path.abspath(path or Config.LOCAL_INDEX_DIR)
+    with _clients_lock:
+        if path not in _clients:
+            _clients[path] = LocalClient(path)
+        return _clients[path]
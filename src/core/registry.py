@@ -0,0 +1,116 @@
+"""
+Process-wide registry of reusable clients and models
+"""
+
+import os
+import threading
+import time
+from src.core.config import Config
+
+_objects = {}
+_lock = threading.RLock()
+
+
+def get_or_create(kind, key, factory):
+    """
+    Return the cached object for (kind, key), creating it on first use
+    
+    Keys include the process ID, so worker processes forked from a parent
+    build their own objects instead of sharing its open connections.
+    
+    Args:
+        kind: Object category, e.g. "client", "embeddings", "llm", "vectorstore"
+        key: Hashable description of the configuration the object was built from
+        factory: Zero-argument callable that builds the object
+    
+    Returns:
+        object: The cached or newly built object
+    """
+    full_key = (kind, os.getpid(), key)
+    obj = _objects.get(full_key)
+    if obj is None:
+        with _lock:
+            obj = _objects.get(full_key)
+            if obj is None:
+                obj = _objects[full_key] = factory()
+    return obj
+
+
+def put(kind, key, obj):
+    """Register an object built elsewhere (replacing any cached one)"""
+    with _lock:
+        _objects[(kind, os.getpid(), key)] = obj
+    return obj
+
+
+def invalidate(kind=None, key=None):
+    """
+    Drop cached objects so the next lookup builds them again
+    
+    Args:
+        kind: Only drop this category (all categories if None)
+        key: Only drop this configuration within the category
+    """
+    with _lock:
+        for full_key in list(_objects):
+            if kind is not None and full_key[0] != kind:
+                continue
+            if key is not None and full_key[2] != key:
+                continue
+            del _objects[full_key]
+
+
+def configure_cpu_threads():
+    """
+    Size torch's intra-op thread pool once, at startup
+    
+    The setting is process-wide, so it is applied here rather than by each
+    local model: changing it while another model is running inference
+    resizes that model's pool underneath it. Does nothing (and doesn't
+    import torch) unless a local embedding model or the re-ranker is in use.
+    """
+    local_embeddings = "local" in (Config.EMBEDDING_PROVIDER, Config.SEMANTIC_EMBEDDING_PROVIDER)
+    if not (local_embeddings or Config.RERANK_ENABLED):
+        return
+    
+    def apply():
+        import torch
+        torch.set_num_threads(Config.LOCAL_EMBEDDING_THREADS)
+        return Config.LOCAL_EMBEDDING_THREADS
+    
+    get_or_create("cpu_threads", None, apply)
+
+
+def warm_up(collection_name=None, model=None):
+    """
+    Open the vector store, embedding and LLM connections ahead of the first
+    query, so it doesn't pay for client construction and TLS handshakes.
+    Failures are reported and otherwise ignored.
+    
+    Args:
+        collection_name: Collection that will be queried (defaults to config)
+        model: OpenRouter model that will answer (defaults to config)
+    """
+    # Imported here: the registry itself must not depend on the modules that use it
+    from src.generation.llm import get_llm
+    from src.retrieval.rerank import get_reranker
+    from src.retrieval.vectorstore import get_vectorstore
+    
+    collection_name = collection_name or Config.DEFAULT_COLLECTION
+    start = time.perf_counter()
+    steps = [
+        ("vector store", lambda: get_vectorstore(collection_name)._collection.count()),
+        # Served from the embedding cache after the first run
+        ("embeddings", lambda: get_vectorstore(collection_name).embeddings.embed_query("warm-up")),
+        # Cheap authenticated request on the same connection pool as chat completions
+        ("LLM", lambda: get_llm(model).root_client.models.list()),
+    ]
+    if Config.RERANK_ENABLED:
+        # Loads the model and measures its time per full-length pair for the latency budget
+        steps.append(("re-ranker", lambda: get_reranker().warm_up()))
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            print(f"⚠️  Warm-up of {name} failed: {e}")
+    print(f"🔥 Warmed up connections in {time.perf_counter() - start:.2f}s")
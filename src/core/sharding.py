@@ -0,0 +1,288 @@
+"""
+Sharded collections - one logical collection spread over N physical ones
+"""
+
+import heapq
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import xxhash
+from chromadb.errors import NotFoundError
+from src.core.config import Config
+
+
+def shard_name(collection_name, shard):
+    """Physical collection holding one shard, e.g. rag-documents__v3-s0"""
+    return f"{collection_name}-s{shard}"
+
+
+def shard_of(chunk_id, shard_count):
+    """Shard a chunk ID is hash-partitioned to (stable across runs)"""
+    return xxhash.xxh3_64_intdigest(chunk_id) % shard_count
+
+
+class ShardedCollection:
+    """
+    Presents N shard collections as one chromadb.Collection. Writes are
+    routed by a hash of the chunk ID and sent to the shards concurrently;
+    queries fan out to every shard and the per-shard top-k lists are merged
+    with a heap. Once SHARD_TIMEOUT_SECONDS have passed and at least one
+    shard has answered, shards still running are left out of the result
+    instead of holding up the query; when every shard is slow (a cold
+    start), the query waits for the first answer.
+    """
+    
+    def __init__(self, name, shards, executor):
+        self.name = name
+        self.shards = shards
+        self._executor = executor
+    
+    @property
+    def metadata(self):
+        return self.shards[0].metadata
+    
+    @property
+    def configuration(self):
+        return self.shards[0].configuration
+    
+    def _route(self, ids):
+        """Group positions in `ids` by shard"""
+        groups = {}
+        for i, chunk_id in enumerate(ids):
+            groups.setdefault(shard_of(chunk_id, len(self.shards)), []).append(i)
+        return groups
+    
+    def _fan_out(self, calls):
+        """Run (shard, fn) calls concurrently, raising the first failure"""
+        futures = [self._executor.submit(fn, self.shards[shard]) for shard, fn in calls]
+        return [future.result() for future in futures]
+    
+    def _routed(self, method, ids, **columns):
+        """Call `method` on each shard with its share of ids and aligned columns"""
+        def call(positions):
+            def fn(collection):
+                kwargs = {
+                    key: [values[i] for i in positions] if values is not None else None
+                    for key, values in columns.items()
+                }
+                return getattr(collection, method)(ids=[ids[i] for i in positions], **kwargs)
+            return fn
+        self._fan_out([(shard, call(positions)) for shard, positions in self._route(ids).items()])
+    
+    def count(self):
+        return sum(self._fan_out([(shard, lambda c: c.count()) for shard in range(len(self.shards))]))
+    
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        self._routed("upsert", list(ids), embeddings=embeddings, metadatas=metadatas, documents=documents)
+    
+    def add(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        self._routed("add", list(ids), embeddings=embeddings, metadatas=metadatas, documents=documents)
+    
+    def update(self, ids, embeddings=None, metadatas=None, documents=None, **kwargs):
+        self._routed("update", list(ids), embeddings=embeddings, metadatas=metadatas, documents=documents)
+    
+    def delete(self, ids=None, where=None, where_document=None, **kwargs):
+        if ids is not None:
+            ids = list(ids)
+            calls = [
+                (shard, lambda c, p=positions: c.delete(ids=[ids[i] for i in p], where=where, where_document=where_document))
+                for shard, positions in self._route(ids).items()
+            ]
+        else:
+            calls = [
+                (shard, lambda c: c.delete(where=where, where_document=where_document))
+                for shard in range(len(self.shards))
+            ]
+        self._fan_out(calls)
+    
+    def _page(self, where, where_document, limit, offset, include):
+        """
+        Rows offset..offset + limit of the shards read one after another
+        
+        Each shard is asked for the page at the remaining offset first. Only
+        a shard that ends before the offset is counted, and then only up to
+        the offset (IDs alone), so rows past the requested page are never read.
+        """
+        parts = []
+        for collection in self.shards:
+            if limit is not None and limit <= 0:
+                break
+            part = collection.get(where=where, where_document=where_document, limit=limit, offset=offset,
+                                  include=include)
+            if offset and not part["ids"]:
+                # The whole shard lies before the offset
+                if where is None and where_document is None:
+                    offset -= min(offset, collection.count())
+                else:
+                    offset -= len(collection.get(where=where, where_document=where_document, limit=offset,
+                                                 include=[])["ids"])
+                continue
+            parts.append(part)
+            offset = 0
+            if limit is not None:
+                limit -= len(part["ids"])
+        return parts
+    
+    def get(self, ids=None, where=None, limit=None, offset=None, where_document=None, include=None, **kwargs):
+        include = include if include is not None else ["metadatas", "documents"]
+        if ids is not None:
+            ids = list(ids)
+            parts = self._fan_out([
+                (shard, lambda c, p=positions: c.get(ids=[ids[i] for i in p], where=where,
+                                                     where_document=where_document, include=include))
+                for shard, positions in self._route(ids).items()
+            ])
+        elif offset:
+            parts = self._page(where, where_document, limit, offset, include)
+        else:
+            # Every shard returns up to limit rows; the first limit are kept after merging
+            parts = self._fan_out([
+                (shard, lambda c: c.get(where=where, where_document=where_document, limit=limit, include=include))
+                for shard in range(len(self.shards))
+            ])
+        
+        merged = {"ids": [], "include": include}
+        for key in ("metadatas", "documents", "embeddings"):
+            merged[key] = [] if key in include else None
+        for part in parts:
+            merged["ids"].extend(part["ids"])
+            for key in ("metadatas", "documents", "embeddings"):
+                if merged[key] is not None and part.get(key) is not None:
+                    merged[key].extend(part[key])
+        
+        if ids is None and limit is not None:
+            for key in ("ids", "metadatas", "documents", "embeddings"):
+                if merged[key] is not None:
+                    merged[key] = merged[key][:limit]
+        return merged
+    
+    def query(self, query_embeddings=None, query_texts=None, n_results=10, where=None,
+              where_document=None, include=None, **kwargs):
+        """
+        Query every shard concurrently and merge their top-k lists
+        
+        Returns:
+            dict: Same layout as chromadb's query result
+        """
+        include = include if include is not None else ["metadatas", "documents", "distances"]
+        # Distances are needed to merge, whatever the caller asked for
+        shard_include = list(dict.fromkeys(list(include) + ["distances"]))
+        futures = {
+            self._executor.submit(
+                collection.query,
+                query_embeddings=query_embeddings,
+                query_texts=query_texts,
+                n_results=n_results,
+                where=where,
+                where_document=where_document,
+                include=shard_include,
+            ): shard
+            for shard, collection in enumerate(self.shards)
+        }
+        done, not_done = wait(futures, timeout=Config.SHARD_TIMEOUT_SECONDS)
+        while not_done and all(future.exception() is not None for future in done):
+            # Nothing to return yet: wait for the next shard however long it takes
+            finished, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+            done |= finished
+        
+        answers, errors = [], []
+        for future in sorted(done, key=futures.get):
+            if future.exception() is not None:
+                errors.append((futures[future], future.exception()))
+            else:
+                answers.append(future.result())
+        for future in not_done:
+            print(f"⚠️  Shard {futures[future]} of '{self.name}' timed out - results may be incomplete")
+        for shard, error in errors:
+            print(f"⚠️  Shard {shard} of '{self.name}' failed ({error}) - results may be incomplete")
+        if not answers:
+            raise errors[0][1]
+        
+        num_queries = len(answers[0]["ids"])
+        result = {"ids": [], "distances": [], "include": include}
+        for key in ("metadatas", "documents", "embeddings"):
+            result[key] = [] if key in include else None
+        
+        for q in range(num_queries):
+            # Each shard's list is already sorted by distance
+            best = heapq.nsmallest(n_results, (
+                (distance, a, i)
+                for a, answer in enumerate(answers)
+                for i, distance in enumerate(answer["distances"][q])
+            ))
+            result["ids"].append([answers[a]["ids"][q][i] for _, a, i in best])
+            result["distances"].append([distance for distance, _, _ in best])
+            for key in ("metadatas", "documents", "embeddings"):
+                if result[key] is not None:
+                    result[key].append([answers[a][key][q][i] for _, a, i in best])
+        return result
+
+
+class ShardedClient:
+    """
+    Wraps a chromadb client (or LocalClient) so every collection it
+    creates is sharded over SHARD_COUNT physical collections. The shard
+    count and the logical collection name are stored in each shard's
+    metadata, so an existing collection keeps its layout if the setting
+    changes and shards are never mistaken for plain collections (or the
+    other way round); unsharded collections are still opened as they are.
+    """
+    
+    def __init__(self, client, shard_count=None):
+        self.client = client
+        self.shard_count = shard_count or Config.SHARD_COUNT
+        self._executor = ThreadPoolExecutor(max_workers=max(4, self.shard_count * 2), thread_name_prefix="shard")
+        self._lock = threading.Lock()
+    
+    def get_collection(self, name, **kwargs):
+        """Open a sharded collection, or a plain one created before sharding"""
+        try:
+            first = self.client.get_collection(name=shard_name(name, 0))
+        except (NotFoundError, ValueError):
+            return self.client.get_collection(name=name)
+        if (first.metadata or {}).get("shard_set") != name:
+            # A plain collection that happens to be named like a shard
+            return self.client.get_collection(name=name)
+        
+        shard_count = int((first.metadata or {}).get("shard_count", self.shard_count))
+        shards = [first] + [
+            self.client.get_collection(name=shard_name(name, shard)) for shard in range(1, shard_count)
+        ]
+        return ShardedCollection(name, shards, self._executor)
+    
+    def get_or_create_collection(self, name, metadata=None, **kwargs):
+        """Open a collection, creating it sharded if it doesn't exist"""
+        with self._lock:
+            try:
+                return self.get_collection(name)
+            except (NotFoundError, ValueError):
+                pass
+            metadata = {**(metadata or {}), "shard_count": self.shard_count, "shard_set": name}
+            shards = [
+                self.client.get_or_create_collection(name=shard_name(name, shard), metadata=metadata)
+                for shard in range(self.shard_count)
+            ]
+            return ShardedCollection(name, shards, self._executor)
+    
+    create_collection = get_or_create_collection
+    
+    def delete_collection(self, name):
+        """Delete every shard of a collection (or the plain collection)"""
+        try:
+            collection = self.get_collection(name)
+        except (NotFoundError, ValueError):
+            raise NotFoundError(f"Collection [{name}] does not exist")
+        if isinstance(collection, ShardedCollection):
+            for shard in range(len(collection.shards)):
+                self.client.delete_collection(name=shard_name(name, shard))
+        else:
+            self.client.delete_collection(name=name)
+    
+    def list_collections(self):
+        """Logical collections: shard sets count once"""
+        names = set()
+        for collection in self.client.list_collections():
+            names.add((collection.metadata or {}).get("shard_set", collection.name))
+        return [self.get_collection(name) for name in sorted(names)]
+    
+    def get_max_batch_size(self):
+        return self.client.get_max_batch_size()
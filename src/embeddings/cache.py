@@ -0,0 +1,203 @@
+"""
+Content-addressed embedding cache
+Wraps any embedding model so repeated texts are never sent to the backend twice
+"""
+
+import hashlib
+import inspect
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List
+from langchain_core.embeddings import Embeddings
+from src.core.config import Config
+from src.utils.disk_cache import DiskCache
+
+
+_disk_caches = {}
+_disk_caches_lock = threading.Lock()
+
+
+def _get_disk_cache(cache_dir):
+    """
+    Share one DiskCache per directory across all wrapped models
+    
+    Keyed by process ID as well: a SQLite connection must not be used across
+    fork, so worker processes open their own instead of the parent's.
+    """
+    key = (os.getpid(), cache_dir)
+    with _disk_caches_lock:
+        if key not in _disk_caches:
+            _disk_caches[key] = DiskCache(os.path.join(cache_dir, "embeddings.sqlite3"))
+        return _disk_caches[key]
+
+
+def _embed_query_batch(embeddings, texts):
+    """
+    Embed queries in one backend call, as embed_query would embed each one
+    
+    Providers whose embed_documents takes a task type (Gemini) embed queries
+    differently from documents, so they're asked for query embeddings; the
+    others embed a query exactly like a document.
+    """
+    if "task_type" in inspect.signature(embeddings.embed_documents).parameters:
+        return embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+    return embeddings.embed_documents(texts)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embedding wrapper with an in-memory LRU layer in front of an on-disk cache.
+    Entries are keyed by (provider, model, dimensions, text hash), so only
+    cache misses ever reach the wrapped backend.
+    """
+    
+    def __init__(self, embeddings: Embeddings, provider: str, cache_dir: str = None,
+                 memory_items: int = None):
+        self.embeddings = embeddings
+        self.provider = provider
+        self.model = getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.dimensions = getattr(embeddings, "dimensions", None)
+        self.namespace = f"{provider}|{self.model}|{self.dimensions or 'default'}"
+        
+        self._cache_dir = cache_dir or Config.EMBEDDING_CACHE_DIR
+        self._memory = OrderedDict()
+        self._memory_items = memory_items or Config.EMBEDDING_CACHE_MEMORY_ITEMS
+        self._lock = threading.Lock()
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    @property
+    def _disk(self):
+        # Looked up per call, so a wrapper inherited across fork uses the child's connection
+        return _get_disk_cache(self._cache_dir)
+    
+    def _key(self, kind, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.namespace}|{kind}|{digest}"
+    
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+    
+    def _lookup(self, kind, texts, embed_fn):
+        """Resolve texts from memory, then disk, then the backend"""
+        keys = [self._key(kind, text) for text in texts]
+        vectors = {}
+        
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[key] = self._memory[key]
+            self.memory_hits += sum(1 for key in keys if key in vectors)
+        
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if pending:
+            stored = self._disk.get_many(pending)
+            with self._lock:
+                for key, blob in stored.items():
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    vectors[key] = vector.tolist()
+                    self._remember(key, vectors[key])
+                self.disk_hits += sum(1 for key in keys if key in stored)
+        
+        # Each distinct missing text is embedded exactly once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            new_vectors = embed_fn(list(missing.values()))
+            self._disk.set_many(
+                (key, array("f", vector).tobytes())
+                for key, vector in zip(missing, new_vectors)
+            )
+            with self._lock:
+                for key, vector in zip(missing, new_vectors):
+                    vectors[key] = list(vector)
+                    self._remember(key, vectors[key])
+                self.misses += sum(1 for key in keys if key in missing)
+        
+        return [vectors[key] for key in keys]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents, hitting the backend only for cache misses"""
+        if not texts:
+            return []
+        return self._lookup("doc", texts, self.embeddings.embed_documents)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query, hitting the backend only on a cache miss"""
+        return self._lookup("query", [text], lambda batch: [self.embeddings.embed_query(batch[0])])[0]
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one backend call, sharing cache entries with embed_query"""
+        if not texts:
+            return []
+        return self._lookup("query", texts, lambda batch: _embed_query_batch(self.embeddings, batch))
+    
+    def stats(self):
+        """
+        Get cache hit/miss counters
+        
+        Returns:
+            dict: Hit and miss counts plus the overall hit rate
+        """
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+def cache_embeddings(embeddings, provider):
+    """
+    Wrap an embedding model with the persistent cache if enabled in config
+    
+    Args:
+        embeddings: Any LangChain Embeddings instance
+        provider: Provider name used in the cache key
+    
+    Returns:
+        Embeddings: Cached wrapper, or the model unchanged when caching is off
+    """
+    if not Config.EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(embeddings, provider)
+
+
+def embed_queries(embeddings, texts):
+    """
+    Embed several search queries with one backend call
+    
+    Args:
+        embeddings: Any LangChain Embeddings instance (cached or not)
+        texts: Query strings
+    
+    Returns:
+        list: One query embedding per text, as embed_query would return it
+    """
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(texts)
+    return _embed_query_batch(embeddings, texts) if texts else []
+
+
+def print_cache_stats(embeddings, label="Embedding cache"):
+    """Print hit/miss counters for a cached embedding model (no-op otherwise)"""
+    if not isinstance(embeddings, CachedEmbeddings):
+        return
+    stats = embeddings.stats()
+    print(f"💾 {label}: {stats['memory_hits'] + stats['disk_hits']} hits "
+          f"({stats['memory_hits']} memory, {stats['disk_hits']} disk), "
+          f"{stats['misses']} misses, hit rate {stats['hit_rate']:.1%}")
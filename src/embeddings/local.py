@@ -0,0 +1,94 @@
+"""
+Local CPU embedding model - no network, no API key
+"""
+
+import time
+from typing import List
+from langchain_core.embeddings import Embeddings
+from src.core.config import Config
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    Sentence-transformers model running on CPU.
+    
+    Inputs are sorted by length and grouped into buckets whose padded size
+    stays within a character budget, so short texts share large batches and
+    long texts don't pad out short ones. Results are returned in input order.
+    """
+    
+    def __init__(self, model: str = None, backend: str = None, batch_size: int = None,
+                 max_batch_chars: int = None, verbose: bool = True):
+        # Imported lazily so the remote providers don't pay torch's startup cost
+        from sentence_transformers import SentenceTransformer
+        
+        self.model = model or Config.LOCAL_EMBEDDING_MODEL
+        self.backend = backend or Config.LOCAL_EMBEDDING_BACKEND
+        self.batch_size = batch_size or Config.LOCAL_EMBEDDING_BATCH_SIZE
+        self.max_batch_chars = max_batch_chars or Config.LOCAL_EMBEDDING_MAX_BATCH_CHARS
+        self.verbose = verbose
+        
+        # Thread count: set once at startup by registry.configure_cpu_threads()
+        start = time.perf_counter()
+        self.client = SentenceTransformer(self.model, device="cpu", backend=self.backend)
+        self.dimensions = self.client.get_sentence_embedding_dimension()
+        if self.verbose:
+            print(f"  🧠 Loaded {self.model} ({self.backend}, {self.dimensions} dims) "
+                  f"in {time.perf_counter() - start:.1f}s", flush=True)
+    
+    def _make_buckets(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into length-sorted batches within the padded character budget"""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        buckets, bucket = [], []
+        
+        for i in order:
+            # Ascending order means the current text sets the padded length
+            padded_chars = (len(bucket) + 1) * max(len(texts[i]), 1)
+            if bucket and (len(bucket) >= self.batch_size or padded_chars > self.max_batch_chars):
+                buckets.append(bucket)
+                bucket = []
+            bucket.append(i)
+        
+        if bucket:
+            buckets.append(bucket)
+        return buckets
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents, returned in input order"""
+        all_embeddings = [None] * len(texts)
+        buckets = self._make_buckets(texts)
+        total_start = time.perf_counter()
+        
+        for batch_num, bucket in enumerate(buckets, 1):
+            start = time.perf_counter()
+            vectors = self.client.encode(
+                [texts[i] for i in bucket],
+                batch_size=len(bucket),
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            elapsed = time.perf_counter() - start
+            
+            for i, vector in zip(bucket, vectors):
+                all_embeddings[i] = vector.tolist()
+            
+            if self.verbose:
+                print(f"  🔄 Local batch {batch_num}/{len(buckets)}: {len(bucket)} texts "
+                      f"({len(bucket) / max(elapsed, 1e-9):.0f} texts/sec)", flush=True)
+        
+        if self.verbose and len(buckets) > 1:
+            elapsed = time.perf_counter() - total_start
+            print(f"  ⚡ Local embedding: {len(texts)} texts in {elapsed:.2f}s "
+                  f"({len(texts) / max(elapsed, 1e-9):.0f} texts/sec)", flush=True)
+        
+        return all_embeddings
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self.client.encode(
+            text,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).tolist()
@@ -2,12 +2,19 @@
 Embedding models for RAG Pipeline
 """
 
-from typing import List
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from langchain_core.embeddings import Embeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_openai import OpenAIEmbeddings
 from src.core.config import Config
+from src.core.registry import get_or_create
+from src.embeddings.cache import cache_embeddings
+from src.embeddings.local import LocalEmbeddings
 
 
 def get_google_embedding_model():
@@ -36,59 +43,136 @@ def get_openai_embedding_model():
     )
 
 
+def get_local_embedding_model():
+    """
+    Get the local CPU embedding model
+    
+    Returns:
+        LocalEmbeddings: Sentence-transformers model running on CPU
+    """
+    return LocalEmbeddings()
+
+
 def get_embedding_model():
     """
-    Get the configured embedding model (OpenAI or Google)
+    Get the configured embedding model, built once per configuration and reused
     
     Returns:
-        Embeddings: The configured embedding model
+        Embeddings: The configured embedding model, wrapped with the embedding cache
+    """
+    return get_or_create(
+        "embeddings",
+        (Config.EMBEDDING_PROVIDER, Config.LOCAL_EMBEDDING_MODEL, Config.LOCAL_EMBEDDING_BACKEND,
+         Config.EMBEDDING_CACHE_ENABLED, Config.OPENAI_API_KEY, Config.GEMINI_API_KEY),
+        create_embedding_model
+    )
+
+
+def create_embedding_model():
+    """
+    Build a new instance of the configured embedding model (OpenAI, Google or local)
+    
+    Returns:
+        Embeddings: The configured embedding model, wrapped with the embedding cache
     """
     if Config.EMBEDDING_PROVIDER == "google":
         print("🔵 Using Google Gemini embeddings")
-        return get_google_embedding_model()
+        return cache_embeddings(get_google_embedding_model(), "google")
+    elif Config.EMBEDDING_PROVIDER == "local":
+        print("🟤 Using local CPU embeddings")
+        return cache_embeddings(get_local_embedding_model(), "local")
     else:
         print("🟢 Using OpenAI embeddings")
-        return get_openai_embedding_model()
+        return cache_embeddings(get_openai_embedding_model(), "openai")
 
 
 class LightweightEmbeddings(Embeddings):
     """
     Free embedding API - OpenAI compatible, no API key required.
     Used for semantic chunking.
+    
+    Batches are sized by both text count and a character budget, sent over a
+    pooled HTTP session with several batches in flight, and retried with
+    exponential backoff on transient failures (timeouts, 429 and 5xx).
     """
     
-    def __init__(self, model: str = "embeddinggemma-300m", batch_size: int = 16):
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, model: str = "embeddinggemma-300m", batch_size: int = 16,
+                 max_batch_chars: int = None, max_concurrency: int = None,
+                 max_retries: int = None):
         self.model = model
         self.api_url = "https://lamhieu-lightweight-embeddings.hf.space/v1/embeddings"
         self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars or Config.LIGHTWEIGHT_EMBEDDING_MAX_BATCH_CHARS
+        self.max_concurrency = max_concurrency or Config.LIGHTWEIGHT_EMBEDDING_CONCURRENCY
+        self.max_retries = max_retries if max_retries is not None else Config.LIGHTWEIGHT_EMBEDDING_MAX_RETRIES
+        
+        # One keep-alive connection per in-flight batch
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed a list of documents"""
-        all_embeddings = []
-        total_batches = (len(texts) - 1) // self.batch_size + 1
+    def _make_batches(self, texts: List[str]) -> List[Tuple[int, List[str]]]:
+        """Group texts into (start_index, batch) pairs within the count and character budgets"""
+        batches = []
+        start, batch, batch_chars = 0, [], 0
+        
+        for i, text in enumerate(texts):
+            if batch and (len(batch) >= self.batch_size or batch_chars + len(text) > self.max_batch_chars):
+                batches.append((start, batch))
+                start, batch, batch_chars = i, [], 0
+            batch.append(text)
+            batch_chars += len(text)
         
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            batch_num = i // self.batch_size + 1
-            print(f"  🔄 Embedding batch {batch_num}/{total_batches} ({len(batch)} texts)...", flush=True)
+        if batch:
+            batches.append((start, batch))
+        return batches
+    
+    def _post(self, batch: List[str], timeout: int) -> List[List[float]]:
+        """Send one batch, retrying transient failures with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    json={"input": batch, "model": self.model},
+                    timeout=timeout
+                )
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return [item["embedding"] for item in response.json()["data"]]
+                error = requests.HTTPError(f"{response.status_code} from embedding API", response=response)
+                retry_after = response.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error, retry_after = e, None
+            
+            if attempt == self.max_retries:
+                raise error
             
-            response = requests.post(
-                self.api_url,
-                json={"input": batch, "model": self.model},
-                timeout=300
-            )
-            response.raise_for_status()
-            data = response.json()
-            all_embeddings.extend([item["embedding"] for item in data["data"]])
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            delay += random.uniform(0, 0.5)
+            print(f"  ⚠️  Embedding request failed ({error}), retrying in {delay:.1f}s...", flush=True)
+            time.sleep(delay)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of documents, returned in input order"""
+        batches = self._make_batches(texts)
+        all_embeddings = [None] * len(texts)
+        total_batches = len(batches)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {
+                executor.submit(self._post, batch, 300): (start, batch)
+                for start, batch in batches
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                start, batch = futures[future]
+                all_embeddings[start:start + len(batch)] = future.result()
+                print(f"  🔄 Embedded batch {done}/{total_batches} ({len(batch)} texts)...", flush=True)
         
         return all_embeddings
     
     def embed_query(self, text: str) -> List[float]:
         """Embed a single query"""
-        response = requests.post(
-            self.api_url,
-            json={"input": [text], "model": self.model},
-            timeout=120
-        )
-        response.raise_for_status()
-        return response.json()["data"][0]["embedding"]
+        return self._post([text], 120)[0]
@@ -4,11 +4,13 @@ LLM setup for answer generation
 
 from langchain_openai import ChatOpenAI
 from src.core.config import Config
+from src.core.registry import get_or_create
 
 
 def get_llm(model=None, temperature=None):
     """
-    Get the ChatOpenAI model configured for OpenRouter
+    Get the ChatOpenAI model configured for OpenRouter, built once per
+    (model, temperature) and reused so its HTTP connections stay open
     
     Args:
         model: OpenRouter model to use
@@ -20,6 +22,24 @@ def get_llm(model=None, temperature=None):
     model = model or Config.DEFAULT_LLM_MODEL
     temperature = temperature if temperature is not None else Config.DEFAULT_TEMPERATURE
     
+    return get_or_create(
+        "llm",
+        (model, temperature, Config.OPEN_ROUTER_API),
+        lambda: create_llm(model, temperature)
+    )
+
+
+def create_llm(model, temperature):
+    """
+    Build a new ChatOpenAI model for OpenRouter
+    
+    Args:
+        model: OpenRouter model to use
+        temperature: Temperature for generation
+    
+    Returns:
+        ChatOpenAI: LangChain chat model
+    """
     llm = ChatOpenAI(
         model=model,
         openai_api_key=Config.OPEN_ROUTER_API,
@@ -4,9 +4,12 @@ RAG answer generation
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from src.core.config import Config
+from src.core.database import backend_name
 from src.generation.llm import get_llm
+from src.ingestion.docstore import rehydrate_documents
+from src.retrieval.cache import print_query_cache_stats
 from src.retrieval.search import get_retriever
-from src.retrieval.vectorstore import get_vectorstore
+from src.retrieval.vectorstore import follow_alias, get_vectorstore
 from src.utils.display import display_rag_answer
 
 
@@ -30,6 +33,9 @@ def generate_answer(vectorstore, query, k=None, model=None):
     print(f"🔍 Searching for relevant documents...")
     retriever = get_retriever(vectorstore, k=k)
     relevant_docs = retriever.invoke(query)
+    if not Config.DOCSTORE_STORE_TEXT:
+        # Chunk text was left out of Chroma: read it back from the source files
+        rehydrate_documents(relevant_docs, vectorstore._collection.name)
     
     if not relevant_docs:
         return {
@@ -105,15 +111,15 @@ def run_generation(vectorstore=None, query=None, interactive=False, model=None,
     collection_name = collection_name or Config.DEFAULT_COLLECTION
     model = model or Config.DEFAULT_LLM_MODEL
     
-    print("=== RAG Answer Generation (LangChain + ChromaDB Cloud) ===\n")
+    print(f"=== RAG Answer Generation (LangChain + {backend_name()}) ===\n")
     
     # Load vectorstore if not provided
     if vectorstore is None:
-        print("🔄 Loading vector store from ChromaDB Cloud...")
+        print(f"🔄 Loading vector store from {backend_name()}...")
         vectorstore = get_vectorstore(collection_name)
     
     doc_count = vectorstore._collection.count()
-    print(f"📊 ChromaDB Cloud collection contains {doc_count} documents")
+    print(f"📊 {backend_name()} collection contains {doc_count} documents")
     print(f"🤖 Using model: {model}\n")
     
     if interactive:
@@ -134,7 +140,8 @@ def interactive_qa(vectorstore, model=None):
     Run an interactive Q&A session
     
     Args:
-        vectorstore: Chroma vector store
+        vectorstore: Chroma vector store (its alias is followed, so a
+            rebuild finishing mid-session is picked up)
         model: OpenRouter model to use
     """
     model = model or Config.DEFAULT_LLM_MODEL
@@ -151,6 +158,7 @@ def interactive_qa(vectorstore, model=None):
             query = input("❓ Your question: ").strip()
             
             if query.lower() in ['quit', 'exit', 'q']:
+                print_query_cache_stats()
                 print("\n👋 Goodbye!")
                 break
             
@@ -158,7 +166,7 @@ def interactive_qa(vectorstore, model=None):
                 print("⚠️  Please enter a valid question.\n")
                 continue
             
-            result = generate_answer(vectorstore, query, model=model)
+            result = generate_answer(follow_alias(vectorstore), query, model=model)
             display_rag_answer(result)
             
         except KeyboardInterrupt:
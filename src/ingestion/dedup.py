@@ -0,0 +1,218 @@
+"""
+Chunk deduplication - drops exact and near-duplicate chunks before embedding
+"""
+
+import re
+import threading
+import mmh3
+import numpy as np
+import xxhash
+from src.core.config import Config
+
+# Metadata written on surviving chunks
+DEDUP_METADATA_KEYS = ("duplicate_sources", "duplicate_count")
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so layout differences don't matter"""
+    return " ".join(text.lower().split())
+
+
+def shingle_hashes(text, size):
+    """
+    32-bit hashes of the word shingles of a text
+    
+    Args:
+        text: Normalized text
+        size: Words per shingle
+    
+    Returns:
+        np.ndarray: Unique uint64 shingle hashes
+    """
+    words = re.findall(r"\w+", text)
+    if len(words) <= size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.array([mmh3.hash(s, signed=False) for s in shingles], dtype=np.uint64))
+
+
+class ChunkDeduplicator:
+    """
+    Finds exact duplicates by hashing normalized text (xxh3) and near
+    duplicates with MinHash signatures bucketed by LSH bands. The first copy
+    of a chunk survives; later copies are dropped and their sources are
+    recorded in the survivor's metadata ("duplicate_sources",
+    "duplicate_count"), available from merged_metadata().
+    
+    The index is kept across calls, so one instance can deduplicate a corpus
+    that arrives in pieces (e.g. from several streaming workers).
+    """
+    
+    def __init__(self, threshold=None, num_perm=None, bands=None, shingle_size=None):
+        self.threshold = threshold or Config.DEDUP_THRESHOLD
+        self.num_perm = num_perm or Config.DEDUP_NUM_PERM
+        self.bands = bands or Config.DEDUP_BANDS
+        self.shingle_size = shingle_size or Config.DEDUP_SHINGLE_SIZE
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.rows = self.num_perm // self.bands
+        
+        # Multiply-shift hash family: ((a * x + b) mod 2^64) >> 32 with odd a,
+        # one (a, b) pair per permutation; uint64 arithmetic wraps for free
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, self.num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, self.num_perm, dtype=np.uint64, endpoint=True)
+        
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self._survivors = []
+        self._merged = set()
+        self._encoding = None
+        
+        self.seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.tokens_saved = 0
+    
+    def signature(self, text):
+        """MinHash signature of a normalized text"""
+        hashes = shingle_hashes(text, self.shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) >> np.uint64(32)
+        return permuted.min(axis=0)
+    
+    def _band_keys(self, signature):
+        return [
+            xxhash.xxh3_64_intdigest(signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+    
+    def _find_near(self, signature, band_keys):
+        """Index of the first indexed chunk whose estimated Jaccard passes the threshold"""
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for candidate in sorted(candidates):
+            if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                return candidate
+        return None
+    
+    def _count_tokens(self, text):
+        if self._encoding is None:
+            # Imported here: only needed once something is actually dropped
+            from src.chunking.recursive import get_token_encoding
+            self._encoding = get_token_encoding()
+        return len(self._encoding.encode_ordinary(text))
+    
+    def _merge(self, survivor, duplicate):
+        """Record a dropped copy's source on the surviving chunk"""
+        metadata = self._survivors[survivor][1]
+        sources = set(filter(None, metadata.get("duplicate_sources", "").split(";")))
+        sources.add(duplicate.metadata.get("source", ""))
+        metadata["duplicate_sources"] = ";".join(sorted(sources))
+        metadata["duplicate_count"] = metadata.get("duplicate_count", 0) + 1
+        self._merged.add(survivor)
+        self.tokens_saved += self._count_tokens(duplicate.page_content)
+    
+    def deduplicate(self, chunks, ids, embeddings=None):
+        """
+        Drop chunks that duplicate anything seen so far
+        
+        Args:
+            chunks: List of LangChain Document objects
+            ids: Chunk IDs aligned with chunks
+            embeddings: Optional vectors aligned with chunks
+        
+        Returns:
+            tuple: (chunks, ids, embeddings or None, aliases) where aliases
+                is a list of (source, surviving chunk ID) for every dropped chunk
+        """
+        normalized = [normalize_text(chunk.page_content) for chunk in chunks]
+        exact_keys = [xxhash.xxh3_64_intdigest(text) for text in normalized]
+        # Signatures are the expensive part; compute them outside the lock
+        signatures = [self.signature(text) for text in normalized]
+        
+        kept = []
+        aliases = []
+        with self._lock:
+            for i, chunk in enumerate(chunks):
+                self.seen += 1
+                survivor = self._exact.get(exact_keys[i])
+                if survivor is not None:
+                    self.exact_duplicates += 1
+                else:
+                    band_keys = self._band_keys(signatures[i])
+                    survivor = self._find_near(signatures[i], band_keys)
+                    if survivor is not None:
+                        self.near_duplicates += 1
+                
+                if survivor is not None:
+                    self._merge(survivor, chunk)
+                    aliases.append((chunk.metadata.get("source", ""), self._survivors[survivor][0]))
+                    continue
+                
+                index = len(self._survivors)
+                # Keep a private copy: the chunk itself may already be on its
+                # way to the store in another thread
+                self._survivors.append((ids[i], dict(chunk.metadata)))
+                self._signatures.append(signatures[i])
+                self._exact[exact_keys[i]] = index
+                for band, key in enumerate(band_keys):
+                    self._buckets[band].setdefault(key, []).append(index)
+                kept.append(i)
+        
+        return (
+            [chunks[i] for i in kept],
+            [ids[i] for i in kept],
+            [embeddings[i] for i in kept] if embeddings is not None else None,
+            aliases
+        )
+    
+    def merged_metadata(self):
+        """
+        Surviving chunks that absorbed duplicates
+        
+        Returns:
+            tuple: (ids, metadatas) with a copy of each survivor's updated metadata
+        """
+        with self._lock:
+            merged = sorted(self._merged)
+            return [self._survivors[i][0] for i in merged], [dict(self._survivors[i][1]) for i in merged]
+    
+    def print_report(self):
+        """Print how much the dedup stage saved"""
+        dropped = self.exact_duplicates + self.near_duplicates
+        if not self.seen:
+            return
+        print(f"🧹 Dedup: dropped {dropped}/{self.seen} chunks ({dropped / self.seen:.1%}) - "
+              f"{self.exact_duplicates} exact, {self.near_duplicates} near-duplicate; "
+              f"~{self.tokens_saved} embedding tokens saved")
+
+
+def deduplicate_chunks(chunks, ids, embeddings=None):
+    """
+    Run the dedup stage over one batch of chunks (no-op when disabled)
+    
+    Args:
+        chunks: List of LangChain Document objects
+        ids: Chunk IDs aligned with chunks
+        embeddings: Optional vectors aligned with chunks
+    
+    Returns:
+        tuple: (chunks, ids, embeddings or None, aliases)
+    """
+    if not Config.DEDUP_ENABLED or not chunks:
+        return chunks, ids, embeddings, []
+    
+    deduplicator = ChunkDeduplicator()
+    chunks, ids, embeddings, aliases = deduplicator.deduplicate(chunks, ids, embeddings)
+    
+    merged = dict(zip(*deduplicator.merged_metadata()))
+    for chunk, chunk_id in zip(chunks, ids):
+        if chunk_id in merged:
+            chunk.metadata = merged[chunk_id]
+    
+    deduplicator.print_report()
+    return chunks, ids, embeddings, aliases
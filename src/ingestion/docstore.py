@@ -0,0 +1,416 @@
+"""
+Document store - chunks as byte-offset records over memory-mapped source files
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from langchain_core.documents import Document
+from src.core.aliases import logical_name
+from src.core.config import Config
+from src.chunking import chunk_for_ingestion, ingestion_run
+from src.chunking.semantic import iter_semantic_file_chunks
+from src.ingestion.loader import decode_file, group_files, streams_files
+from src.ingestion.manifest import Manifest, file_snapshot
+
+# Source ID of chunks whose text could not be located in their file
+INLINE = 2 ** 32 - 1
+
+# Offset keys the store keeps in its own arrays instead of in metadata
+OFFSET_KEYS = ("start_index", "end_index", "byte_start", "byte_end")
+
+
+class StoredChunk:
+    """
+    Lightweight view of one chunk in a DocumentStore, usable wherever a
+    LangChain Document is read: `page_content` is decoded from the mapped
+    file on access and `metadata` is rebuilt from the record. Assigning
+    `metadata` keeps an override on the view.
+    """
+    
+    __slots__ = ("store", "index", "_metadata")
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self._metadata = None
+    
+    @property
+    def page_content(self):
+        return self.store.text(self.index)
+    
+    @property
+    def metadata(self):
+        if self._metadata is not None:
+            return self._metadata
+        return self.store.metadata(self.index)
+    
+    @metadata.setter
+    def metadata(self, value):
+        self._metadata = value
+    
+    def __repr__(self):
+        return f"StoredChunk(index={self.index}, metadata={self.metadata})"
+
+
+class DocumentStore:
+    """
+    Compact chunk records - (source ID, byte start, byte end, metadata ID)
+    plus the character offsets the chunkers report - kept in typed arrays.
+    Source files are memory-mapped lazily and metadata dicts are interned,
+    so memory grows with the number of chunks rather than with their text.
+    """
+    
+    def __init__(self):
+        self._sources = []
+        self._source_ids = {}
+        self._maps = {}
+        self._metadata = []
+        self._metadata_ids = {}
+        self._inline = bytearray()
+        self._lock = threading.Lock()
+        
+        self.source_ids = array("I")
+        self.byte_starts = array("Q")
+        self.byte_ends = array("Q")
+        self.char_starts = array("q")
+        self.char_ends = array("q")
+        self.metadata_ids = array("I")
+    
+    def __len__(self):
+        return len(self.source_ids)
+    
+    def __getitem__(self, index):
+        return StoredChunk(self, index)
+    
+    def __iter__(self):
+        return (StoredChunk(self, i) for i in range(len(self)))
+    
+    def _intern_source(self, path):
+        source_id = self._source_ids.get(path)
+        if source_id is None:
+            source_id = self._source_ids[path] = len(self._sources)
+            self._sources.append(path)
+        return source_id
+    
+    def _intern_metadata(self, metadata):
+        key = json.dumps(metadata, sort_keys=True, default=str)
+        metadata_id = self._metadata_ids.get(key)
+        if metadata_id is None:
+            metadata_id = self._metadata_ids[key] = len(self._metadata)
+            self._metadata.append(dict(metadata))
+        return metadata_id
+    
+    def add(self, source, metadata, char_start, char_end, byte_start, byte_end, inline_text=None):
+        """
+        Append one chunk record
+        
+        Args:
+            source: Source file path
+            metadata: Chunk metadata without offsets (interned)
+            char_start: Character offset in the decoded text, or -1
+            char_end: Character end offset, or -1
+            byte_start: Byte offset in the file
+            byte_end: Byte end offset in the file
+            inline_text: Chunk text to keep in memory when it isn't a slice of the file
+        
+        Returns:
+            int: Index of the new record
+        """
+        if inline_text is not None:
+            encoded = inline_text.encode("utf-8")
+            source_id = INLINE
+            byte_start = len(self._inline)
+            byte_end = byte_start + len(encoded)
+            self._inline.extend(encoded)
+        else:
+            source_id = self._intern_source(source)
+        
+        self.source_ids.append(source_id)
+        self.byte_starts.append(byte_start)
+        self.byte_ends.append(byte_end)
+        self.char_starts.append(char_start)
+        self.char_ends.append(char_end)
+        self.metadata_ids.append(self._intern_metadata(metadata))
+        return len(self.source_ids) - 1
+    
+    def _map(self, source_id):
+        mapped = self._maps.get(source_id)
+        if mapped is None:
+            with self._lock:
+                mapped = self._maps.get(source_id)
+                if mapped is None:
+                    mapped = self._maps[source_id] = map_file(self._sources[source_id])
+        return mapped
+    
+    def text(self, index):
+        """Decode the text of a chunk from its mapped file"""
+        source_id = self.source_ids[index]
+        start, end = self.byte_starts[index], self.byte_ends[index]
+        if source_id == INLINE:
+            return self._inline[start:end].decode("utf-8")
+        return self._map(source_id)[start:end].decode("utf-8")
+    
+    def metadata(self, index):
+        """Metadata of a chunk, with its offsets (a new dict on every call)"""
+        metadata = dict(self._metadata[self.metadata_ids[index]])
+        if self.char_starts[index] >= 0:
+            metadata["start_index"] = self.char_starts[index]
+            metadata["end_index"] = self.char_ends[index]
+        if self.source_ids[index] != INLINE:
+            metadata["byte_start"] = self.byte_starts[index]
+            metadata["byte_end"] = self.byte_ends[index]
+        return metadata
+    
+    def close(self):
+        """Unmap all source files"""
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps = {}
+
+
+def map_file(path):
+    """
+    Memory-map a file read-only
+    
+    Args:
+        path: File path
+    
+    Returns:
+        mmap or bytes: The mapping (empty bytes for an empty file, which can't be mapped)
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def close_chunks(chunks):
+    """
+    Unmap the files behind StoredChunk views
+    
+    Call once the chunks have been written, so a long-running process (e.g.
+    watch mode) doesn't keep mappings of files that may be truncated later.
+    
+    Args:
+        chunks: Chunks from load_into_docstore (other Documents are ignored)
+    """
+    stores = {id(chunk.store): chunk.store for chunk in chunks if isinstance(chunk, StoredChunk)}
+    for store in stores.values():
+        store.close()
+
+
+def locate_chunks(text, raw, chunks):
+    """
+    Byte offsets of chunks within their source file
+    
+    Character offsets from the chunkers ("start_index"/"end_index") are
+    used when present, otherwise the chunk text is searched for from the
+    previous chunk onwards. Offsets are only trusted if the file bytes
+    decode to exactly the chunk text (e.g. CRLF files do not, since the
+    loader translates newlines).
+    
+    Args:
+        text: Decoded document text the chunks were cut from
+        raw: Raw file bytes (bytes or mmap)
+        chunks: Chunk Documents of this document, in order
+    
+    Yields:
+        tuple: (char start, char end, byte start, byte end), or None for a
+            chunk that is not a slice of the file
+    """
+    ascii_only = text.isascii()
+    cursor_char, cursor_byte = 0, 0
+    search_from = 0
+    
+    def byte_offset(char_index):
+        nonlocal cursor_char, cursor_byte
+        if ascii_only:
+            return char_index
+        # Move a cursor instead of encoding the prefix every time; chunks
+        # come in order, so each step only encodes the gap (or the overlap)
+        if char_index >= cursor_char:
+            cursor_byte += len(text[cursor_char:char_index].encode("utf-8"))
+        else:
+            cursor_byte -= len(text[char_index:cursor_char].encode("utf-8"))
+        cursor_char = char_index
+        return cursor_byte
+    
+    for chunk in chunks:
+        content = chunk.page_content
+        char_start = chunk.metadata.get("start_index", -1)
+        char_end = chunk.metadata.get("end_index", -1)
+        if char_start < 0 or text[char_start:char_end] != content:
+            char_start = text.find(content, search_from)
+            if char_start < 0:
+                char_start = text.find(content)
+            if char_start < 0 or not content:
+                yield None
+                continue
+            char_end = char_start + len(content)
+        search_from = char_start
+        
+        byte_start = byte_offset(char_start)
+        byte_end = byte_offset(char_end)
+        if raw[byte_start:byte_end] != content.encode("utf-8"):
+            yield None
+            continue
+        yield char_start, char_end, byte_start, byte_end
+
+
+def chunk_file_records(paths, chunking_method, run=None):
+    """
+    Load and chunk files into offset records (runs inside a worker process)
+    
+    Each file is mapped once and its text decoded straight from the mapping,
+    which is then used to locate the chunks. Only offsets and metadata are
+    returned, so chunk text never has to be sent back from the worker unless
+    it could not be located in the file.
+    
+    Args:
+        paths: File paths
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        run: Optional state from ingestion_run(), shared across groups
+    
+    Returns:
+        tuple: (records, precomputed embeddings or None, snapshots) where each
+            record is (source, metadata, char start, char end, byte start,
+            byte end, inline text) and snapshots maps each path to the
+            file_snapshot() of the content chunked
+    """
+    records, all_embeddings, snapshots = [], [], {}
+    with_embeddings = False
+    
+    if streams_files(chunking_method):
+        # The file is only read in blocks and streamed chunks carry character
+        # offsets but no byte offsets, so their text is kept inline
+        for chunk in iter_semantic_file_chunks(paths, snapshots=snapshots):
+            metadata = {k: v for k, v in chunk.metadata.items() if k not in OFFSET_KEYS}
+            records.append((chunk.metadata["source"], metadata, chunk.metadata["start_index"],
+                            chunk.metadata["end_index"], 0, 0, chunk.page_content))
+        return records, None, snapshots
+    
+    for source in paths:
+        stat = os.stat(source)
+        raw = map_file(source)
+        snapshots[source] = file_snapshot(hashlib.sha256(raw).hexdigest(), stat)
+        doc = Document(page_content=decode_file(raw), metadata={"source": source})
+        print(f"✓ Loaded: {os.path.basename(source)} ({len(doc.page_content)} chars)")
+        chunks, embeddings = chunk_for_ingestion([doc], chunking_method, run)
+        if embeddings is not None:
+            with_embeddings = True
+            all_embeddings.extend(embeddings)
+        
+        interned = {}
+        for chunk, offsets in zip(chunks, locate_chunks(doc.page_content, raw, chunks)):
+            metadata = {k: v for k, v in chunk.metadata.items() if k not in OFFSET_KEYS}
+            key = json.dumps(metadata, sort_keys=True, default=str)
+            # One dict object per distinct metadata, so pickling sends it once
+            metadata = interned.setdefault(key, metadata)
+            if offsets is None:
+                char_start = chunk.metadata.get("start_index", -1)
+                char_end = chunk.metadata.get("end_index", -1)
+                records.append((source, metadata, char_start, char_end, 0, 0, chunk.page_content))
+            else:
+                records.append((source, metadata, *offsets, None))
+        
+        if isinstance(raw, mmap.mmap):
+            raw.close()
+    
+    return records, (all_embeddings if with_embeddings else None), snapshots
+
+
+def load_into_docstore(paths, chunking_method, workers=None, snapshots=None):
+    """
+    Load and chunk files into a DocumentStore, across a process pool
+    
+    Args:
+        paths: File paths
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        workers: Number of processes (defaults to config)
+        snapshots: Optional dict filled with path -> file_snapshot() of the content chunked
+    
+    Returns:
+        tuple: (list of StoredChunk views in file order, precomputed embeddings or None)
+    """
+    workers = workers or Config.INGESTION_WORKERS
+    groups = group_files(paths)
+    store = DocumentStore()
+    if not groups:
+        return [], None
+    
+    # Agentic chunking is rate limited per process
+    if chunking_method == "agentic":
+        workers = 1
+    
+    workers = min(workers, len(groups))
+    start = time.perf_counter()
+    
+    if workers == 1:
+        with ingestion_run(chunking_method) as run:
+            results = [chunk_file_records(group, chunking_method, run) for group in groups]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(chunk_file_records, groups, repeat(chunking_method)))
+    
+    all_embeddings = []
+    with_embeddings = any(embeddings is not None for _, embeddings, _ in results)
+    for records, embeddings, group_snapshots in results:
+        if snapshots is not None:
+            snapshots.update(group_snapshots)
+        for record in records:
+            store.add(*record)
+        if with_embeddings:
+            all_embeddings.extend(embeddings or [])
+    
+    inline = sum(1 for source_id in store.source_ids if source_id == INLINE)
+    print(f"📄 {len(store)} chunks from {len(paths)} files in {time.perf_counter() - start:.2f}s "
+          f"(document store, {inline} held in memory)")
+    return list(store), (all_embeddings if with_embeddings else None)
+
+
+def rehydrate_documents(docs, collection_name):
+    """
+    Fill in the text of retrieved chunks that were stored without it
+    
+    Text is read back from the local source file using the chunk's byte
+    offsets, as long as the file is unchanged since it was ingested.
+    
+    Args:
+        docs: Retrieved Document objects (updated in place)
+        collection_name: Name of the collection or of one of its versions (for its manifest)
+    
+    Returns:
+        list: The same documents
+    """
+    pending = [
+        doc for doc in docs
+        if not doc.page_content and "byte_end" in doc.metadata and doc.metadata.get("source")
+    ]
+    if not pending:
+        return docs
+    
+    manifest = Manifest.load(logical_name(collection_name))
+    for doc in pending:
+        source = doc.metadata["source"]
+        entry = manifest.files.get(source)
+        try:
+            stat = os.stat(source)
+        except OSError:
+            stat = None
+        if entry is None or stat is None or (entry["mtime"], entry["size"]) != (stat.st_mtime, stat.st_size):
+            print(f"⚠️  {source} changed since it was ingested - re-run ingestion to refresh its chunks")
+            continue
+        
+        with open(source, "rb") as f:
+            f.seek(doc.metadata["byte_start"])
+            doc.page_content = f.read(doc.metadata["byte_end"] - doc.metadata["byte_start"]).decode("utf-8")
+    
+    return docs
@@ -2,16 +2,58 @@
 Document loading utilities
 """
 
+import hashlib
 import os
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from langchain_core.documents import Document
+from src.core.config import Config
+from src.chunking import chunk_for_ingestion, ingestion_run
+from src.chunking.semantic import iter_semantic_file_chunks
+from src.ingestion.manifest import file_snapshot
 
 
-def load_documents(docs_dir="docs"):
+def decode_file(raw):
+    """
+    Decode file bytes the way TextLoader reads the file
+    
+    Args:
+        raw: Raw file bytes (bytes or mmap)
+    
+    Returns:
+        str: UTF-8 text with CRLF and CR newlines translated to LF
+    """
+    text = str(raw, "utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_file(path):
+    """
+    Read a text file once, keeping a snapshot of what was read
+    
+    Args:
+        path: File path
+    
+    Returns:
+        tuple: (decoded text, file_snapshot() of the bytes read)
+    """
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        raw = f.read()
+    return decode_file(raw), file_snapshot(hashlib.sha256(raw).hexdigest(), stat)
+
+
+def load_documents(docs_dir="docs", snapshots=None):
     """
     Load all text documents from the specified directory
     
     Args:
         docs_dir: Directory containing text documents
+        snapshots: Optional dict filled with path -> file_snapshot() of the content loaded
     
     Returns:
         list: List of LangChain Document objects
@@ -20,19 +62,161 @@ def load_documents(docs_dir="docs"):
         print(f"❌ Directory {docs_dir} not found!")
         return []
     
-    loader = DirectoryLoader(
-        docs_dir,
-        glob="**/*.txt",
-        loader_cls=TextLoader,
-        loader_kwargs={"encoding": "utf-8"}
-    )
+    documents = load_files(discover_files(docs_dir), snapshots)
+    
+    print(f"\n📚 Total documents loaded: {len(documents)}")
+    return documents
+
+
+def discover_files(docs_dir="docs"):
+    """
+    Find all text documents in the specified directory
+    
+    Args:
+        docs_dir: Directory containing text documents
     
-    documents = loader.load()
+    Returns:
+        list: Sorted file paths, in the same form as Document "source" metadata
+    """
+    if not os.path.exists(docs_dir):
+        return []
+    return sorted(str(path) for path in Path(docs_dir).glob("**/*.txt") if path.is_file())
+
+
+def load_files(paths, snapshots=None):
+    """
+    Load specific text files
     
-    # Print loaded documents info
-    for doc in documents:
-        source = doc.metadata.get("source", "Unknown")
-        print(f"✓ Loaded: {os.path.basename(source)} ({len(doc.page_content)} chars)")
+    Args:
+        paths: List of file paths
+        snapshots: Optional dict filled with path -> file_snapshot() of the content loaded
     
-    print(f"\n📚 Total documents loaded: {len(documents)}")
+    Returns:
+        list: List of LangChain Document objects
+    """
+    documents = []
+    for path in paths:
+        text, snapshot = read_file(path)
+        if snapshots is not None:
+            snapshots[path] = snapshot
+        print(f"✓ Loaded: {os.path.basename(path)} ({len(text)} chars)")
+        documents.append(Document(page_content=text, metadata={"source": path}))
     return documents
+
+
+def group_files(paths, target_bytes=None):
+    """
+    Group consecutive files into tasks of roughly target_bytes each
+    
+    Small files share a task so the pool isn't dominated by scheduling
+    overhead; a file larger than the target gets a task of its own.
+    
+    Args:
+        paths: File paths (order is preserved)
+        target_bytes: Approximate bytes per group (defaults to config)
+    
+    Returns:
+        list: List of path lists
+    """
+    target_bytes = target_bytes or Config.INGESTION_GROUP_BYTES
+    groups = []
+    current, current_bytes = [], 0
+    
+    for path in paths:
+        size = os.path.getsize(path)
+        if current and current_bytes + size > target_bytes:
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += size
+    
+    if current:
+        groups.append(current)
+    return groups
+
+
+def streams_files(chunking_method):
+    """
+    Whether files are chunked straight from disk in blocks instead of being
+    loaded whole first (streaming semantic chunking)
+    """
+    return (chunking_method == "semantic" and Config.SEMANTIC_STREAMING
+            and not Config.SEMANTIC_REUSE_EMBEDDINGS)
+
+
+def load_and_chunk_files(paths, chunking_method, run=None, snapshots=None):
+    """
+    Load and chunk a group of files
+    
+    Args:
+        paths: File paths
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        run: Optional state from ingestion_run(), shared across groups
+        snapshots: Optional dict filled with path -> file_snapshot() of the content chunked
+    
+    Returns:
+        tuple: (chunks, precomputed embeddings or None)
+    """
+    if streams_files(chunking_method):
+        return list(iter_semantic_file_chunks(paths, snapshots=snapshots)), None
+    docs = load_files(paths, snapshots)
+    if not docs:
+        return [], None
+    return chunk_for_ingestion(docs, chunking_method, run)
+
+
+def _load_and_chunk_group(paths, chunking_method):
+    """load_and_chunk_files() in a worker process, returning the snapshots too"""
+    snapshots = {}
+    chunks, embeddings = load_and_chunk_files(paths, chunking_method, snapshots=snapshots)
+    return chunks, embeddings, snapshots
+
+
+def load_and_chunk_parallel(paths, chunking_method, workers=None, snapshots=None):
+    """
+    Load and chunk files across a process pool
+    
+    Results come back in the order of `paths`, whatever order the workers
+    finish in, so chunk order and IDs are identical to a sequential run.
+    
+    Args:
+        paths: File paths
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        workers: Number of processes (defaults to config)
+        snapshots: Optional dict filled with path -> file_snapshot() of the content chunked
+    
+    Returns:
+        tuple: (chunks, precomputed embeddings or None)
+    """
+    workers = workers or Config.INGESTION_WORKERS
+    groups = group_files(paths)
+    if not groups:
+        return [], None
+    
+    # Agentic chunking is rate limited per process; more processes would
+    # multiply the request rate instead of speeding anything up
+    if chunking_method == "agentic":
+        workers = 1
+    
+    workers = min(workers, len(groups))
+    print(f"🧵 Loading and chunking {len(paths)} files in {len(groups)} tasks across {workers} processes")
+    start = time.perf_counter()
+    
+    if workers == 1:
+        with ingestion_run(chunking_method) as run:
+            results = [(*load_and_chunk_files(group, chunking_method, run, snapshots), {}) for group in groups]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_load_and_chunk_group, groups, repeat(chunking_method)))
+    
+    all_chunks, all_embeddings = [], []
+    with_embeddings = any(embeddings is not None for _, embeddings, _ in results)
+    for chunks, embeddings, group_snapshots in results:
+        if snapshots is not None:
+            snapshots.update(group_snapshots)
+        all_chunks.extend(chunks)
+        if with_embeddings:
+            all_embeddings.extend(embeddings or [])
+    
+    print(f"📄 {len(all_chunks)} chunks from {len(paths)} files in {time.perf_counter() - start:.2f}s")
+    return all_chunks, (all_embeddings if with_embeddings else None)
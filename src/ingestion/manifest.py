@@ -0,0 +1,193 @@
+"""
+Ingestion manifest - tracks which source files are indexed and their chunk IDs
+"""
+
+import hashlib
+import json
+import os
+from src.core.config import Config
+
+
+def make_chunk_id(source, method, content):
+    """
+    Deterministic chunk ID from (source, chunking method, content hash)
+    
+    Args:
+        source: Source file path
+        method: Chunking method name
+        content: Chunk text
+    
+    Returns:
+        str: Stable ID, identical across runs for identical chunks
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{source}|{method}|{content_hash}".encode("utf-8")).hexdigest()[:32]
+
+
+def assign_chunk_ids(chunks, method, embeddings=None, seen=None):
+    """
+    Give every chunk its deterministic ID, dropping repeats within a source
+    
+    Args:
+        chunks: List of LangChain Document objects
+        method: Chunking method name
+        embeddings: Optional vectors aligned with chunks
+        seen: Optional set of IDs assigned by earlier calls (updated), to
+            continue across the pieces of one streamed file
+    
+    Returns:
+        tuple: (chunks, ids, embeddings or None) with duplicate IDs removed
+    """
+    seen = set() if seen is None else seen
+    kept_chunks, ids, kept_embeddings = [], [], []
+    
+    for i, chunk in enumerate(chunks):
+        chunk_id = make_chunk_id(chunk.metadata.get("source", ""), method, chunk.page_content)
+        if chunk_id in seen:
+            continue
+        seen.add(chunk_id)
+        kept_chunks.append(chunk)
+        ids.append(chunk_id)
+        if embeddings is not None:
+            kept_embeddings.append(embeddings[i])
+    
+    return kept_chunks, ids, (kept_embeddings if embeddings is not None else None)
+
+
+def hash_file(path):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_snapshot(sha256, stat):
+    """
+    Manifest fields for file content as it was read
+    
+    Args:
+        sha256: Hex SHA-256 of the bytes that were read
+        stat: os.stat() of the file taken before reading it, so an edit
+            made during or after the read always changes the mtime or size
+            the manifest compares against
+    
+    Returns:
+        dict: "sha256", "mtime" and "size"
+    """
+    return {"sha256": sha256, "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+class Manifest:
+    """
+    Per-collection record of ingested files: content hash, mtime, size and
+    the IDs of the chunks each file produced. Stored as JSON next to the
+    other local caches.
+    """
+    
+    def __init__(self, collection_name, path=None):
+        self.collection_name = collection_name
+        self.path = path or os.path.join(Config.MANIFEST_DIRECTORY, f"{collection_name}.json")
+        self.method = None
+        self.files = {}
+    
+    @classmethod
+    def load(cls, collection_name):
+        """Load the manifest for a collection (empty if none exists yet)"""
+        manifest = cls(collection_name)
+        if os.path.exists(manifest.path):
+            with open(manifest.path, "r") as f:
+                data = json.load(f)
+            manifest.method = data.get("method")
+            manifest.files = data.get("files", {})
+        return manifest
+    
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"method": self.method, "files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def reset(self, method):
+        """Forget all files, e.g. after a full rebuild or a chunking method change"""
+        self.method = method
+        self.files = {}
+    
+    def diff(self, paths):
+        """
+        Compare files on disk with the manifest
+        
+        Args:
+            paths: Source file paths currently on disk
+        
+        Returns:
+            dict: "added", "changed", "removed" and "unchanged" path lists
+        """
+        changes = {"added": [], "changed": [], "removed": [], "unchanged": []}
+        
+        for path in paths:
+            entry = self.files.get(path)
+            if entry is None:
+                changes["added"].append(path)
+                continue
+            
+            stat = os.stat(path)
+            # mtime and size unchanged: trust the manifest without re-hashing
+            if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                changes["unchanged"].append(path)
+            elif hash_file(path) == entry["sha256"]:
+                entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+                changes["unchanged"].append(path)
+            else:
+                changes["changed"].append(path)
+        
+        on_disk = set(paths)
+        changes["removed"] = sorted(path for path in self.files if path not in on_disk)
+        return changes
+    
+    def chunk_ids(self, path):
+        """IDs of the chunks currently indexed for a file"""
+        return self.files.get(path, {}).get("chunk_ids", [])
+    
+    def all_chunk_ids(self, exclude=()):
+        """
+        IDs referenced by any file in the manifest
+        
+        A chunk can be referenced by several files when the dedup stage
+        merged their copies into one.
+        
+        Args:
+            exclude: Paths to leave out
+        
+        Returns:
+            set: Chunk IDs
+        """
+        exclude = set(exclude)
+        return {
+            chunk_id
+            for path, entry in self.files.items() if path not in exclude
+            for chunk_id in entry.get("chunk_ids", [])
+        }
+    
+    def record(self, path, chunk_ids, snapshot=None):
+        """
+        Record a file as indexed with the given chunk IDs
+        
+        Args:
+            path: Source file path
+            chunk_ids: IDs of the chunks the file produced
+            snapshot: file_snapshot() of the content that was chunked. Without
+                one the file is hashed now, which would hide an edit made
+                since it was read
+        """
+        if snapshot is None:
+            stat = os.stat(path)
+            snapshot = file_snapshot(hash_file(path), stat)
+        self.files[path] = {**snapshot, "chunk_ids": list(chunk_ids)}
+    
+    def forget(self, path):
+        """Remove a file from the manifest"""
+        self.files.pop(path, None)
@@ -3,20 +3,176 @@ Complete ingestion pipeline
 """
 
 from src.core.config import Config
-from src.ingestion.loader import load_documents
-from src.chunking import chunk_documents
-from src.retrieval.vectorstore import create_vectorstore
+from src.core.database import backend_name
+from src.ingestion.loader import discover_files, load_and_chunk_files, load_and_chunk_parallel, load_documents, streams_files
+from src.ingestion.docstore import close_chunks, load_into_docstore
+from src.ingestion.dedup import DEDUP_METADATA_KEYS, deduplicate_chunks
+from src.ingestion.manifest import Manifest, assign_chunk_ids
+from src.chunking import chunk_for_ingestion
+from src.retrieval.vectorstore import create_vectorstore, delete_chunks, get_vectorstore, update_metadata, upsert_chunks
+from src.ingestion.streaming import run_streaming_ingestion
+from src.retrieval.checkpoint import UpsertCheckpoint
 from src.utils.file_utils import save_last_chunking_method
 
 
-def run_ingestion(docs_dir=None, collection_name=None, chunking_method=None):
+def group_ids_by_source(chunks, ids, aliases=()):
+    """
+    Map each source path to the IDs of its chunks
+    
+    Args:
+        chunks: List of LangChain Document objects
+        ids: Chunk IDs aligned with chunks
+        aliases: (source, surviving chunk ID) pairs for chunks dropped as duplicates
+    
+    Returns:
+        dict: Source path -> list of chunk IDs (without repeats)
+    """
+    ids_by_source = {}
+    pairs = [(chunk.metadata.get("source", ""), chunk_id) for chunk, chunk_id in zip(chunks, ids)]
+    for source, chunk_id in pairs + list(aliases):
+        source_ids = ids_by_source.setdefault(source, [])
+        if chunk_id not in source_ids:
+            source_ids.append(chunk_id)
+    return ids_by_source
+
+
+def ingest_changes(collection_name, chunking_method, manifest, changed_paths, removed_paths, docstore=None):
+    """
+    Apply added/changed/removed files to an existing collection
+    
+    Only chunks whose IDs are new get embedded and upserted; chunks that no
+    file references any more are deleted by ID.
+    
+    Args:
+        collection_name: Name of the collection
+        chunking_method: Chunking strategy
+        manifest: Manifest of the collection (updated and saved)
+        changed_paths: Added or modified files
+        removed_paths: Files deleted from disk
+        docstore: Keep chunks as offset records into the mapped files
+            (defaults to config). Pass False when the files may be rewritten
+            while they are ingested, so the text is copied when it is read
+    
+    Returns:
+        Chroma: The updated vector store
+    """
+    if docstore is None:
+        docstore = Config.DOCSTORE_ENABLED
+    vectorstore = get_vectorstore(collection_name)
+    
+    # Files sharing a deduplicated chunk with a touched file are re-chunked
+    # too, so the shared chunk is re-homed rather than left orphaned
+    touched = set(changed_paths) | set(removed_paths)
+    touched_ids = {chunk_id for path in touched for chunk_id in manifest.chunk_ids(path)}
+    sharing = sorted(
+        path for path in manifest.files
+        if path not in touched and touched_ids.intersection(manifest.chunk_ids(path))
+    )
+    if sharing:
+        print(f"🔗 Re-processing {len(sharing)} files that share deduplicated chunks")
+        changed_paths = list(changed_paths) + sharing
+    
+    # What each file held when it was read: recorded instead of re-hashing it
+    # afterwards, so an edit made while it's being ingested is seen next time
+    snapshots = {}
+    if docstore:
+        chunks, embeddings = load_into_docstore(changed_paths, chunking_method, snapshots=snapshots)
+    elif Config.INGESTION_WORKERS > 1:
+        chunks, embeddings = load_and_chunk_parallel(changed_paths, chunking_method, snapshots=snapshots)
+    else:
+        chunks, embeddings = load_and_chunk_files(changed_paths, chunking_method, snapshots=snapshots)
+    chunks, ids, embeddings = assign_chunk_ids(chunks, chunking_method, embeddings)
+    chunks, ids, embeddings, aliases = deduplicate_chunks(chunks, ids, embeddings)
+    ids_by_source = group_ids_by_source(chunks, ids, aliases)
+    
+    # A chunk may be shared by several files after dedup: only delete it once
+    # no untouched file references it
+    previous_ids = manifest.all_chunk_ids()
+    kept_elsewhere = manifest.all_chunk_ids(exclude=list(changed_paths) + list(removed_paths))
+    current_ids = {chunk_id for source_ids in ids_by_source.values() for chunk_id in source_ids}
+    stale_ids = sorted(previous_ids - kept_elsewhere - current_ids)
+    for path in removed_paths:
+        manifest.forget(path)
+    
+    new = [i for i, chunk_id in enumerate(ids) if chunk_id not in previous_ids]
+    unchanged = [i for i, chunk_id in enumerate(ids) if chunk_id in previous_ids]
+    print(f"🧮 {len(new)} new chunks, {len(unchanged)} unchanged, {len(stale_ids)} stale")
+    
+    delete_chunks(vectorstore, stale_ids)
+    # Same content can still have new offsets or duplicate sources: refresh
+    # the metadata without embedding again (None clears a stale dedup key)
+    update_metadata(
+        vectorstore,
+        [ids[i] for i in unchanged],
+        [{**dict.fromkeys(DEDUP_METADATA_KEYS), **chunks[i].metadata} for i in unchanged]
+    )
+    upsert_chunks(
+        vectorstore,
+        [chunks[i] for i in new],
+        ids=[ids[i] for i in new],
+        embeddings=[embeddings[i] for i in new] if embeddings is not None else None
+    )
+    # Don't keep the changed files mapped between runs: they may be truncated next
+    close_chunks(chunks)
+    
+    for path in changed_paths:
+        manifest.record(path, ids_by_source.get(path, []), snapshots.get(path))
+    manifest.method = chunking_method
+    manifest.save()
+    
+    return vectorstore
+
+
+def build_collection(collection_name, chunking_method, manifest, chunks, embeddings, checkpoint, resume,
+                     snapshots=None):
+    """
+    Assign IDs, deduplicate and write chunks into a rebuilt collection
+    
+    Args:
+        collection_name: Name of the collection
+        chunking_method: Chunking strategy
+        manifest: Manifest of the collection (reset, filled and saved)
+        chunks: List of chunked Document objects
+        embeddings: Precomputed vectors aligned with chunks, or None
+        checkpoint: UpsertCheckpoint recording committed batches
+        resume: Continue an interrupted rebuild instead of starting over
+        snapshots: path -> file_snapshot() of the content that was chunked
+    
+    Returns:
+        Chroma: The created vector store
+    """
+    chunks, ids, embeddings = assign_chunk_ids(chunks, chunking_method, embeddings)
+    chunks, ids, embeddings, aliases = deduplicate_chunks(chunks, ids, embeddings)
+    
+    # Step 3: Create vector store
+    print(f"\n🔄 Creating vector store on {backend_name()}...")
+    vectorstore = create_vectorstore(
+        chunks, collection_name, embeddings=embeddings, ids=ids, checkpoint=checkpoint, resume=resume
+    )
+    
+    manifest.reset(chunking_method)
+    for source, source_ids in group_ids_by_source(chunks, ids, aliases).items():
+        manifest.record(source, source_ids, (snapshots or {}).get(source))
+    manifest.save()
+    return vectorstore
+
+
+def run_ingestion(docs_dir=None, collection_name=None, chunking_method=None, incremental=None, streaming=None, resume=False,
+                  docstore=None):
     """
     Run the complete ingestion pipeline
     
     Args:
         docs_dir: Directory containing documents to ingest
         collection_name: Name of the ChromaDB Cloud collection
-        chunking_method: Chunking strategy - "semantic" or "agentic"
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        incremental: Only process added/changed/removed files (defaults to config)
+        streaming: Overlap loading, chunking, embedding and upserting on a
+            full rebuild (defaults to config)
+        resume: Continue an interrupted full rebuild from its checkpoint,
+            skipping chunks that were already committed
+        docstore: Read chunk text lazily from memory-mapped files (defaults
+            to config)
     
     Returns:
         Chroma: The vector store with ingested documents
@@ -25,23 +181,97 @@ def run_ingestion(docs_dir=None, collection_name=None, chunking_method=None):
     docs_dir = docs_dir or Config.DOCS_DIRECTORY
     collection_name = collection_name or Config.DEFAULT_COLLECTION
     chunking_method = chunking_method or Config.DEFAULT_CHUNKING_METHOD
+    if incremental is None:
+        incremental = Config.INCREMENTAL_INGESTION
+    if streaming is None:
+        streaming = Config.STREAMING_INGESTION
+    if docstore is None:
+        docstore = Config.DOCSTORE_ENABLED
     
-    print(f"=== Starting Document Ingestion (LangChain + ChromaDB Cloud) ===")
+    print(f"=== Starting Document Ingestion (LangChain + {backend_name()}) ===")
     print(f"📊 Chunking method: {chunking_method.upper()}\n")
     
-    # Step 1: Load documents
-    docs = load_documents(docs_dir)
+    manifest = Manifest.load(collection_name)
+    checkpoint = UpsertCheckpoint(collection_name)
+    resuming = resume and checkpoint.exists()
+    if resume and not resuming:
+        print("ℹ️  No interrupted ingestion to resume, starting normally\n")
     
-    if not docs:
-        print("\n❌ No documents loaded. Please add .txt files to the docs/ directory.")
-        return None
+    # A rebuild writes a new collection version; the manifest keeps describing
+    # the live one until the rebuild has switched over
+    full_rebuild = resuming or not (incremental and manifest.files and manifest.method == chunking_method)
     
-    # Step 2: Split documents into chunks
-    chunks = chunk_documents(docs, method=chunking_method)
-    
-    # Step 3: Create vector store
-    print("\n🔄 Creating vector store on ChromaDB Cloud...")
-    vectorstore = create_vectorstore(chunks, collection_name)
+    if not full_rebuild:
+        # Incremental: only touch files that changed since the last ingest
+        changes = manifest.diff(discover_files(docs_dir))
+        print(f"📋 {len(changes['added'])} added, {len(changes['changed'])} changed, "
+              f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged files")
+        
+        if not (changes["added"] or changes["changed"] or changes["removed"]):
+            manifest.save()
+            print("\n✅ Nothing to do - the collection is up to date.")
+            return get_vectorstore(collection_name)
+        
+        print(f"\n🔄 Updating vector store on {backend_name()}...")
+        vectorstore = ingest_changes(
+            collection_name,
+            chunking_method,
+            manifest,
+            changes["added"] + changes["changed"],
+            changes["removed"],
+            docstore=docstore
+        )
+    elif streaming:
+        vectorstore = run_streaming_ingestion(
+            docs_dir, collection_name, chunking_method, manifest, checkpoint=checkpoint, resume=resuming
+        )
+        if vectorstore is None:
+            return None
+    elif docstore or Config.INGESTION_WORKERS > 1:
+        # Step 1 + 2: Load and chunk files across worker processes
+        paths = discover_files(docs_dir)
+        
+        if not paths:
+            print("\n❌ No documents loaded. Please add .txt files to the docs/ directory.")
+            return None
+        
+        snapshots = {}
+        if docstore:
+            # Chunks stay offset records into the mapped files until read
+            chunks, embeddings = load_into_docstore(paths, chunking_method, snapshots=snapshots)
+        else:
+            chunks, embeddings = load_and_chunk_parallel(paths, chunking_method, snapshots=snapshots)
+        vectorstore = build_collection(
+            collection_name, chunking_method, manifest, chunks, embeddings, checkpoint, resuming, snapshots
+        )
+        close_chunks(chunks)
+    elif streams_files(chunking_method):
+        # Step 1 + 2: Chunk files as they are read, without loading them whole
+        paths = discover_files(docs_dir)
+        
+        if not paths:
+            print("\n❌ No documents loaded. Please add .txt files to the docs/ directory.")
+            return None
+        
+        snapshots = {}
+        chunks, embeddings = load_and_chunk_files(paths, chunking_method, snapshots=snapshots)
+        vectorstore = build_collection(
+            collection_name, chunking_method, manifest, chunks, embeddings, checkpoint, resuming, snapshots
+        )
+    else:
+        # Step 1: Load documents
+        snapshots = {}
+        docs = load_documents(docs_dir, snapshots)
+        
+        if not docs:
+            print("\n❌ No documents loaded. Please add .txt files to the docs/ directory.")
+            return None
+        
+        # Step 2: Split documents into chunks
+        chunks, embeddings = chunk_for_ingestion(docs, chunking_method)
+        vectorstore = build_collection(
+            collection_name, chunking_method, manifest, chunks, embeddings, checkpoint, resuming, snapshots
+        )
     
     # Save the chunking method used
     save_last_chunking_method(chunking_method)
@@ -49,6 +279,6 @@ def run_ingestion(docs_dir=None, collection_name=None, chunking_method=None):
     
     doc_count = vectorstore._collection.count()
     print(f"\n✅ Ingestion complete! Your documents are now ready for RAG queries.")
-    print(f"📊 ChromaDB Cloud collection contains {doc_count} documents")
+    print(f"📊 {backend_name()} collection contains {doc_count} documents")
     
     return vectorstore
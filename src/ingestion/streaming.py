@@ -0,0 +1,415 @@
+"""
+Streaming ingestion - load, chunk, embed and upsert as overlapping stages
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.core.config import Config
+from src.chunking import chunk_for_ingestion, ingestion_run
+from src.chunking.semantic import iter_semantic_file_chunks
+from src.ingestion.loader import discover_files, load_files, streams_files
+from src.ingestion.dedup import ChunkDeduplicator
+from src.ingestion.manifest import assign_chunk_ids
+from src.embeddings.cache import print_cache_stats
+from src.retrieval.vectorstore import begin_rebuild, finish_rebuild, update_metadata, write_chunks
+
+_DONE = object()
+
+
+class StageStats:
+    """Counters for one pipeline stage"""
+    
+    def __init__(self, name, unit):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.units = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+    
+    def add(self, units, busy, starved, blocked):
+        with self._lock:
+            self.items += 1
+            self.units += units
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+    
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+
+class Stage:
+    """
+    One step of the pipeline: `fn(item)` returns an iterable of outputs for
+    the next stage and runs on `workers` threads. Outputs are passed on as
+    they are produced, so a generator feeds the next stage before it is
+    done. `finish()`, if given, runs once after the last input and may
+    return trailing outputs (e.g. a partially filled batch).
+    """
+    
+    def __init__(self, name, fn, workers=1, unit="items", size=None, finish=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.finish = finish
+        self.size = size or (lambda item: 1)
+        self.stats = StageStats(name, unit)
+
+
+class Pipeline:
+    """
+    Runs stages on their own thread pools, connected by bounded queues.
+    A full queue blocks its producer, so at most `queue_depth` items wait
+    between any two stages and memory stays bounded regardless of corpus
+    size. Total time tends towards the slowest stage instead of the sum.
+    """
+    
+    def __init__(self, stages, queue_depth=None):
+        self.stages = stages
+        self.queue_depth = queue_depth or Config.INGESTION_QUEUE_DEPTH
+        self._failed = threading.Event()
+        self._error = None
+    
+    def _put(self, q, item):
+        """Put with a timeout loop so a failure elsewhere can't deadlock us"""
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def _get(self, q):
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+    
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._failed.set()
+    
+    @property
+    def failed(self):
+        return self._failed.is_set()
+    
+    def _worker(self, stage, inbox, outbox, remaining, lock, downstream_workers):
+        stats = stage.stats
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = self._get(inbox)
+                starved = time.perf_counter() - wait_start
+                if item is _DONE:
+                    break
+                
+                busy_start = time.perf_counter()
+                blocked = 0.0
+                for output in stage.fn(item):
+                    put_start = time.perf_counter()
+                    self._put(outbox, output)
+                    blocked += time.perf_counter() - put_start
+                busy = time.perf_counter() - busy_start - blocked
+                stats.add(stage.size(item), busy, starved, blocked)
+            
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and not self._failed.is_set():
+                # Last worker out flushes the stage and signals the next one
+                for output in (stage.finish() if stage.finish else []):
+                    self._put(outbox, output)
+                stats.finished = time.perf_counter()
+                for _ in range(downstream_workers):
+                    self._put(outbox, _DONE)
+        except Exception as e:
+            self._fail(e)
+    
+    def run(self, source):
+        """
+        Feed items from `source` through all stages
+        
+        Args:
+            source: Iterable of inputs for the first stage
+        
+        Returns:
+            list: StageStats for every stage
+        """
+        queues = [queue.Queue(maxsize=self.queue_depth) for _ in range(len(self.stages) + 1)]
+        threads = []
+        start = time.perf_counter()
+        
+        for i, stage in enumerate(self.stages):
+            stage.stats.started = start
+            downstream = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[i], queues[i + 1], remaining, lock, downstream),
+                    name=f"{stage.name}-{n}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+        
+        # The final queue only carries completion markers; drain it so the
+        # last stage never blocks
+        drainer = threading.Thread(target=self._drain, args=(queues[-1],), daemon=True)
+        drainer.start()
+        
+        try:
+            for item in source:
+                if self._failed.is_set():
+                    break
+                self._put(queues[0], item)
+            for _ in range(self.stages[0].workers):
+                self._put(queues[0], _DONE)
+        except Exception as e:
+            self._fail(e)
+        
+        for thread in threads:
+            thread.join()
+        self._failed.set()
+        drainer.join()
+        
+        if self._error is not None:
+            raise self._error
+        return [stage.stats for stage in self.stages]
+    
+    def _drain(self, q):
+        while True:
+            try:
+                q.get(timeout=0.1)
+            except queue.Empty:
+                if self._failed.is_set():
+                    return
+
+
+def print_pipeline_stats(stats, elapsed):
+    """Print per-stage throughput and queue stall time"""
+    print(f"\n⏱️  Pipeline finished in {elapsed:.2f}s")
+    for s in stats:
+        rate = s.units / s.elapsed if s.elapsed else 0.0
+        print(f"   {s.name:<7} {s.units:>7} {s.unit:<6} {rate:>9.1f}/s  "
+              f"busy {s.busy:6.2f}s  waiting for input {s.starved:6.2f}s  "
+              f"blocked on output {s.blocked:6.2f}s")
+
+
+class _Batcher:
+    """Regroups per-document chunks into fixed-size batches across documents"""
+    
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+    
+    def add(self, rows):
+        with self._lock:
+            self._pending.extend(rows)
+            batches = []
+            while len(self._pending) >= self.batch_size:
+                batches.append(self._pending[:self.batch_size])
+                del self._pending[:self.batch_size]
+        return batches
+    
+    def flush(self):
+        with self._lock:
+            batches = [self._pending] if self._pending else []
+            self._pending = []
+        return batches
+
+
+def run_streaming_ingestion(docs_dir, collection_name, chunking_method, manifest, checkpoint=None, resume=False):
+    """
+    Rebuild a collection with all stages running concurrently
+    
+    Args:
+        docs_dir: Directory containing documents to ingest
+        collection_name: Logical name of the collection (rebuilt as a new version)
+        chunking_method: Chunking strategy - "character", "semantic" or "agentic"
+        manifest: Manifest of the collection (reset, filled and saved)
+        checkpoint: Optional UpsertCheckpoint recording committed batches
+        resume: Continue an interrupted rebuild recorded in the checkpoint
+            instead of starting a new version
+    
+    Returns:
+        Chroma: The vector store, or None if there was nothing to ingest
+    """
+    paths = discover_files(docs_dir)
+    if not paths:
+        print("\n❌ No documents loaded. Please add .txt files to the docs/ directory.")
+        return None
+    
+    print(f"🚰 Streaming {len(paths)} files through load → chunk → dedup → embed → upsert")
+    
+    # CPU-bound chunking goes to worker processes. Agentic chunking waits on
+    # the LLM: its chunk threads share one rate limiter and window pool for
+    # the whole run, so several documents are in flight under one RPM limit
+    pool = None
+    file_streaming = streams_files(chunking_method)
+    if chunking_method == "agentic":
+        chunk_workers = max(Config.INGESTION_CHUNK_WORKERS, Config.AGENTIC_MAX_CONCURRENCY)
+    elif file_streaming:
+        # Streamed chunking waits on sentence embeddings, not the CPU: threads
+        # keep its batches flowing to the embed stage while the file is read
+        chunk_workers = max(Config.INGESTION_WORKERS, Config.INGESTION_CHUNK_WORKERS)
+    elif Config.INGESTION_WORKERS > 1:
+        chunk_workers = Config.INGESTION_WORKERS
+        pool = ProcessPoolExecutor(max_workers=chunk_workers)
+        # Start the processes now, before the pipeline's threads exist
+        list(pool.map(int, range(chunk_workers)))
+    else:
+        chunk_workers = Config.INGESTION_CHUNK_WORKERS
+    
+    # Queries keep hitting the live version until the new one is complete
+    vectorstore = begin_rebuild(collection_name, checkpoint, resume)
+    skipped = [0]
+    embedding_model = vectorstore.embeddings
+    batcher = _Batcher(Config.INGESTION_BATCH_SIZE)
+    deduplicator = ChunkDeduplicator() if Config.DEDUP_ENABLED else None
+    ids_by_source = {}
+    # Content of each file as it was read, for the manifest
+    snapshots = {}
+    # Files are chunked concurrently but deduplicated one at a time in path
+    # order, so the same copy of a duplicate survives on every run and chunk
+    # IDs stay stable for --resume. At most `window` files are in flight
+    # past the oldest unfinished one, which bounds the reorder buffer
+    window = chunk_workers + Config.INGESTION_QUEUE_DEPTH
+    in_flight = threading.Semaphore(window)
+    pending = {}
+    next_file = [0]
+    
+    def numbered_paths():
+        for item in enumerate(paths):
+            while not in_flight.acquire(timeout=0.1):
+                if pipeline.failed:
+                    return
+            yield item
+    
+    def load(item):
+        index, path = item
+        # Streamed files are read block by block in the chunk stage instead
+        return [(index, path, None if file_streaming else load_files([path], snapshots))]
+    
+    def pieces(path, docs):
+        """(chunks, embeddings) of one file, a batch at a time when streaming"""
+        if file_streaming:
+            piece = []
+            for chunk in iter_semantic_file_chunks([path], snapshots=snapshots):
+                piece.append(chunk)
+                if len(piece) == Config.INGESTION_BATCH_SIZE:
+                    yield piece, None
+                    piece = []
+            yield piece, None
+        elif not docs:
+            return
+        elif pool is not None:
+            yield pool.submit(chunk_for_ingestion, docs, chunking_method).result()
+        else:
+            yield chunk_for_ingestion(docs, chunking_method, run)
+    
+    def chunk(item):
+        index, path, docs = item
+        seen = set()
+        for chunks, embeddings in pieces(path, docs):
+            chunks, ids, embeddings = assign_chunk_ids(chunks, chunking_method, embeddings, seen)
+            yield index, path, chunks, ids, embeddings, False
+        # End-of-file marker for the dedup stage
+        yield index, path, [], [], None, True
+    
+    def process(path, chunks, ids, embeddings):
+        aliases = []
+        if deduplicator is not None:
+            chunks, ids, embeddings, aliases = deduplicator.deduplicate(chunks, ids, embeddings)
+        for chunk_id in ids:
+            ids_by_source.setdefault(path, []).append(chunk_id)
+        for alias_source, chunk_id in aliases:
+            source_ids = ids_by_source.setdefault(alias_source, [])
+            if chunk_id not in source_ids:
+                source_ids.append(chunk_id)
+        vectors = embeddings if embeddings is not None else [None] * len(chunks)
+        rows = list(zip(chunks, ids, vectors))
+        if checkpoint is not None and len(checkpoint):
+            # Already committed before an interruption: don't embed again
+            kept = [row for row in rows if row[1] not in checkpoint]
+            skipped[0] += len(rows) - len(kept)
+            rows = kept
+        return batcher.add(rows)
+    
+    def dedup(piece):
+        pending.setdefault(piece[0], []).append(piece)
+        # Release every buffered piece whose turn has come, in path order
+        while next_file[0] in pending:
+            pieces_of_file = pending[next_file[0]]
+            while pieces_of_file:
+                _, path, chunks, ids, embeddings, last = pieces_of_file.pop(0)
+                if last:
+                    del pending[next_file[0]]
+                    next_file[0] += 1
+                    in_flight.release()
+                    break
+                yield from process(path, chunks, ids, embeddings)
+            else:
+                break
+    
+    def embed(batch):
+        missing = [i for i, (_, _, vector) in enumerate(batch) if vector is None]
+        if missing:
+            vectors = embedding_model.embed_documents([batch[i][0].page_content for i in missing])
+            for i, vector in zip(missing, vectors):
+                batch[i] = (batch[i][0], batch[i][1], vector)
+        return [batch]
+    
+    def upsert(batch):
+        chunks, ids, vectors = zip(*batch)
+        write_chunks(vectorstore, list(chunks), list(ids), list(vectors), checkpoint)
+        return []
+    
+    pipeline = Pipeline([
+        Stage("load", load, Config.INGESTION_LOAD_WORKERS, unit="files"),
+        Stage("chunk", chunk, chunk_workers, unit="files"),
+        # One worker: duplicates must be resolved in a fixed order
+        Stage("dedup", dedup, 1, unit="chunks", size=lambda piece: len(piece[3]), finish=batcher.flush),
+        Stage("embed", embed, Config.INGESTION_EMBED_WORKERS, unit="chunks", size=len),
+        Stage("upsert", upsert, Config.INGESTION_UPSERT_WORKERS, unit="chunks", size=len),
+    ])
+    
+    start = time.perf_counter()
+    try:
+        with ingestion_run(chunking_method) as run:
+            stats = pipeline.run(numbered_paths())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print_pipeline_stats(stats, time.perf_counter() - start)
+    print_cache_stats(embedding_model)
+    if deduplicator is not None:
+        # Survivors may have been written before a later copy was merged into them
+        update_metadata(vectorstore, *deduplicator.merged_metadata())
+        deduplicator.print_report()
+    if skipped[0]:
+        print(f"⏭️  Skipped {skipped[0]} chunks committed before the interruption")
+    finish_rebuild(collection_name, vectorstore)
+    if checkpoint is not None:
+        checkpoint.clear()
+    
+    manifest.reset(chunking_method)
+    for source, source_ids in ids_by_source.items():
+        manifest.record(source, source_ids, snapshots.get(source))
+    manifest.save()
+    
+    return vectorstore
@@ -0,0 +1,159 @@
+"""
+Watch mode - keeps a collection in sync with the docs directory as files change
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from watchfiles import watch
+from src.core.config import Config
+from src.ingestion.manifest import Manifest
+from src.ingestion.pipeline import ingest_changes, run_ingestion
+
+
+class LagStats:
+    """Time from a file change on disk until its chunks are searchable"""
+    
+    def __init__(self, window=1000):
+        self.files = 0
+        self.batches = 0
+        self.failures = 0
+        self._lags = deque(maxlen=window)
+    
+    def add(self, lags):
+        self.batches += 1
+        self.files += len(lags)
+        self._lags.extend(lags)
+    
+    def percentile(self, q):
+        if not self._lags:
+            return 0.0
+        ordered = sorted(self._lags)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    def summary(self):
+        return (f"{self.files} files in {self.batches} batches, lag p50 {self.percentile(0.5):.2f}s / "
+                f"p95 {self.percentile(0.95):.2f}s / max {self.percentile(1.0):.2f}s, "
+                f"{self.failures} failed batches")
+
+
+def _is_document(change, path):
+    return path.endswith(".txt")
+
+
+def _manifest_path(docs_dir, path):
+    """Absolute path from watchfiles -> the form discover_files() records"""
+    return str(Path(docs_dir) / os.path.relpath(path, os.path.abspath(docs_dir)))
+
+
+def _changed_at(path, seen_at):
+    """When a file changed: its mtime, or when the event arrived for deletions"""
+    try:
+        return min(os.stat(path).st_mtime, seen_at)
+    except OSError:
+        return seen_at
+
+
+def sync_paths(collection_name, chunking_method, paths):
+    """
+    Bring the collection in line with the current state of some files
+    
+    Files that still exist are re-chunked if their content changed; files
+    that are gone have their chunks deleted.
+    
+    Args:
+        collection_name: Name of the collection
+        chunking_method: Chunking strategy of the collection
+        paths: Paths (as recorded in the manifest) that had events
+    
+    Returns:
+        list: Paths that were actually (re)ingested or removed
+    """
+    manifest = Manifest.load(collection_name)
+    existing = [path for path in paths if os.path.isfile(path)]
+    removed = sorted(path for path in paths if not os.path.isfile(path) and path in manifest.files)
+    
+    # Editors often touch or rewrite files without changing them
+    changes = manifest.diff(existing)
+    changed = changes["added"] + changes["changed"]
+    if not (changed or removed):
+        return []
+    
+    print(f"\n👀 {len(changes['added'])} added, {len(changes['changed'])} changed, {len(removed)} removed")
+    # Watched files are rewritten while we read them: copy their text instead
+    # of reading it lazily through a mapping that a truncation would break
+    ingest_changes(collection_name, chunking_method, manifest, changed, removed, docstore=False)
+    return changed + removed
+
+
+def watch_and_ingest(docs_dir=None, collection_name=None, chunking_method=None, debounce_ms=None, stop_event=None):
+    """
+    Watch the docs directory and ingest changes as they happen
+    
+    Bursts of events are debounced and coalesced by watchfiles, then only
+    the affected files are re-chunked, re-embedded and upserted. Runs until
+    interrupted (Ctrl+C) or until stop_event is set.
+    
+    Args:
+        docs_dir: Directory to watch (defaults to config)
+        collection_name: Name of the collection (defaults to config)
+        chunking_method: Chunking strategy (defaults to the collection's,
+            then to config)
+        debounce_ms: Quiet period that ends a burst of changes (defaults to config)
+        stop_event: Optional threading.Event that stops the watcher
+    
+    Returns:
+        LagStats: Freshness statistics for the session
+    """
+    docs_dir = docs_dir or Config.DOCS_DIRECTORY
+    collection_name = collection_name or Config.DEFAULT_COLLECTION
+    chunking_method = chunking_method or Manifest.load(collection_name).method or Config.DEFAULT_CHUNKING_METHOD
+    debounce_ms = debounce_ms or Config.WATCH_DEBOUNCE_MS
+    stats = LagStats()
+    
+    if not os.path.isdir(docs_dir):
+        print(f"❌ Directory {docs_dir} not found!")
+        return stats
+    
+    # Catch up on anything that changed while we weren't watching
+    run_ingestion(docs_dir, collection_name, chunking_method, incremental=True, docstore=False)
+    
+    print(f"\n👀 Watching '{docs_dir}' for changes (Ctrl+C to stop)...")
+    pending = {}
+    try:
+        for events in watch(
+            docs_dir,
+            watch_filter=_is_document,
+            debounce=debounce_ms,
+            stop_event=stop_event,
+            rust_timeout=Config.WATCH_RETRY_SECONDS * 1000,
+            yield_on_timeout=True
+        ):
+            seen_at = time.time()
+            for _, path in events:
+                path = _manifest_path(docs_dir, path)
+                pending.setdefault(path, _changed_at(path, seen_at))
+            if not pending:
+                continue
+            
+            try:
+                synced = sync_paths(collection_name, chunking_method, sorted(pending))
+            except Exception as e:
+                # Keep the paths pending; they are retried on the next event
+                # or after WATCH_RETRY_SECONDS without one
+                stats.failures += 1
+                print(f"❌ Ingesting {len(pending)} changed files failed: {e}")
+                continue
+            
+            searchable_at = time.time()
+            lags = [searchable_at - pending[path] for path in synced]
+            pending = {}
+            if lags:
+                stats.add(lags)
+                print(f"⚡ {len(lags)} files searchable, lag from change: max {max(lags):.2f}s")
+    except KeyboardInterrupt:
+        pass
+    
+    print(f"\n🛑 Stopped watching. {stats.summary()}")
+    return stats
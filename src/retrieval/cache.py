@@ -0,0 +1,214 @@
+"""
+Retrieval result cache - repeated questions skip the query embedding and the vector store round-trip
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.core.aliases import logical_name
+from src.core.config import Config
+from src.core.registry import get_or_create
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a query used as the exact-match key"""
+    return " ".join(query.lower().split())
+
+
+def collection_version(vectorstore):
+    """
+    Version of the data a vector store serves
+    
+    A rebuild switches to a new physical collection; incremental and watch
+    ingestion rewrite the collection's manifest once their writes are done.
+    Either changes the version, so cached results from before never match.
+    
+    Args:
+        vectorstore: Chroma vector store
+    
+    Returns:
+        tuple: (physical collection name, manifest modification time)
+    """
+    collection_name = vectorstore._collection.name
+    manifest_path = os.path.join(Config.MANIFEST_DIRECTORY, f"{logical_name(collection_name)}.json")
+    try:
+        stamp = os.stat(manifest_path).st_mtime_ns
+    except OSError:
+        stamp = None
+    return collection_name, stamp
+
+
+class QueryCache:
+    """
+    LRU cache of search results with a time-to-live
+    
+    Entries are keyed by collection version, search options and the
+    normalized query. Optionally, a query whose embedding is within a cosine
+    similarity threshold of a cached query's embedding reuses its results.
+    """
+    
+    def __init__(self, max_entries=None, ttl_seconds=None, similarity=None):
+        self.max_entries = max_entries or Config.QUERY_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or Config.QUERY_CACHE_TTL_SECONDS
+        self.similarity = similarity if similarity is not None else Config.QUERY_CACHE_SIMILARITY
+        self._entries = OrderedDict()
+        # (version, options) -> {key: unit query vector}, stacked lazily for lookups
+        self._vectors = {}
+        self._matrices = {}
+        self._lock = threading.Lock()
+        
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _drop(self, key):
+        del self._entries[key]
+        group = key[:2]
+        vectors = self._vectors.get(group)
+        if vectors is not None and vectors.pop(key, None) is not None:
+            self._matrices.pop(group, None)
+            if not vectors:
+                del self._vectors[group]
+    
+    def _fresh(self, key):
+        """Whether an entry exists and hasn't expired (expired ones are dropped)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if time.monotonic() - entry[0] > self.ttl_seconds:
+            self._drop(key)
+            self.expirations += 1
+            return False
+        return True
+    
+    def get(self, query, version, options):
+        """
+        Results cached for exactly this query
+        
+        Args:
+            query: Query string
+            version: collection_version() of the vector store
+            options: Hashable search options the results depend on (mode, k, ...)
+        
+        Returns:
+            list or None: Cached (Document, score) tuples
+        """
+        key = (version, options, normalize_query(query))
+        with self._lock:
+            if not self._fresh(key):
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return list(self._entries[key][1])
+    
+    def get_similar(self, embedding, version, options):
+        """
+        Results cached for the most similar earlier query, if similar enough
+        
+        Args:
+            embedding: Embedding of the new query
+            version: collection_version() of the vector store
+            options: Search options (as for get())
+        
+        Returns:
+            list or None: Cached (Document, score) tuples
+        """
+        group = (version, options)
+        query_vector = np.array(embedding, dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+        with self._lock:
+            vectors = self._vectors.get(group)
+            if not vectors:
+                return None
+            if group not in self._matrices:
+                self._matrices[group] = (list(vectors), np.stack(list(vectors.values())))
+            keys, matrix = self._matrices[group]
+            scores = matrix @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity or not self._fresh(keys[best]):
+                return None
+            self._entries.move_to_end(keys[best])
+            self.semantic_hits += 1
+            return list(self._entries[keys[best]][1])
+    
+    def put(self, query, version, options, results, embedding=None):
+        """
+        Cache the results of a query
+        
+        Args:
+            query: Query string
+            version: collection_version() of the vector store
+            options: Search options (as for get())
+            results: (Document, score) tuples
+            embedding: Embedding of the query, to serve similar queries
+        """
+        key = (version, options, normalize_query(query))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), list(results))
+            if embedding is not None:
+                vector = np.asarray(embedding, dtype=np.float32)
+                self._vectors.setdefault(key[:2], {})[key] = vector / (np.linalg.norm(vector) or 1.0)
+                self._matrices.pop(key[:2], None)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._matrices.clear()
+    
+    def stats(self):
+        """
+        Get cache counters
+        
+        Returns:
+            dict: Hit, miss and eviction counts plus the overall hit rate
+        """
+        hits = self.exact_hits + self.semantic_hits
+        total = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+def get_query_cache():
+    """
+    The process-wide query cache
+    
+    Returns:
+        QueryCache or None: None when query caching is disabled
+    """
+    if not Config.QUERY_CACHE_ENABLED:
+        return None
+    return get_or_create("query_cache", None, QueryCache)
+
+
+def print_query_cache_stats():
+    """Print hit/miss counters of the query cache (no-op when disabled or unused)"""
+    cache = get_query_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    if not (stats["exact_hits"] or stats["semantic_hits"] or stats["misses"]):
+        return
+    print(f"💾 Query cache: {stats['exact_hits'] + stats['semantic_hits']} hits "
+          f"({stats['exact_hits']} exact, {stats['semantic_hits']} similar), "
+          f"{stats['misses']} misses, hit rate {stats['hit_rate']:.1%}")
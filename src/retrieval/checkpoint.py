@@ -0,0 +1,59 @@
+"""
+Upsert checkpoint - remembers which chunk IDs a rebuild has already committed
+"""
+
+import os
+import threading
+from src.core.config import Config
+
+
+class UpsertCheckpoint:
+    """
+    Append-only log of chunk IDs committed to a collection during a full
+    rebuild. Every successful batch is appended and fsynced, so after a crash
+    `run_ingestion(resume=True)` can skip those chunks instead of deleting the
+    collection and embedding everything again. Cleared once the rebuild
+    completes.
+    """
+    
+    def __init__(self, collection_name, path=None):
+        self.path = path or os.path.join(Config.UPSERT_CHECKPOINT_DIR, f"{collection_name}.ids")
+        self._lock = threading.Lock()
+        self._committed = set()
+        
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self._committed = {line.strip() for line in f if line.strip()}
+    
+    def exists(self):
+        """Whether an unfinished rebuild left a checkpoint behind"""
+        return os.path.exists(self.path)
+    
+    def start(self):
+        """Begin a fresh rebuild with an empty checkpoint"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            self._committed = set()
+            open(self.path, "w").close()
+    
+    def __contains__(self, chunk_id):
+        return chunk_id in self._committed
+    
+    def __len__(self):
+        return len(self._committed)
+    
+    def add(self, ids):
+        """Record a batch of IDs as durably committed"""
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write("".join(f"{chunk_id}\n" for chunk_id in ids))
+                f.flush()
+                os.fsync(f.fileno())
+            self._committed.update(ids)
+    
+    def clear(self):
+        """Remove the checkpoint after a completed rebuild"""
+        with self._lock:
+            self._committed = set()
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,94 @@
+"""
+Result diversity - maximal marginal relevance and a per-source cap over fetched candidates
+"""
+
+import numpy as np
+from src.core.config import Config
+
+
+def mmr_order(query_vector, vectors, k, lambda_mult=None, relevance=None, groups=None, max_per_group=None):
+    """
+    Pick k candidates by maximal marginal relevance
+    
+    Each step takes the candidate with the best
+    lambda * relevance - (1 - lambda) * (max similarity to anything picked),
+    computed for all candidates at once on the candidate matrix.
+    
+    Args:
+        query_vector: Query embedding
+        vectors: Candidate embeddings, one row per candidate
+        k: Number of candidates to pick
+        lambda_mult: 1 = pure relevance, 0 = pure diversity (defaults to config)
+        relevance: Optional relevance per candidate, on any scale (e.g. fusion
+            scores); it is rescaled to [0, 1] so it weighs against the cosine
+            redundancy. Cosine similarity to the query if omitted
+        groups: Optional group label per candidate (e.g. source file)
+        max_per_group: Pick at most this many per group (0 or None = no cap)
+    
+    Returns:
+        list: Indices of the picked candidates, in pick order (fewer than k
+            if the cap leaves nothing else to pick)
+    """
+    lambda_mult = Config.MMR_LAMBDA if lambda_mult is None else lambda_mult
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 0:
+        return []
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query_vector = np.asarray(query_vector, dtype=np.float32)
+    query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+    
+    if relevance is None:
+        relevance = vectors @ query_vector
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+        spread = float(relevance.max() - relevance.min())
+        relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones_like(relevance)
+    similarity = vectors @ vectors.T
+    if groups is not None and max_per_group:
+        _, group_of = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        picked_per_group = np.zeros(group_of.max() + 1, dtype=np.int64)
+    
+    available = np.ones(len(vectors), dtype=bool)
+    redundancy = np.zeros(len(vectors), dtype=np.float32)
+    picked = []
+    for _ in range(min(k, len(vectors))):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        if not available[best]:
+            break
+        picked.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+        if groups is not None and max_per_group:
+            group = group_of[best]
+            picked_per_group[group] += 1
+            if picked_per_group[group] >= max_per_group:
+                available[group_of == group] = False
+    return picked
+
+
+def diversify(candidates, query_vector, k, relevance=None):
+    """
+    Re-rank retrieved candidates for coverage
+    
+    Args:
+        candidates: (Document, distance, embedding) tuples, best first
+        query_vector: Query embedding
+        k: Number of results to keep
+        relevance: Optional relevance per candidate (see mmr_order)
+    
+    Returns:
+        list: The kept (Document, distance, embedding) tuples in MMR order
+    """
+    if not candidates:
+        return []
+    order = mmr_order(
+        query_vector,
+        [embedding for _, _, embedding in candidates],
+        k,
+        relevance=relevance,
+        groups=[doc.metadata.get("source", "") for doc, _, _ in candidates],
+        max_per_group=Config.MAX_CHUNKS_PER_SOURCE,
+    )
+    return [candidates[i] for i in order]
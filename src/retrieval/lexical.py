@@ -0,0 +1,463 @@
+"""
+Lexical (BM25) index - finds exact tickers, part numbers and years that
+embeddings blur together
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+import numpy as np
+from src.core.config import Config
+from src.core.registry import get_or_create, invalidate, put
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so use one writing process at a time
+    fcntl = None
+
+# Words, plus compounds like "brk.b", "xj-900-12" or "fy2024/25" kept whole
+_TOKEN = re.compile(r"\w+(?:[.\-/:]\w+)*")
+_SEPARATORS = re.compile(r"[.\-/:]")
+
+_REFRESH_ATTEMPTS = 5
+
+
+def tokenize(text):
+    """
+    Lowercased terms of a text
+    
+    Compounds are indexed both whole and by their parts, so "Q3-FY24"
+    matches queries for "q3-fy24" as well as "fy24".
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        list: Terms (compound parts come after the words)
+    """
+    terms = _TOKEN.findall(text.lower())
+    for token in terms[:]:
+        if not token.isalnum():
+            parts = _SEPARATORS.split(token)
+            if len(parts) > 1:
+                terms.extend(parts)
+    return terms
+
+
+def _save_json(path, data):
+    """Write a JSON file atomically"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _write_segment(path, ids, terms, term_idx, doc_idx, tfs, lengths):
+    """
+    Write one immutable segment from (term, doc, tf) postings
+    
+    Args:
+        path: Segment directory (created)
+        ids: Chunk IDs of the segment's documents
+        terms: Vocabulary; term_idx values index into it
+        term_idx, doc_idx, tfs: Aligned posting arrays, with doc_idx
+            ascending for each term
+        lengths: Term count of every document
+    """
+    # Sorted vocabulary; a stable sort by term keeps each term's postings in document order
+    order = sorted(range(len(terms)), key=terms.__getitem__)
+    remap = np.empty(len(terms), dtype=np.int64)
+    remap[order] = np.arange(len(terms))
+    term_idx = remap[term_idx]
+    postings = np.argsort(term_idx, kind="stable")
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_idx, minlength=len(terms)), out=offsets[1:])
+    
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "docs.npy"), np.asarray(doc_idx, dtype=np.uint32)[postings])
+    np.save(os.path.join(path, "tfs.npy"), np.minimum(tfs, 65535).astype(np.uint16)[postings])
+    np.save(os.path.join(path, "lengths.npy"), np.asarray(lengths, dtype=np.uint32))
+    _save_json(os.path.join(path, "terms.json"), [terms[i] for i in order])
+    _save_json(os.path.join(path, "ids.json"), list(ids))
+    _save_json(os.path.join(path, "deleted.json"), [])
+
+
+class _Segment:
+    """One immutable batch of postings, memory-mapped, plus its tombstones"""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "terms.json"), "r") as f:
+            self.vocab = {term: i for i, term in enumerate(json.load(f))}
+        with open(os.path.join(path, "ids.json"), "r") as f:
+            self.ids = json.load(f)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.docs = np.load(os.path.join(path, "docs.npy"), mmap_mode="r")
+        self.tfs = np.load(os.path.join(path, "tfs.npy"), mmap_mode="r")
+        self.lengths = np.load(os.path.join(path, "lengths.npy"), mmap_mode="r")
+        self._positions = None
+        self.load_deleted()
+    
+    def load_deleted(self):
+        with open(os.path.join(self.path, "deleted.json"), "r") as f:
+            deleted = json.load(f)
+        live = np.ones(len(self.ids), dtype=bool)
+        live[deleted] = False
+        self.live = live
+    
+    @property
+    def positions(self):
+        """Chunk ID -> document number (built on first use)"""
+        if self._positions is None:
+            self._positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+        return self._positions
+    
+    def delete(self, chunk_ids):
+        """Tombstone documents by chunk ID; returns how many were live"""
+        hits = [self.positions[chunk_id] for chunk_id in chunk_ids if chunk_id in self.positions]
+        hits = [i for i in hits if self.live[i]]
+        if hits:
+            self.live[hits] = False
+            _save_json(os.path.join(self.path, "deleted.json"), np.flatnonzero(~self.live).tolist())
+        return len(hits)
+    
+    def postings(self, term):
+        """(document numbers, term frequencies) of a term, or None"""
+        i = self.vocab.get(term)
+        if i is None:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over the chunks of one physical collection
+    
+    Writes add small immutable segments (array-backed postings saved as
+    .npy files and memory-mapped on load) and tombstone replaced or deleted
+    chunks; segments are merged in tiers of LEXICAL_MERGE_FACTOR so a
+    rebuild doesn't rewrite the whole index per batch. Readers in other
+    processes pick up changes through the index.json generation; writers
+    hold an exclusive lock on `<index>.lock` and reload the segment list
+    once they have it, so a watch daemon and a rebuild never write over
+    each other's manifest.
+    """
+    
+    def __init__(self, collection_name, path=None):
+        self.collection_name = collection_name
+        self.path = path or os.path.join(Config.LEXICAL_INDEX_DIR, collection_name)
+        self.manifest_path = os.path.join(self.path, "index.json")
+        # Outside the index directory, which create() replaces
+        self._lock_path = self.path + ".lock"
+        self.segments = []
+        self.levels = []
+        self.next_segment = 0
+        self.generation = -1
+        self._stamp = None
+        self.live_docs = 0
+        self.avg_length = 0.0
+        self._lock = threading.RLock()
+    
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+    
+    @contextmanager
+    def _writing(self):
+        """Hold the index for writing, with the segment list other processes last saved"""
+        with self._lock:
+            if fcntl is None:
+                self._stamp = None
+                self.refresh()
+                yield
+                return
+            os.makedirs(os.path.dirname(self._lock_path) or ".", exist_ok=True)
+            with open(self._lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # Don't trust the mtime stamp: a write in the same tick keeps it
+                    self._stamp = None
+                    self.refresh()
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def refresh(self):
+        """Reload the segment list if another writer changed it"""
+        for _ in range(_REFRESH_ATTEMPTS):
+            try:
+                return self._reload()
+            except FileNotFoundError:
+                # A merge in another process removed a segment of the manifest
+                # we read; its new manifest is already in place
+                continue
+    
+    def _reload(self):
+        try:
+            # A stat per query; the manifest is only read when it was replaced
+            stamp = os.stat(self.manifest_path).st_mtime_ns
+            if stamp == self._stamp:
+                return
+            with open(self.manifest_path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data["generation"] == self.generation:
+            self._stamp = stamp
+            return
+        
+        with self._lock:
+            opened = {os.path.basename(segment.path): segment for segment in self.segments}
+            segments = []
+            for name in data["segments"]:
+                segment = opened.get(name)
+                if segment is None:
+                    segment = _Segment(os.path.join(self.path, name))
+                else:
+                    segment.load_deleted()
+                segments.append(segment)
+            self.levels = data["levels"]
+            self.next_segment = data["next_segment"]
+            self.generation = data["generation"]
+            self._set_segments(segments)
+            self._stamp = stamp
+    
+    def _set_segments(self, segments):
+        live_docs = sum(int(segment.live.sum()) for segment in segments)
+        total_length = sum(float(segment.lengths[segment.live].sum()) for segment in segments)
+        self.live_docs = live_docs
+        self.avg_length = total_length / live_docs if live_docs else 0.0
+        self.segments = segments
+    
+    def _save(self):
+        # Unique across re-creations of the index, unlike a counter
+        self.generation = time.time_ns()
+        _save_json(self.manifest_path, {
+            "segments": [os.path.basename(segment.path) for segment in self.segments],
+            "levels": self.levels,
+            "next_segment": self.next_segment,
+            "generation": self.generation,
+        })
+    
+    def create(self):
+        """Start an empty index, replacing any existing one"""
+        with self._writing():
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+            self.levels, self.next_segment, self.generation = [], 0, -1
+            self._set_segments([])
+            self._save()
+        return self
+    
+    def drop(self):
+        """Delete the index from disk"""
+        with self._writing():
+            self._set_segments([])
+            shutil.rmtree(self.path, ignore_errors=True)
+            if os.path.exists(self._lock_path):
+                os.remove(self._lock_path)
+    
+    def _new_segment_path(self):
+        # Random suffix: a reader may still hold a segment of an earlier index at this path
+        path = os.path.join(self.path, f"seg-{self.next_segment:06d}-{uuid.uuid4().hex[:8]}")
+        self.next_segment += 1
+        return path
+    
+    def upsert(self, ids, texts):
+        """
+        Index chunks, replacing earlier versions of the same IDs
+        
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts aligned with ids
+        """
+        if not ids:
+            return
+        
+        # Tokenize outside the lock: concurrent upsert workers only queue for the write
+        vocab = {}
+        term_idx, doc_idx, tfs, lengths = array("I"), array("I"), array("I"), array("I")
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            term_idx.extend([vocab.setdefault(term, len(vocab)) for term in counts])
+            doc_idx.extend(array("I", [doc]) * len(counts))
+            tfs.extend(counts.values())
+        terms = list(vocab)
+        
+        with self._writing():
+            for segment in self.segments:
+                segment.delete(ids)
+            path = self._new_segment_path()
+            _write_segment(
+                path, ids, terms,
+                np.frombuffer(term_idx, dtype=np.uint32),
+                np.frombuffer(doc_idx, dtype=np.uint32),
+                np.frombuffer(tfs, dtype=np.uint32),
+                lengths
+            )
+            self.levels.append(0)
+            self._set_segments(self.segments + [_Segment(path)])
+            self._merge_tiers()
+            self._save()
+    
+    def delete(self, ids):
+        """Remove chunks by ID"""
+        if not ids:
+            return
+        with self._writing():
+            if sum(segment.delete(ids) for segment in self.segments):
+                self._set_segments(self.segments)
+                self._save()
+    
+    def _merge_tiers(self):
+        """Merge runs of LEXICAL_MERGE_FACTOR segments of the same level"""
+        merged = True
+        while merged:
+            merged = False
+            for level in sorted(set(self.levels)):
+                members = [i for i, segment_level in enumerate(self.levels) if segment_level == level]
+                if len(members) >= Config.LEXICAL_MERGE_FACTOR:
+                    self._merge(members, level + 1)
+                    merged = True
+                    break
+    
+    def optimize(self):
+        """Merge all segments into one (after a rebuild)"""
+        with self._writing():
+            if len(self.segments) > 1 or any(not segment.live.all() for segment in self.segments):
+                self._merge(list(range(len(self.segments))), max(self.levels) + 1)
+                self._save()
+    
+    def _merge(self, members, level):
+        """Replace some segments by one, dropping tombstoned documents"""
+        parts = [self.segments[i] for i in members]
+        terms = sorted(set().union(*(segment.vocab for segment in parts)))
+        vocab = {term: i for i, term in enumerate(terms)}
+        
+        ids, lengths = [], []
+        term_parts, doc_parts, tf_parts = [], [], []
+        for segment in parts:
+            # Old document number -> new one (-1 for tombstoned documents)
+            renumber = np.full(len(segment.ids), -1, dtype=np.int64)
+            renumber[segment.live] = np.arange(int(segment.live.sum())) + len(ids)
+            ids.extend(chunk_id for chunk_id, live in zip(segment.ids, segment.live) if live)
+            lengths.extend(np.asarray(segment.lengths)[segment.live].tolist())
+            
+            local_terms = np.array([vocab[term] for term in sorted(segment.vocab, key=segment.vocab.get)], dtype=np.int64)
+            posting_terms = np.repeat(local_terms, np.diff(segment.offsets))
+            docs = renumber[segment.docs]
+            keep = docs >= 0
+            term_parts.append(posting_terms[keep])
+            doc_parts.append(docs[keep])
+            tf_parts.append(np.asarray(segment.tfs)[keep])
+        
+        replaced = set(members)
+        path = self._new_segment_path()
+        if ids:
+            _write_segment(
+                path, ids, terms,
+                np.concatenate(term_parts), np.concatenate(doc_parts), np.concatenate(tf_parts), lengths
+            )
+        segments = [segment for i, segment in enumerate(self.segments) if i not in replaced]
+        self.levels = [segment_level for i, segment_level in enumerate(self.levels) if i not in replaced]
+        if ids:
+            segments.append(_Segment(path))
+            self.levels.append(level)
+        self._set_segments(segments)
+        
+        # Readers in this process keep their own mmaps; other processes reopen on refresh
+        for segment in parts:
+            shutil.rmtree(segment.path, ignore_errors=True)
+    
+    def search(self, query, k=None):
+        """
+        Top chunks for a query by BM25
+        
+        Args:
+            query: Query text
+            k: Number of results
+        
+        Returns:
+            list: (chunk ID, score) tuples, best first
+        """
+        k = k or Config.DEFAULT_TOP_K
+        self.refresh()
+        segments, live_docs, avg_length = self.segments, self.live_docs, self.avg_length
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not (segments and terms and live_docs):
+            return []
+        
+        k1, b = Config.BM25_K1, Config.BM25_B
+        lookups = [[segment.postings(term) for term in terms] for segment in segments]
+        # Document frequencies count live documents only, like live_docs
+        idfs = []
+        for t in range(len(terms)):
+            df = sum(
+                int(segment.live[postings[t][0]].sum())
+                for segment, postings in zip(segments, lookups) if postings[t] is not None
+            )
+            idfs.append(math.log(1 + (live_docs - df + 0.5) / (df + 0.5)) if df else 0.0)
+        
+        candidates = []
+        for segment, postings in zip(segments, lookups):
+            doc_parts, score_parts = [], []
+            for (found, idf) in zip(postings, idfs):
+                if found is None:
+                    continue
+                docs, tfs = found
+                tfs = tfs.astype(np.float32)
+                norm = k1 * (1 - b + b * segment.lengths[docs] / avg_length)
+                doc_parts.append(docs)
+                score_parts.append(idf * tfs * (k1 + 1) / (tfs + norm))
+            if not doc_parts:
+                continue
+            
+            docs, scores = np.concatenate(doc_parts), np.concatenate(score_parts)
+            if len(doc_parts) > 1:
+                docs, inverse = np.unique(docs, return_inverse=True)
+                scores = np.bincount(inverse, weights=scores)
+            keep = segment.live[docs] & (scores > 0)
+            docs, scores = docs[keep], scores[keep]
+            if len(docs) > k:
+                top = np.argpartition(-scores, k)[:k]
+                docs, scores = docs[top], scores[top]
+            candidates.extend((float(score), segment.ids[doc]) for doc, score in zip(docs, scores))
+        
+        return [(chunk_id, score) for score, chunk_id in heapq.nlargest(k, candidates)]
+
+
+def get_lexical_index(collection_name):
+    """
+    Open the lexical index of a physical collection (opened once and reused)
+    
+    Returns:
+        LexicalIndex or None: None if lexical indexing is disabled or the
+            collection was built without one
+    """
+    if not Config.LEXICAL_INDEX_ENABLED:
+        return None
+    index = get_or_create("lexical", collection_name, lambda: LexicalIndex(collection_name))
+    return index if index.exists() else None
+
+
+def create_lexical_index(collection_name):
+    """Start an empty lexical index for a newly created collection"""
+    if Config.LEXICAL_INDEX_ENABLED:
+        put("lexical", collection_name, LexicalIndex(collection_name).create())
+
+
+def drop_lexical_index(collection_name):
+    """Delete the lexical index of a deleted collection"""
+    LexicalIndex(collection_name).drop()
+    invalidate("lexical", collection_name)
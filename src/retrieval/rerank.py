@@ -0,0 +1,119 @@
+"""
+Cross-encoder re-ranking - scores (query, chunk) pairs on CPU within a latency budget
+"""
+
+import time
+import numpy as np
+from src.core.config import Config
+from src.core.registry import get_or_create
+
+
+class CrossEncoderReranker:
+    """
+    Small sentence-transformers cross-encoder running on CPU.
+    
+    Candidates are scored in small batches, best first, and scoring stops
+    once the millisecond budget is spent or the next batch (predicted from
+    the measured time per pair) wouldn't fit: candidates that weren't scored
+    keep their retrieval order after the re-ranked ones, and when fewer than
+    two were scored the retrieval order is kept as is.
+    """
+    
+    def __init__(self, model: str = None, backend: str = None, max_tokens: int = None,
+                 verbose: bool = True):
+        # Imported lazily so searches without re-ranking don't pay torch's startup cost
+        from sentence_transformers import CrossEncoder
+        
+        self.model = model or Config.RERANK_MODEL
+        self.backend = backend or Config.RERANK_BACKEND
+        self.max_tokens = max_tokens or Config.RERANK_MAX_TOKENS
+        self.batch_size = Config.RERANK_BATCH_SIZE
+        # Cut long chunks before tokenizing; the tokenizer truncates to max_tokens
+        self.max_chars = self.max_tokens * 8
+        self.ms_per_pair = None
+        self.reranked = 0
+        self.partial = 0
+        self.skipped = 0
+        
+        start = time.perf_counter()
+        self.client = CrossEncoder(self.model, device="cpu", max_length=self.max_tokens, backend=self.backend)
+        if verbose:
+            print(f"  🧠 Loaded re-ranker {self.model} ({self.backend}, {self.max_tokens} tokens) "
+                  f"in {time.perf_counter() - start:.1f}s", flush=True)
+    
+    def _score(self, pairs):
+        start = time.perf_counter()
+        scores = self.client.predict(pairs, batch_size=len(pairs), show_progress_bar=False, convert_to_numpy=True)
+        # Slowdowns are taken at once so the next batch fits the budget; speedups are smoothed
+        latest = (time.perf_counter() - start) * 1000 / len(pairs)
+        if self.ms_per_pair is None or latest > self.ms_per_pair:
+            self.ms_per_pair = latest
+        else:
+            self.ms_per_pair = 0.8 * self.ms_per_pair + 0.2 * latest
+        return np.asarray(scores, dtype=np.float32)
+    
+    def warm_up(self):
+        """
+        Run the model once on full-length pairs so the time per pair is
+        measured before the first query
+        """
+        text = " ".join(["warm-up"] * self.max_tokens)[:self.max_chars]
+        self._score([(text, text)] * self.batch_size)
+    
+    def rerank(self, query, candidates, budget_ms=None):
+        """
+        Re-order candidates by cross-encoder score
+        
+        Args:
+            query: Query string
+            candidates: Tuples whose first item is a Document, best first
+            budget_ms: Time allowed for scoring (defaults to config)
+        
+        Returns:
+            list: The candidates, re-ranked as far as the budget allowed
+        """
+        budget_ms = budget_ms or Config.RERANK_BUDGET_MS
+        start = time.perf_counter()
+        scores = []
+        while len(scores) < len(candidates):
+            batch = candidates[len(scores):len(scores) + self.batch_size]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if self.ms_per_pair and elapsed_ms + self.ms_per_pair * len(batch) > budget_ms:
+                break
+            pairs = [(query, candidate[0].page_content[:self.max_chars]) for candidate in batch]
+            scores.extend(self._score(pairs))
+        
+        count = len(scores)
+        if count < 2:
+            self.skipped += 1
+            return candidates
+        if count < len(candidates):
+            self.partial += 1
+        else:
+            self.reranked += 1
+        order = np.argsort(-np.asarray(scores, dtype=np.float32), kind="stable")
+        return [candidates[i] for i in order] + list(candidates[count:])
+
+
+def _load_reranker():
+    try:
+        return CrossEncoderReranker()
+    except Exception as e:
+        print(f"⚠️  Re-ranker unavailable ({e}) - keeping retrieval order")
+        return False
+
+
+def get_reranker():
+    """
+    The configured re-ranker (loaded once and reused)
+    
+    Returns:
+        CrossEncoderReranker or None: None if re-ranking is disabled or the
+            model can't be loaded
+    """
+    if not Config.RERANK_ENABLED:
+        return None
+    return get_or_create(
+        "reranker", (Config.RERANK_MODEL, Config.RERANK_BACKEND, Config.RERANK_MAX_TOKENS), _load_reranker
+    ) or None
+
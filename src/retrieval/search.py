@@ -2,11 +2,37 @@
 Document search and retrieval
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 from src.core.config import Config
-from src.retrieval.vectorstore import get_vectorstore
+from src.core.database import backend_name
+from src.core.registry import get_or_create
+from src.embeddings.cache import embed_queries
+from src.ingestion.docstore import rehydrate_documents
+from src.retrieval.cache import collection_version, get_query_cache, print_query_cache_stats
+from src.retrieval.diversity import diversify
+from src.retrieval.lexical import get_lexical_index
+from src.retrieval.rerank import get_reranker
+from src.retrieval.vectorstore import follow_alias, get_vectorstore
 from src.utils.display import display_search_results
 
 
+class SearchRetriever(BaseRetriever):
+    """LangChain retriever backed by search_documents (cached, hybrid-aware)"""
+    
+    vectorstore: Any
+    k: int = Config.DEFAULT_TOP_K
+    mode: Optional[str] = None
+    diverse: Optional[bool] = None
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in search_documents(self.vectorstore, query, self.k, self.mode, self.diverse)]
+
+
 def get_retriever(vectorstore, k=None, search_type="similarity"):
     """
     Create a LangChain retriever from the vector store
@@ -14,12 +40,17 @@ def get_retriever(vectorstore, k=None, search_type="similarity"):
     Args:
         vectorstore: Chroma vector store
         k: Number of documents to retrieve
-        search_type: Type of search
+        search_type: Type of search ("similarity" and "mmr" go through
+            search_documents and its query cache)
     
     Returns:
         Retriever: LangChain retriever object
     """
     k = k or Config.DEFAULT_TOP_K
+    if search_type == "similarity":
+        return SearchRetriever(vectorstore=vectorstore, k=k)
+    if search_type == "mmr":
+        return SearchRetriever(vectorstore=vectorstore, k=k, diverse=True)
     
     retriever = vectorstore.as_retriever(
         search_type=search_type,
@@ -28,7 +59,164 @@ def get_retriever(vectorstore, k=None, search_type="similarity"):
     return retriever
 
 
-def search_documents(vectorstore, query, k=None):
+def _search_executor():
+    return get_or_create("executor", "search", lambda: ThreadPoolExecutor(max_workers=8, thread_name_prefix="search"))
+
+
+def _query_collection(vectorstore, embeddings, k, with_embeddings=False):
+    """
+    Send query embeddings as one multi-query request
+    
+    Returns:
+        list: (Document, distance, embedding or None) tuples for each query
+    """
+    include = ["documents", "metadatas", "distances"] + (["embeddings"] if with_embeddings else [])
+    answer = vectorstore._collection.query(query_embeddings=embeddings, n_results=k, include=include)
+    vectors = answer["embeddings"] if with_embeddings else [[None] * len(ids) for ids in answer["ids"]]
+    return [
+        [
+            (Document(page_content=text, metadata=metadata or {}, id=chunk_id), distance, vector)
+            for chunk_id, text, metadata, distance, vector in zip(ids, texts, metadatas, distances, query_vectors)
+            if text is not None
+        ]
+        for ids, texts, metadatas, distances, query_vectors in zip(
+            answer["ids"], answer["documents"], answer["metadatas"], answer["distances"], vectors
+        )
+    ]
+
+
+def _fetch_chunks(vectorstore, ids):
+    """Documents and embeddings of chunks by ID, in the order given"""
+    if not ids:
+        return {}
+    found = vectorstore._collection.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+    return {
+        chunk_id: (Document(page_content=text or "", metadata=metadata or {}, id=chunk_id), embedding)
+        for chunk_id, text, metadata, embedding in zip(
+            found["ids"], found["documents"], found["metadatas"], found["embeddings"]
+        )
+    }
+
+
+def _fuse(vector_results, lexical_ids, lexical_chunks, embedding, k):
+    """
+    Merge a vector and a BM25 ranking with reciprocal rank fusion
+    
+    Args:
+        vector_results: (Document, distance, embedding) tuples, best first
+        lexical_ids: Chunk IDs from the BM25 index, best first
+        lexical_chunks: _fetch_chunks() result for lexical_ids
+        embedding: Query embedding (to score chunks only BM25 found)
+        k: Number of results to return
+    
+    Returns:
+        tuple: (Document, distance, embedding) tuples in fused order, and
+            their fused scores
+    """
+    fused, candidates = {}, {}
+    for rank, candidate in enumerate(vector_results, start=1):
+        chunk_id = candidate[0].id
+        fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (Config.HYBRID_RRF_K + rank)
+        candidates[chunk_id] = candidate
+    # IDs missing from the collection (not yet written, or already deleted) are skipped
+    lexical_ids = [chunk_id for chunk_id in lexical_ids if chunk_id in lexical_chunks]
+    for rank, chunk_id in enumerate(lexical_ids, start=1):
+        fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (Config.HYBRID_RRF_K + rank)
+    
+    top = sorted(fused, key=fused.get, reverse=True)[:k]
+    query_vector = np.asarray(embedding, dtype=np.float32)
+    for chunk_id in top:
+        if chunk_id not in candidates:
+            # Only found by BM25: score it with the same cosine distance
+            doc, chunk_vector = lexical_chunks[chunk_id]
+            chunk_vector = np.asarray(chunk_vector, dtype=np.float32)
+            similarity = chunk_vector @ query_vector / (np.linalg.norm(chunk_vector) * np.linalg.norm(query_vector))
+            candidates[chunk_id] = (doc, float(1 - similarity), chunk_vector)
+    return [candidates[chunk_id] for chunk_id in top], [fused[chunk_id] for chunk_id in top]
+
+
+def _retrieve(vectorstore, queries, k, mode, diverse, embed):
+    """
+    Rank chunks for a list of queries
+    
+    The vector search sends all queries in one request. In hybrid mode the
+    BM25 lookups are local and take microseconds; the chunks only they found
+    are fetched while the vector search is still in flight, and the rankings
+    are merged with reciprocal rank fusion, so an exact ticker or part
+    number match can rank above chunks that are only semantically close.
+    With re-ranking on, the top RERANK_TOP_N candidates are re-ordered by the
+    cross-encoder. With diversity on, a larger candidate set is fetched
+    together with its embeddings and narrowed down to k by MMR locally.
+    
+    Args:
+        vectorstore: Chroma vector store
+        queries: Search query strings
+        k: Number of results per query
+        mode: "vector" or "hybrid" (vector if the collection has no lexical index)
+        diverse: Re-rank candidates with MMR and the per-source cap
+        embed: Callable embedding the list of queries
+    
+    Returns:
+        list: List of (Document, distance) tuples for each query
+    """
+    lexical_index = get_lexical_index(vectorstore._collection.name) if mode == "hybrid" else None
+    reranker = get_reranker()
+    candidates = k
+    if lexical_index is not None:
+        candidates = max(candidates, Config.HYBRID_CANDIDATES)
+    if diverse:
+        candidates = max(candidates, Config.MMR_FETCH_K)
+    if reranker is not None:
+        candidates = max(candidates, Config.RERANK_TOP_N)
+    
+    def vector_search():
+        embeddings = embed(queries)
+        return embeddings, _query_collection(vectorstore, embeddings, candidates, with_embeddings=diverse)
+    
+    if lexical_index is None:
+        embeddings, vector_results = vector_search()
+    else:
+        vector_future = _search_executor().submit(vector_search)
+        lexical_ids = [
+            [chunk_id for chunk_id, _ in lexical_index.search(query, candidates)] for query in queries
+        ]
+        lexical_chunks = _fetch_chunks(vectorstore, list(dict.fromkeys(
+            chunk_id for found in lexical_ids for chunk_id in found
+        )))
+        embeddings, vector_results = vector_future.result()
+    
+    results = []
+    for i, found in enumerate(vector_results):
+        relevance = None
+        if lexical_index is not None:
+            found, fused = _fuse(found, lexical_ids[i], lexical_chunks, embeddings[i], candidates)
+            # MMR weighs fused ranks, not vector similarity, so BM25-only hits aren't dropped
+            relevance = fused or None
+        if reranker is not None:
+            top = found[:Config.RERANK_TOP_N]
+            if not Config.DOCSTORE_STORE_TEXT:
+                # The cross-encoder needs the chunk text
+                rehydrate_documents([doc for doc, _, _ in top], vectorstore._collection.name)
+            found = reranker.rerank(queries[i], top) + found[Config.RERANK_TOP_N:]
+            # MMR follows the re-ranked order rather than the retrieval scores
+            relevance = (Config.HYBRID_RRF_K + 1) / (Config.HYBRID_RRF_K + np.arange(1, len(found) + 1))
+        if diverse:
+            found = diversify(found, embeddings[i], k, relevance)
+        results.append([(doc, distance) for doc, distance, _ in found[:k]])
+    return results
+
+
+def _search_options(mode, k, diverse):
+    """Settings that cached results depend on"""
+    options = (mode, k)
+    if diverse:
+        options += (True, Config.MMR_LAMBDA, Config.MAX_CHUNKS_PER_SOURCE)
+    if Config.RERANK_ENABLED:
+        options += (Config.RERANK_MODEL, Config.RERANK_TOP_N)
+    return options
+
+
+def search_documents(vectorstore, query, k=None, mode=None, diverse=None):
     """
     Search for relevant documents based on a query
     
@@ -36,15 +224,92 @@ def search_documents(vectorstore, query, k=None):
         vectorstore: Chroma vector store
         query: Search query string
         k: Number of results to return
+        mode: "vector" or "hybrid" (defaults to config)
+        diverse: Re-rank with MMR and the per-source cap (defaults to config)
     
     Returns:
         list: List of (Document, score) tuples
     """
     k = k or Config.DEFAULT_TOP_K
-    results = vectorstore.similarity_search_with_score(query, k=k)
+    mode = mode or Config.SEARCH_MODE
+    diverse = Config.DIVERSITY_ENABLED if diverse is None else diverse
+    
+    cache = get_query_cache()
+    embedding = None
+    if cache is not None:
+        version, options = collection_version(vectorstore), _search_options(mode, k, diverse)
+        results = cache.get(query, version, options)
+        if results is None and Config.QUERY_CACHE_SEMANTIC:
+            # Served from the embedding cache when the search below needs it again
+            embedding = vectorstore.embeddings.embed_query(query)
+            results = cache.get_similar(embedding, version, options)
+        if results is not None:
+            return results
+        cache.miss()
+    
+    results = _retrieve(
+        vectorstore, [query], k, mode, diverse,
+        lambda queries: [vectorstore.embeddings.embed_query(queries[0])]
+    )[0]
+    if not Config.DOCSTORE_STORE_TEXT:
+        rehydrate_documents([doc for doc, _ in results], vectorstore._collection.name)
+    
+    if cache is not None:
+        cache.put(query, version, options, results, embedding)
     return results
 
 
+def search_documents_batch(vectorstore, queries, k=None, mode=None, diverse=None):
+    """
+    Search for many queries with one embedding call and one vector store request
+    
+    Queries already in the query cache are answered from it; the others are
+    embedded with one batched call (embed_query is one request per query),
+    as query embeddings for providers that embed queries and documents
+    differently, and sent as one multi-query request.
+    
+    Args:
+        vectorstore: Chroma vector store
+        queries: Search query strings
+        k: Number of results per query
+        mode: "vector" or "hybrid" (defaults to config)
+        diverse: Re-rank with MMR and the per-source cap (defaults to config)
+    
+    Returns:
+        list: format_search_results() output for each query, in order
+    """
+    k = k or Config.DEFAULT_TOP_K
+    mode = mode or Config.SEARCH_MODE
+    diverse = Config.DIVERSITY_ENABLED if diverse is None else diverse
+    queries = list(queries)
+    results = [None] * len(queries)
+    
+    cache = get_query_cache()
+    if cache is not None:
+        version, options = collection_version(vectorstore), _search_options(mode, k, diverse)
+        for i, query in enumerate(queries):
+            results[i] = cache.get(query, version, options)
+    pending = [i for i, found in enumerate(results) if found is None]
+    
+    if pending:
+        found = _retrieve(
+            vectorstore, [queries[i] for i in pending], k, mode, diverse,
+            lambda texts: embed_queries(vectorstore.embeddings, texts)
+        )
+        for i, ranked in zip(pending, found):
+            results[i] = ranked
+        if not Config.DOCSTORE_STORE_TEXT:
+            rehydrate_documents(
+                [doc for i in pending for doc, _ in results[i]], vectorstore._collection.name
+            )
+        if cache is not None:
+            for i in pending:
+                cache.miss()
+                cache.put(queries[i], version, options, results[i])
+    
+    return [format_search_results(found) for found in results]
+
+
 def format_search_results(results):
     """
     Format search results for display
@@ -89,15 +354,15 @@ def run_retrieval(vectorstore=None, query=None, k=None, interactive=False, colle
     collection_name = collection_name or Config.DEFAULT_COLLECTION
     k = k or Config.DEFAULT_TOP_K
     
-    print("=== Document Retrieval (LangChain + ChromaDB Cloud) ===\n")
+    print(f"=== Document Retrieval (LangChain + {backend_name()}) ===\n")
     
     # Load vectorstore if not provided
     if vectorstore is None:
-        print("🔄 Loading vector store from ChromaDB Cloud...")
+        print(f"🔄 Loading vector store from {backend_name()}...")
         vectorstore = get_vectorstore(collection_name)
     
     doc_count = vectorstore._collection.count()
-    print(f"📊 ChromaDB Cloud collection contains {doc_count} documents\n")
+    print(f"📊 {backend_name()} collection contains {doc_count} documents\n")
     
     if interactive:
         interactive_search(vectorstore, k)
@@ -119,7 +384,8 @@ def interactive_search(vectorstore, k=None):
     Run an interactive search session
     
     Args:
-        vectorstore: Chroma vector store
+        vectorstore: Chroma vector store (its alias is followed, so a
+            rebuild finishing mid-session is picked up)
         k: Number of results to return
     """
     k = k or Config.DEFAULT_TOP_K
@@ -135,6 +401,7 @@ def interactive_search(vectorstore, k=None):
             query = input("🔎 Enter query: ").strip()
             
             if query.lower() in ['quit', 'exit', 'q']:
+                print_query_cache_stats()
                 print("\n👋 Goodbye!")
                 break
             
@@ -142,7 +409,7 @@ def interactive_search(vectorstore, k=None):
                 print("⚠️  Please enter a valid query.\n")
                 continue
             
-            results = search_documents(vectorstore, query, k)
+            results = search_documents(follow_alias(vectorstore), query, k)
             formatted = format_search_results(results)
             display_search_results(formatted)
             
@@ -2,24 +2,36 @@
 Vector store operations
 """
 
+import random
+import time
+import uuid
+import httpx
+from chromadb.errors import InternalError, RateLimitError
+from chromadb.utils.batch_utils import create_batches
 from langchain_chroma import Chroma
+from src.core.aliases import AliasRecord, logical_name, resolve_collection
+from src.core.config import Config
 from src.core.database import get_chromadb_client
+from src.core.registry import get_or_create, invalidate, put
+from src.embeddings.cache import print_cache_stats
 from src.embeddings.models import get_embedding_model
+from src.retrieval.lexical import create_lexical_index, drop_lexical_index, get_lexical_index
 
+# Failures worth retrying: network trouble, throttling and server-side errors
+RETRYABLE_ERRORS = (httpx.TransportError, ConnectionError, TimeoutError, RateLimitError, InternalError)
 
-def create_vectorstore(chunks, collection_name):
+
+def reset_collection(collection_name):
     """
-    Create a new Chroma vector store from documents
+    Delete a collection (if it exists) and open it again empty
     
     Args:
-        chunks: List of LangChain Document objects
         collection_name: Name of the collection
     
     Returns:
-        Chroma: The created vector store
+        Chroma: Empty vector store
     """
     client = get_chromadb_client()
-    embedding_model = get_embedding_model()
     
     # Delete collection if exists
     try:
@@ -27,28 +39,285 @@ def create_vectorstore(chunks, collection_name):
         print(f"🗑️  Deleted existing collection '{collection_name}'")
     except Exception:
         pass
+    # BM25 postings are written alongside every chunk from here on
+    create_lexical_index(collection_name)
     
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embedding_model,
+    # Replace any cached handle on the deleted collection
+    return put("vectorstore", (Config.VECTOR_BACKEND, collection_name), Chroma(
         client=client,
         collection_name=collection_name,
+        embedding_function=get_embedding_model(),
         collection_metadata={"hnsw:space": "cosine"}
-    )
+    ))
+
+
+def begin_rebuild(collection_name, checkpoint=None, resume=False):
+    """
+    Open the next version of a collection to rebuild into
+    
+    The live version keeps serving queries until finish_rebuild() switches
+    the alias over.
+    
+    Args:
+        collection_name: Logical name of the collection
+        checkpoint: Optional UpsertCheckpoint recording committed batches
+        resume: Continue an interrupted rebuild recorded in the checkpoint
+    
+    Returns:
+        Chroma: Vector store of the version being built
+    """
+    aliases = AliasRecord.load(collection_name)
+    if resume and checkpoint is not None and checkpoint.exists() and aliases.building:
+        print(f"⏯️  Resuming: {len(checkpoint)} chunks already committed to '{aliases.building}'")
+        return open_vectorstore(aliases.building)
+    
+    if checkpoint is not None:
+        checkpoint.start()
+    building = aliases.start_build()
+    print(f"🏗️  Building '{building}' while '{aliases.target}' keeps serving queries")
+    # Clears leftovers of an earlier build that never finished
+    return reset_collection(building)
+
+
+def finish_rebuild(collection_name, vectorstore):
+    """
+    Switch a collection's alias to a completed version and garbage-collect old ones
     
+    Args:
+        collection_name: Logical name of the collection
+        vectorstore: Vector store returned by begin_rebuild()
+    """
+    aliases = AliasRecord.load(collection_name)
+    previous = aliases.target
+    aliases.switch(vectorstore._collection.name)
+    print(f"🔀 '{collection_name}' now serves '{aliases.target}' (was '{previous}')")
+    
+    lexical_index = get_lexical_index(aliases.target)
+    if lexical_index is not None:
+        lexical_index.optimize()
+    
+    retired = aliases.retired(Config.COLLECTION_VERSIONS_KEPT)
+    client = get_chromadb_client()
+    for name in retired:
+        try:
+            client.delete_collection(name=name)
+            print(f"🗑️  Deleted old version '{name}'")
+        except Exception:
+            pass  # never created, or already gone
+        invalidate("vectorstore", (Config.VECTOR_BACKEND, name))
+        drop_lexical_index(name)
+    if retired:
+        aliases.forget(retired)
+
+
+def create_vectorstore(chunks, collection_name, embeddings=None, ids=None, checkpoint=None, resume=False):
+    """
+    Build a new version of a collection from documents and switch to it
+    
+    Args:
+        chunks: List of LangChain Document objects
+        collection_name: Logical name of the collection
+        embeddings: Optional precomputed vectors aligned with chunks; when
+            given, chunks are upserted as-is without another embedding pass
+        ids: Optional chunk IDs aligned with chunks (random if omitted)
+        checkpoint: Optional UpsertCheckpoint recording committed batches
+        resume: Continue an interrupted rebuild recorded in the checkpoint
+            instead of starting a new version
+    
+    Returns:
+        Chroma: The created vector store
+    """
+    vectorstore = begin_rebuild(collection_name, checkpoint, resume)
+    
+    upsert_chunks(vectorstore, chunks, ids=ids, embeddings=embeddings, checkpoint=checkpoint)
+    
+    finish_rebuild(collection_name, vectorstore)
+    if checkpoint is not None:
+        checkpoint.clear()
     return vectorstore
 
 
+def upsert_chunks(vectorstore, chunks, ids=None, embeddings=None, checkpoint=None):
+    """
+    Embed and upsert documents into an existing vector store in batches
+    
+    Args:
+        vectorstore: Chroma vector store
+        chunks: List of LangChain Document objects
+        ids: Optional chunk IDs aligned with chunks (random if omitted)
+        embeddings: Optional precomputed vectors aligned with chunks
+        checkpoint: Optional UpsertCheckpoint; chunks it already holds are
+            skipped and every committed batch is added to it
+    
+    Returns:
+        list: IDs of the upserted documents
+    """
+    ids = ids or [str(uuid.uuid4()) for _ in chunks]
+    
+    if checkpoint is not None and len(checkpoint):
+        keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in checkpoint]
+        if len(keep) < len(ids):
+            print(f"⏭️  Skipping {len(ids) - len(keep)} chunks committed before the interruption")
+        chunks = [chunks[i] for i in keep]
+        ids = [ids[i] for i in keep]
+        embeddings = [embeddings[i] for i in keep] if embeddings is not None else None
+    
+    if not chunks:
+        return []
+    
+    if embeddings is not None:
+        print(f"♻️  Using {len(embeddings)} precomputed embeddings")
+    
+    batch_size = min(Config.UPSERT_BATCH_SIZE, vectorstore._client.get_max_batch_size())
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        if embeddings is not None:
+            batch_embeddings = embeddings[start:start + batch_size]
+        else:
+            # Embed one batch at a time so an interruption loses at most one batch of work
+            batch_embeddings = vectorstore.embeddings.embed_documents([chunk.page_content for chunk in batch])
+        write_chunks(vectorstore, batch, ids[start:start + batch_size], batch_embeddings, checkpoint)
+        print(f"  ⬆️  Upserted {min(start + batch_size, len(chunks))}/{len(chunks)} chunks", flush=True)
+    
+    if embeddings is None:
+        print_cache_stats(vectorstore.embeddings)
+    print(f"⬆️  Upserted {len(ids)} chunks")
+    return ids
+
+
+def _upsert_with_retry(collection, batch_ids, batch_embeddings, batch_metadatas, batch_documents):
+    """Upsert one batch, retrying transient failures with exponential backoff"""
+    for attempt in range(Config.UPSERT_MAX_RETRIES + 1):
+        try:
+            collection.upsert(
+                ids=batch_ids,
+                embeddings=batch_embeddings,
+                metadatas=batch_metadatas,
+                documents=batch_documents,
+            )
+            return
+        except RETRYABLE_ERRORS as e:
+            if attempt == Config.UPSERT_MAX_RETRIES:
+                raise
+            delay = 2 ** attempt + random.uniform(0, 0.5)
+            print(f"  ⚠️  Upsert of {len(batch_ids)} chunks failed ({e}), retrying in {delay:.1f}s...", flush=True)
+            time.sleep(delay)
+
+
+def stored_text(chunk):
+    """Text to store for a chunk: empty if it can be re-read from its source file"""
+    if not Config.DOCSTORE_STORE_TEXT and "byte_end" in chunk.metadata:
+        return ""
+    return chunk.page_content
+
+
+def write_chunks(vectorstore, chunks, ids, embeddings, checkpoint=None):
+    """
+    Write already-embedded chunks, split to the server's max batch size
+    
+    Args:
+        vectorstore: Chroma vector store
+        chunks: List of LangChain Document objects
+        ids: Chunk IDs aligned with chunks
+        embeddings: Vectors aligned with chunks
+        checkpoint: Optional UpsertCheckpoint to record committed IDs in
+    """
+    # Indexed first: a lexical hit that never made it into the collection is
+    # skipped at query time, a missing one would go unnoticed
+    lexical_index = get_lexical_index(vectorstore._collection.name)
+    if lexical_index is not None:
+        lexical_index.upsert(ids, [chunk.page_content for chunk in chunks])
+    
+    for batch_ids, batch_embeddings, batch_metadatas, batch_documents in create_batches(
+        api=vectorstore._client,
+        ids=ids,
+        embeddings=embeddings,
+        metadatas=[chunk.metadata for chunk in chunks],
+        documents=[stored_text(chunk) for chunk in chunks],
+    ):
+        _upsert_with_retry(vectorstore._collection, batch_ids, batch_embeddings, batch_metadatas, batch_documents)
+        if checkpoint is not None:
+            checkpoint.add(batch_ids)
+
+
+def update_metadata(vectorstore, ids, metadatas):
+    """
+    Overwrite the metadata of chunks already in the store
+    
+    Args:
+        vectorstore: Chroma vector store
+        ids: Chunk IDs
+        metadatas: Full metadata dicts aligned with ids
+    """
+    if not ids:
+        return
+    
+    for batch_ids, _, batch_metadatas, _ in create_batches(api=vectorstore._client, ids=ids, metadatas=metadatas):
+        vectorstore._collection.update(ids=batch_ids, metadatas=batch_metadatas)
+
+
+def delete_chunks(vectorstore, ids):
+    """
+    Delete chunks by ID
+    
+    Args:
+        vectorstore: Chroma vector store
+        ids: IDs of the chunks to delete
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    
+    for batch_ids, _, _, _ in create_batches(api=vectorstore._client, ids=ids):
+        vectorstore._collection.delete(ids=batch_ids)
+    lexical_index = get_lexical_index(vectorstore._collection.name)
+    if lexical_index is not None:
+        lexical_index.delete(ids)
+    print(f"🗑️  Deleted {len(ids)} stale chunks")
+
+
 def get_vectorstore(collection_name):
     """
-    Load an existing Chroma vector store
+    Load the live version of a collection (opened once and reused)
     
     Args:
-        collection_name: Name of the collection
+        collection_name: Logical name of the collection, resolved through
+            its alias on every call
     
     Returns:
         Chroma: The loaded vector store
     """
+    physical_name = resolve_collection(collection_name)
+    return get_or_create("vectorstore", (Config.VECTOR_BACKEND, physical_name), lambda: open_vectorstore(physical_name))
+
+
+def follow_alias(vectorstore):
+    """
+    The live version of the collection a vector store was opened on
+    
+    Long-running sessions call this per query, so they move to a rebuilt
+    version when the alias switches instead of querying one that gets
+    garbage-collected.
+    
+    Args:
+        vectorstore: Chroma vector store on any version of a collection
+    
+    Returns:
+        Chroma: The vector store the collection's alias points at now
+    """
+    return get_vectorstore(logical_name(vectorstore._collection.name))
+
+
+def open_vectorstore(collection_name):
+    """
+    Open a new Chroma vector store handle on a collection
+    
+    Args:
+        collection_name: Name of the collection
+    
+    Returns:
+        Chroma: The vector store
+    """
     client = get_chromadb_client()
     embedding_model = get_embedding_model()
     
@@ -0,0 +1,115 @@
+"""
+Persistent key-value cache backed by SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """
+    Small thread-safe key/value store on disk.
+    Keys are strings, values are raw bytes.
+    """
+    
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def get_many(self, keys):
+        """
+        Look up several keys at once
+        
+        Args:
+            keys: List of keys
+        
+        Returns:
+            dict: Mapping of found keys to their values
+        """
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})",
+                    batch
+                )
+                found.update(rows.fetchall())
+        return found
+    
+    def get(self, key):
+        """Look up a single key, returning None if missing"""
+        return self.get_many([key]).get(key)
+    
+    def set_many(self, items):
+        """
+        Store several key/value pairs in one transaction
+        
+        Args:
+            items: Iterable of (key, bytes) pairs
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items]
+            )
+            self._conn.commit()
+    
+    def set(self, key, value):
+        """Store a single key/value pair"""
+        self.set_many([(key, value)])
+    
+    def evict(self, max_entries=None, max_age=None):
+        """
+        Drop old entries
+        
+        Args:
+            max_entries: Keep at most this many of the newest entries
+            max_age: Drop entries older than this many seconds
+        
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            if max_age is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?", (time.time() - max_age,)
+                )
+                removed += cursor.rowcount
+            if max_entries is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE key NOT IN ("
+                    "SELECT key FROM entries ORDER BY created_at DESC LIMIT ?)",
+                    (max_entries,)
+                )
+                removed += cursor.rowcount
+            self._conn.commit()
+        return removed
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,28 @@
+"""
+Rate limiting utilities
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly so that no more than
+    requests_per_minute calls start in any minute.
+    """
+    
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the caller may make its next request"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        
+        if wait > 0:
+            time.sleep(wait)
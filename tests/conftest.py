@@ -0,0 +1,68 @@
+import os
+import sys
+import zlib
+import pytest
+
+# Tests import the pipeline as `src.*`, like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class HashEmbeddings:
+    """Deterministic bag-of-words vectors, so tests need no model or network"""
+    
+    model = "hash"
+    
+    def __init__(self, dimensions=32):
+        self.dimensions = dimensions
+        self.calls = 0
+    
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+    
+    def _embed(self, text):
+        vector = [1e-3] * self.dimensions
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        norm = sum(value * value for value in vector) ** 0.5
+        return [value / norm for value in vector]
+
+
+@pytest.fixture
+def hash_embeddings():
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def local_backend(tmp_path, monkeypatch):
+    """Point every store at an on-disk local index and caches under tmp_path"""
+    from src.core.config import Config
+    from src.core.registry import invalidate
+    
+    monkeypatch.setattr(Config, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(Config, "SHARD_COUNT", 1)
+    for name in ("LOCAL_INDEX_DIR", "MANIFEST_DIRECTORY", "LEXICAL_INDEX_DIR", "UPSERT_CHECKPOINT_DIR",
+                 "EMBEDDING_CACHE_DIR"):
+        monkeypatch.setattr(Config, name, str(tmp_path / name.lower()))
+    monkeypatch.setattr(Config, "INGESTION_WORKERS", 1)
+    # The last chunking method is saved to the working directory
+    monkeypatch.chdir(tmp_path)
+    invalidate()
+    yield tmp_path
+    invalidate()
+
+
+@pytest.fixture
+def local_pipeline(local_backend, monkeypatch):
+    """The local backend with fake embeddings; returns an empty docs directory"""
+    import src.retrieval.vectorstore as vectorstore
+    
+    embeddings = HashEmbeddings()
+    monkeypatch.setattr(vectorstore, "get_embedding_model", lambda *args, **kwargs: embeddings)
+    
+    docs = local_backend / "docs"
+    docs.mkdir()
+    return docs
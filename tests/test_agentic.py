@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+import pytest
+
+# src.chunking imports every embedding provider
+pytest.importorskip("langchain_google_genai", reason="embedding providers are not installed")
+
+from langchain_core.documents import Document
+from src.chunking import agentic
+from src.chunking.agentic import (
+    AgenticBoundaryCache,
+    FallbackBoundaries,
+    chunk_documents_agentic,
+    get_agentic_boundary_finder,
+    get_sentence_starts,
+    parse_split_indices,
+    split_into_windows,
+)
+from src.core.config import Config
+from src.core.registry import invalidate
+
+TEXT = " ".join(f"Sentence number {i} talks about topic {i // 3}." for i in range(60))
+
+
+class FakeLLM:
+    """Answers every prompt with the same reply and counts the calls"""
+    
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+    
+    def invoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=self.reply)
+
+
+@pytest.fixture
+def agentic_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "AGENTIC_CACHE_DIR", str(tmp_path / "agentic"))
+    monkeypatch.setattr(Config, "AGENTIC_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(Config, "AGENTIC_WINDOW_CHARS", 600)
+    monkeypatch.setattr(Config, "AGENTIC_WINDOW_OVERLAP", 100)
+    invalidate("agentic_cache")
+    yield
+    invalidate("agentic_cache")
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"splits": [3, 1, 3, 9]}', [1, 3]),
+    ('Here you go: {"splits": [2, 4]}', [2, 4]),
+    ("[2, 5]", [2, 5]),
+    ('{"splits": [0, 5]}', [5]),
+    ('{"splits": [true, 2]}', None),
+    ('{"splits": ["2"]}', None),
+    ("no idea", None),
+])
+def test_parse_split_indices(content, expected):
+    assert parse_split_indices(content, sentence_count=6) == expected
+
+
+def test_offsets_protocol_maps_sentence_numbers_to_offsets(monkeypatch):
+    llm = FakeLLM('{"splits": [2, 4]}')
+    monkeypatch.setattr(agentic, "_get_chunking_llm", lambda *args, **kwargs: llm)
+    text = "One. Two. Three. Four. Five."
+    
+    boundaries = get_agentic_boundary_finder(protocol="offsets")(text)
+    
+    assert boundaries == [get_sentence_starts(text)[2], get_sentence_starts(text)[4]]
+    assert text[boundaries[0]:].startswith("Three.")
+
+
+def test_unusable_reply_falls_back_to_sizes(monkeypatch):
+    monkeypatch.setattr(agentic, "_get_chunking_llm", lambda *args, **kwargs: FakeLLM("I can't help with that"))
+    
+    boundaries = get_agentic_boundary_finder(chunk_size_guideline=100, protocol="offsets")(TEXT)
+    
+    assert isinstance(boundaries, FallbackBoundaries)
+    assert boundaries and all(offset in get_sentence_starts(TEXT) for offset in boundaries)
+
+
+def test_windows_cover_the_text_with_overlap():
+    windows = split_into_windows(TEXT, 600, 100)
+    
+    assert windows[0][0] == 0 and windows[-1][1] == len(TEXT)
+    for (start, end), (next_start, _) in zip(windows, windows[1:]):
+        assert next_start < end
+        assert end - start <= 600
+
+
+@pytest.mark.parametrize("windowed", [False, True])
+def test_chunks_are_source_slices_and_cached(agentic_config, monkeypatch, windowed):
+    llm = FakeLLM('{"splits": [3, 6]}')
+    monkeypatch.setattr(agentic, "_get_chunking_llm", lambda *args, **kwargs: llm)
+    monkeypatch.setattr(Config, "AGENTIC_PROTOCOL", "offsets")
+    docs = [Document(page_content=TEXT, metadata={"source": "a.txt"})]
+    
+    chunks = chunk_documents_agentic(docs, windowed=windowed)
+    calls = llm.calls
+    again = chunk_documents_agentic(docs, windowed=windowed)
+    
+    assert calls == (len(split_into_windows(TEXT, 600, 100)) if windowed else 1)
+    assert llm.calls == calls
+    assert [chunk.page_content for chunk in again] == [chunk.page_content for chunk in chunks]
+    assert len(chunks) > 1
+    assert all(chunk.page_content in TEXT for chunk in chunks)
+    assert " ".join(chunk.page_content for chunk in chunks) == TEXT
+
+
+def test_cache_keys_depend_on_the_prompt(agentic_config):
+    offsets = AgenticBoundaryCache(protocol="offsets")
+    offsets.set("text", [1, 2])
+    
+    assert offsets.get("text") == [1, 2]
+    assert AgenticBoundaryCache(protocol="echo").get("text") is None
+    assert AgenticBoundaryCache(chunk_size_guideline=500, protocol="offsets").get("text") is None
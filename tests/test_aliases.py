@@ -0,0 +1,69 @@
+import pytest
+from src.core import local_index
+from src.core.aliases import AliasConflictError, AliasRecord, resolve_collection
+from src.core.config import Config
+from src.core.registry import invalidate
+
+
+def _as_another_process():
+    """Drop every cached client, collection and resolved alias"""
+    invalidate()
+    local_index._clients.clear()
+
+
+def test_unknown_name_resolves_to_itself(local_backend):
+    assert resolve_collection("docs") == "docs"
+    assert resolve_collection("docs__v3") == "docs__v3"
+
+
+def test_switch_is_seen_by_other_processes(local_backend):
+    record = AliasRecord.load("docs")
+    building = record.start_build()
+    record.switch(building)
+    
+    _as_another_process()
+    loaded = AliasRecord.load("docs")
+    assert loaded.target == building == "docs__v1"
+    assert loaded.building is None
+    assert loaded.versions == ["docs", "docs__v1"]
+    assert resolve_collection("docs") == building
+
+
+def test_concurrent_writers_cannot_both_switch(local_backend):
+    first = AliasRecord.load("docs")
+    second = AliasRecord.load("docs")
+    
+    first.switch("docs__v1")
+    with pytest.raises(AliasConflictError):
+        second.switch("docs__v2")
+    
+    assert AliasRecord.load("docs").target == "docs__v1"
+    retry = AliasRecord.load("docs")
+    retry.switch("docs__v2")
+    assert AliasRecord.load("docs").target == "docs__v2"
+
+
+def test_resolution_is_cached_briefly(local_backend, monkeypatch):
+    AliasRecord.load("docs").switch("docs__v1")
+    invalidate("alias_target")
+    loads = []
+    real_load = AliasRecord.load.__func__
+    monkeypatch.setattr(AliasRecord, "load", classmethod(lambda cls, name: loads.append(name) or real_load(cls, name)))
+    
+    assert [resolve_collection("docs") for _ in range(3)] == ["docs__v1"] * 3
+    assert len(loads) == 1
+    
+    monkeypatch.setattr(Config, "ALIAS_CACHE_SECONDS", -1)
+    invalidate("alias_target")
+    resolve_collection("docs")
+    resolve_collection("docs")
+    assert len(loads) == 3
+
+
+def test_old_generations_are_pruned(local_backend):
+    for revision in range(1, 40):
+        AliasRecord.load("docs").switch(f"docs__v{revision}")
+    
+    stored = local_index.get_local_client().get_collection(Config.ALIAS_COLLECTION).get(where={"alias": "docs"})
+    assert len(stored["ids"]) <= 16
+    assert AliasRecord.load("docs").target == "docs__v39"
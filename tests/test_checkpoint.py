@@ -0,0 +1,64 @@
+import importlib.util
+import pytest
+from src.retrieval.checkpoint import UpsertCheckpoint
+
+# The pipeline imports every embedding provider
+needs_providers = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+class Interrupted(Exception):
+    """Not a retryable error, so the rebuild stops where it is"""
+
+
+def test_checkpoint_survives_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoints" / "docs.ids")
+    checkpoint = UpsertCheckpoint("docs", path=path)
+    checkpoint.start()
+    checkpoint.add(["a", "b"])
+    
+    reopened = UpsertCheckpoint("docs", path=path)
+    assert reopened.exists() and len(reopened) == 2
+    assert "a" in reopened and "c" not in reopened
+    
+    reopened.clear()
+    assert not reopened.exists() and len(UpsertCheckpoint("docs", path=path)) == 0
+
+
+@needs_providers
+def test_resume_skips_committed_chunks(local_pipeline, monkeypatch):
+    import src.retrieval.vectorstore as vectorstore
+    from src.core.config import Config
+    from src.ingestion.pipeline import run_ingestion
+    
+    monkeypatch.setattr(Config, "UPSERT_BATCH_SIZE", 1)
+    for i in range(4):
+        (local_pipeline / f"doc{i}.txt").write_text(f"Document number {i} about topic {i}.")
+    
+    real_upsert = vectorstore._upsert_with_retry
+    written = []
+    
+    def upsert(collection, batch_ids, *args):
+        if len(written) == 2 and fail:
+            raise Interrupted()
+        real_upsert(collection, batch_ids, *args)
+        written.extend(batch_ids)
+    
+    monkeypatch.setattr(vectorstore, "_upsert_with_retry", upsert)
+    fail = True
+    with pytest.raises(Interrupted):
+        run_ingestion(str(local_pipeline), "docs", "character", incremental=False, streaming=False)
+    
+    checkpoint = UpsertCheckpoint("docs")
+    assert len(checkpoint) == 2 and all(chunk_id in checkpoint for chunk_id in written)
+    
+    first_batches = list(written)
+    fail = False
+    run_ingestion(str(local_pipeline), "docs", "character", incremental=False, streaming=False, resume=True)
+    
+    # Only the chunks the interrupted run never committed are written again
+    resumed = written[len(first_batches):]
+    assert len(resumed) == 2 and not set(resumed) & set(first_batches)
+    assert vectorstore.get_vectorstore("docs")._collection.count() == 4
+    assert not UpsertCheckpoint("docs").exists()
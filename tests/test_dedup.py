@@ -0,0 +1,76 @@
+import random
+from types import SimpleNamespace
+from langchain_core.documents import Document
+from src.ingestion.dedup import ChunkDeduplicator, normalize_text
+
+BASE = (
+    "The quarterly report shows revenue growth across all regions, with margins "
+    "improving as supply costs fell and the new plant reached full capacity. {}"
+)
+
+
+def _deduplicator():
+    deduplicator = ChunkDeduplicator(threshold=0.8)
+    # Token counts only feed the report; avoid loading a tokenizer
+    deduplicator._encoding = SimpleNamespace(encode_ordinary=str.split)
+    return deduplicator
+
+
+def _chunks():
+    texts = [
+        BASE.format("Outlook is stable."),
+        "A completely different chunk about hiring plans and office moves in Berlin.",
+        BASE.format("Outlook is stable.").upper(),  # exact after normalization
+        BASE.format("Outlook is stable!"),  # near duplicate
+        "Yet another unrelated text about the annual general meeting agenda.",
+    ]
+    return [Document(page_content=text, metadata={"source": f"file{i}.txt"}) for i, text in enumerate(texts)]
+
+
+def test_normalize_text():
+    assert normalize_text("  Hello\n\tWORLD  ") == "hello world"
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    deduplicator = _deduplicator()
+    chunks = _chunks()
+    ids = [f"id{i}" for i in range(len(chunks))]
+    
+    kept, kept_ids, embeddings, aliases = deduplicator.deduplicate(chunks, ids, [[float(i)] for i in range(len(chunks))])
+    
+    assert kept_ids == ["id0", "id1", "id4"]
+    assert embeddings == [[0.0], [1.0], [4.0]]
+    assert aliases == [("file2.txt", "id0"), ("file3.txt", "id0")]
+    assert (deduplicator.exact_duplicates, deduplicator.near_duplicates) == (1, 1)
+    merged_ids, merged_metadata = deduplicator.merged_metadata()
+    assert merged_ids == ["id0"]
+    assert merged_metadata[0]["duplicate_sources"] == "file2.txt;file3.txt"
+    assert merged_metadata[0]["duplicate_count"] == 2
+
+
+def test_result_is_deterministic():
+    chunks = _chunks()
+    ids = [f"id{i}" for i in range(len(chunks))]
+    
+    first = _deduplicator().deduplicate(chunks, ids)
+    second = _deduplicator().deduplicate(chunks, ids)
+    
+    assert first[1] == second[1]
+    assert first[3] == second[3]
+
+
+def test_pieces_give_the_same_result_as_one_batch():
+    chunks = _chunks() * 3
+    ids = [f"id{i}" for i in range(len(chunks))]
+    whole = _deduplicator().deduplicate(chunks, ids)
+    
+    deduplicator = _deduplicator()
+    kept_ids, aliases = [], []
+    cut = sorted(random.Random(0).sample(range(1, len(chunks)), 3))
+    for start, end in zip([0] + cut, cut + [len(chunks)]):
+        _, piece_ids, _, piece_aliases = deduplicator.deduplicate(chunks[start:end], ids[start:end])
+        kept_ids.extend(piece_ids)
+        aliases.extend(piece_aliases)
+    
+    assert kept_ids == whole[1]
+    assert aliases == whole[3]
@@ -0,0 +1,40 @@
+from langchain_core.documents import Document
+from src.core.config import Config
+from src.retrieval.diversity import diversify, mmr_order
+
+QUERY = [1.0, 0.0, 0.0]
+# Two near-copies of the best match, then a less relevant but different candidate
+VECTORS = [[1.0, 0.1, 0.0], [1.0, 0.11, 0.0], [0.6, -0.8, 0.0]]
+
+
+def test_pure_relevance_keeps_the_similarity_order():
+    assert mmr_order(QUERY, VECTORS, 3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_near_duplicates_give_way_to_a_different_candidate():
+    assert mmr_order(QUERY, VECTORS, 2, lambda_mult=0.5) == [0, 2]
+
+
+def test_given_relevance_replaces_query_similarity():
+    # Fusion scores rank the third candidate first
+    assert mmr_order(QUERY, VECTORS, 1, lambda_mult=1.0, relevance=[0.01, 0.02, 0.03]) == [2]
+
+
+def test_per_group_cap_can_return_fewer_than_k():
+    order = mmr_order(QUERY, VECTORS, 3, lambda_mult=1.0, groups=["a", "a", "a"], max_per_group=2)
+    assert order == [0, 1]
+    assert mmr_order(QUERY, [], 3) == []
+
+
+def test_diversify_caps_chunks_per_source(monkeypatch):
+    monkeypatch.setattr(Config, "MAX_CHUNKS_PER_SOURCE", 1)
+    monkeypatch.setattr(Config, "MMR_LAMBDA", 1.0)
+    candidates = [
+        (Document(page_content=f"chunk {i}", metadata={"source": source}), 0.1 * i, vector)
+        for i, (source, vector) in enumerate(zip(["a.txt", "a.txt", "b.txt"], VECTORS))
+    ]
+    
+    kept = diversify(candidates, QUERY, 3)
+    
+    assert [doc.page_content for doc, _, _ in kept] == ["chunk 0", "chunk 2"]
+    assert diversify([], QUERY, 3) == []
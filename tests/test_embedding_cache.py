@@ -0,0 +1,64 @@
+from langchain_core.embeddings import Embeddings
+from src.embeddings.cache import CachedEmbeddings, cache_embeddings, embed_queries
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic fake backend that records every text it is asked for"""
+    
+    model = "counting"
+    
+    def __init__(self):
+        self.calls = []
+    
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+    
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), 0.0]
+
+
+def test_repeated_texts_reach_the_backend_once(tmp_path):
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, "test", cache_dir=str(tmp_path))
+    
+    first = cached.embed_documents(["a", "bb", "a"])
+    second = cached.embed_documents(["bb", "ccc"])
+    
+    assert backend.calls == ["a", "bb", "ccc"]
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert cached.stats()["memory_hits"] == 1 and cached.stats()["misses"] == 4
+
+
+def test_disk_cache_survives_a_new_wrapper(tmp_path):
+    CachedEmbeddings(CountingEmbeddings(), "test", cache_dir=str(tmp_path)).embed_documents(["persisted"])
+    
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, "test", cache_dir=str(tmp_path))
+    
+    assert cached.embed_documents(["persisted"]) == [[9.0, 1.0]]
+    assert backend.calls == []
+    assert cached.stats()["disk_hits"] == 1
+
+
+def test_queries_documents_and_providers_are_kept_apart(tmp_path):
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, "test", cache_dir=str(tmp_path))
+    other = CachedEmbeddings(CountingEmbeddings(), "other", cache_dir=str(tmp_path))
+    
+    assert cached.embed_documents(["same"]) == [[4.0, 1.0]]
+    assert cached.embed_query("same") == [4.0, 0.0]
+    # Batched queries share entries with embed_query
+    assert embed_queries(cached, ["same"]) == [[4.0, 0.0]]
+    assert backend.calls == ["same", "same"]
+    other.embed_documents(["same"])
+    assert other.embeddings.calls == ["same"]
+
+
+def test_cache_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr("src.core.config.Config.EMBEDDING_CACHE_ENABLED", False)
+    backend = CountingEmbeddings()
+    
+    assert cache_embeddings(backend, "test") is backend
@@ -0,0 +1,114 @@
+import math
+import multiprocessing
+from collections import Counter
+import pytest
+from src.core.config import Config
+from src.retrieval.lexical import LexicalIndex, tokenize
+
+TEXTS = {
+    "a": "Berkshire BRK.B shares rose in Q3-FY24",
+    "b": "The quarterly report covers revenue and margins",
+    "c": "BRK.B and BRK.A are Berkshire share classes",
+    "d": "Margins improved as revenue grew in the quarter",
+    "e": "Part XJ-900-12 ships with the revenue report",
+}
+
+
+def _index(tmp_path, texts=TEXTS):
+    index = LexicalIndex("docs", path=str(tmp_path / "lexical")).create()
+    index.upsert(list(texts), list(texts.values()))
+    return index
+
+
+def _brute_force(texts, query, k):
+    docs = {chunk_id: Counter(tokenize(text)) for chunk_id, text in texts.items()}
+    avg_length = sum(sum(counts.values()) for counts in docs.values()) / len(docs)
+    k1, b = Config.BM25_K1, Config.BM25_B
+    scores = {}
+    for chunk_id, counts in docs.items():
+        length = sum(counts.values())
+        score = 0.0
+        for term in dict.fromkeys(tokenize(query)):
+            df = sum(1 for other in docs.values() if term in other)
+            if not counts[term]:
+                continue
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * counts[term] * (k1 + 1) / (counts[term] + k1 * (1 - b + b * length / avg_length))
+        if score > 0:
+            scores[chunk_id] = score
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def test_tokenize_keeps_compounds_and_parts():
+    assert tokenize("Q3-FY24 BRK.B") == ["q3-fy24", "brk.b", "q3", "fy24", "brk", "b"]
+
+
+@pytest.mark.parametrize("query", ["brk.b", "revenue report", "berkshire margins quarter", "fy24"])
+def test_search_matches_brute_force_bm25(tmp_path, query):
+    found = _index(tmp_path).search(query, k=3)
+    expected = _brute_force(TEXTS, query, 3)
+    
+    assert [chunk_id for chunk_id, _ in found] == [chunk_id for chunk_id, _ in expected]
+    assert [score for _, score in found] == pytest.approx([score for _, score in expected])
+
+
+def test_delete_leaves_no_negative_scores(tmp_path):
+    index = _index(tmp_path)
+    # "revenue" is in 3 of 5 documents; with 4 deleted, counting tombstoned
+    # documents in its df (3 > 1 live) would give it a negative idf
+    index.delete(["a", "b", "c", "d"])
+    
+    found = index.search("revenue", k=5)
+    live = {"e": TEXTS["e"]}
+    
+    assert [chunk_id for chunk_id, _ in found] == [chunk_id for chunk_id, _ in _brute_force(live, "revenue", 5)]
+    assert all(score > 0 for _, score in found)
+
+
+def test_upsert_replaces_and_optimize_keeps_results(tmp_path):
+    index = _index(tmp_path)
+    index.upsert(["a"], ["nothing about shares here"])
+    texts = {**TEXTS, "a": "nothing about shares here"}
+    before = index.search("berkshire shares", k=5)
+    
+    index.optimize()
+    
+    assert [chunk_id for chunk_id, _ in before] == [chunk_id for chunk_id, _ in _brute_force(texts, "berkshire shares", 5)]
+    assert index.search("berkshire shares", k=5) == pytest.approx(before)
+
+
+def test_reader_sees_other_writer(tmp_path):
+    writer = _index(tmp_path)
+    reader = LexicalIndex("docs", path=writer.path)
+    assert [chunk_id for chunk_id, _ in reader.search("xj-900-12", k=1)] == ["e"]
+    
+    writer.delete(["e"])
+    
+    assert reader.search("xj-900-12", k=1) == []
+
+
+def _write_batches(path, worker, batches):
+    index = LexicalIndex("docs", path=path)
+    for batch in range(batches):
+        ids = [f"w{worker}-{batch}-{i}" for i in range(5)]
+        index.upsert(ids, [f"common worker{worker} batch{batch} item{i}" for i in range(5)])
+        if batch % 3 == 2:
+            index.delete(ids[:1])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_writers_in_other_processes_do_not_lose_segments(tmp_path):
+    path = LexicalIndex("docs", path=str(tmp_path / "lexical")).create().path
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_batches, args=(path, worker, 12)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    
+    index = LexicalIndex("docs", path=path)
+    index.refresh()
+    
+    assert all(process.exitcode == 0 for process in workers)
+    assert index.live_docs == 4 * 12 * 5 - 4 * 4
+    assert len(index.search("common", k=1000)) == index.live_docs
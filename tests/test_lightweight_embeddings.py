@@ -0,0 +1,97 @@
+import importlib.util
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import requests
+
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+    
+    def __init__(self, status_code, texts=(), headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._texts = texts
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+    
+    def json(self):
+        return {"data": [{"embedding": [float(len(text))]} for text in self._texts]}
+
+
+def make_embeddings(monkeypatch, post, **kwargs):
+    from src.embeddings import models
+    
+    monkeypatch.setattr(models, "time", SimpleNamespace(sleep=lambda seconds: None))
+    embeddings = models.LightweightEmbeddings(**kwargs)
+    monkeypatch.setattr(embeddings.session, "post", post)
+    return embeddings
+
+
+def test_transient_failures_are_retried(monkeypatch):
+    attempts = []
+    
+    def post(url, json, timeout):
+        attempts.append(json["input"])
+        if len(attempts) == 1:
+            return FakeResponse(503, headers={"Retry-After": "1"})
+        if len(attempts) == 2:
+            raise requests.ConnectionError("reset")
+        return FakeResponse(200, json["input"])
+    
+    embeddings = make_embeddings(monkeypatch, post, max_retries=3)
+    
+    assert embeddings.embed_query("abc") == [3.0]
+    assert len(attempts) == 3
+
+
+def test_retries_give_up_and_client_errors_are_not_retried(monkeypatch):
+    attempts = []
+    
+    def post(url, json, timeout):
+        attempts.append(json["input"])
+        return FakeResponse(503)
+    
+    embeddings = make_embeddings(monkeypatch, post, max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        embeddings.embed_query("abc")
+    assert len(attempts) == 3
+    
+    attempts.clear()
+    embeddings = make_embeddings(monkeypatch, lambda url, json, timeout: attempts.append(1) or FakeResponse(400))
+    with pytest.raises(requests.HTTPError):
+        embeddings.embed_query("abc")
+    assert len(attempts) == 1
+
+
+def test_out_of_order_batches_keep_input_order(monkeypatch):
+    lock = threading.Lock()
+    in_flight = []
+    
+    def post(url, json, timeout):
+        with lock:
+            in_flight.append(json["input"])
+        # Earlier batches answer last
+        time.sleep(0.02 * (10 - len(json["input"][0])))
+        return FakeResponse(200, json["input"])
+    
+    texts = ["x" * n for n in range(1, 10)]
+    embeddings = make_embeddings(monkeypatch, post, batch_size=2, max_concurrency=4)
+    
+    assert embeddings.embed_documents(texts) == [[float(n)] for n in range(1, 10)]
+    assert sorted(len(batch) for batch in in_flight) == [1, 2, 2, 2, 2]
+
+
+def test_batches_respect_the_character_budget(monkeypatch):
+    embeddings = make_embeddings(monkeypatch, None, batch_size=10, max_batch_chars=5)
+    
+    batches = embeddings._make_batches(["aaa", "bb", "c", "dddddd", "e"])
+    
+    assert batches == [(0, ["aaa", "bb"]), (2, ["c"]), (3, ["dddddd"]), (4, ["e"])]
@@ -0,0 +1,164 @@
+import os
+import numpy as np
+import pytest
+from src.core.local_index import LocalClient, LocalCollection
+
+
+def _vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def _fill(collection, count=20, dim=8):
+    vectors = _vectors(count, dim)
+    ids = [f"id{i}" for i in range(count)]
+    collection.upsert(
+        ids=ids,
+        embeddings=vectors.tolist(),
+        metadatas=[{"source": f"doc{i % 3}.txt"} for i in range(count)],
+        documents=[f"text {i}" for i in range(count)],
+    )
+    return ids, vectors
+
+
+def test_query_matches_brute_force_cosine(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    ids, vectors = _fill(collection)
+    query = _vectors(1, seed=1)[0]
+    
+    result = collection.query(query_embeddings=[query.tolist()], n_results=5)
+    
+    similarity = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = [ids[i] for i in np.argsort(-similarity)[:5]]
+    assert result["ids"][0] == expected
+    assert np.allclose(result["distances"][0], 1 - np.sort(similarity)[::-1][:5], atol=1e-5)
+
+
+def test_upsert_replaces_and_delete_hides(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    ids, _ = _fill(collection)
+    
+    collection.upsert(ids=["id0"], embeddings=[[1.0] * 8], metadatas=[{"source": "new.txt"}], documents=["new"])
+    collection.delete(ids=["id1", "id2"])
+    
+    assert collection.count() == len(ids) - 2
+    assert collection.get(ids=["id0"])["documents"] == ["new"]
+    assert collection.get(ids=["id1"])["ids"] == []
+    result = collection.query(query_embeddings=[[1.0] * 8], n_results=len(ids))
+    assert result["ids"][0][0] == "id0"
+    assert not {"id1", "id2"} & set(result["ids"][0])
+
+
+def test_add_keeps_existing_records(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    _fill(collection)
+    
+    collection.add(ids=["id0", "fresh"], embeddings=[[1.0] * 8, [2.0] * 8], documents=["replaced", "fresh"])
+    
+    assert collection.get(ids=["id0", "fresh"])["documents"] == ["text 0", "fresh"]
+    assert collection.count() == 21
+
+
+def test_where_filter(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    _fill(collection)
+    
+    found = collection.get(where={"source": "doc1.txt"})
+    
+    assert found["ids"] == [f"id{i}" for i in range(20) if i % 3 == 1]
+
+
+def test_torn_log_write_is_dropped_on_reopen(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    ids, _ = _fill(collection)
+    collection.close()
+    log_path = os.path.join(str(tmp_path), "docs", "log.jsonl")
+    with open(log_path, "a") as f:
+        f.write('{"op": "upsert", "id": "torn"')
+    
+    reopened = LocalCollection(os.path.join(str(tmp_path), "docs"), "docs")
+    assert reopened.count() == len(ids)
+    reopened.upsert(ids=["after"], embeddings=[[0.5] * 8], documents=["after"])
+    reopened.close()
+    
+    again = LocalCollection(os.path.join(str(tmp_path), "docs"), "docs")
+    assert again.count() == len(ids) + 1
+    assert again.get(ids=["after"])["documents"] == ["after"]
+
+
+def test_writes_are_seen_by_another_handle(tmp_path):
+    writer = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    reader = LocalClient(str(tmp_path)).get_collection("docs")
+    ids, _ = _fill(writer)
+    
+    assert reader.count() == len(ids)
+    writer.delete(ids=["id3"])
+    writer.update(ids=["id4"], embeddings=[[2.0] * 8])
+    
+    assert reader.count() == len(ids) - 1
+    result = reader.query(query_embeddings=[[1.0] * 8], n_results=1)
+    assert result["ids"][0] == ["id4"]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_compact_keeps_live_rows(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    ids, vectors = _fill(collection)
+    collection.delete(ids=ids[:10])
+    
+    collection.compact()
+    
+    assert collection.count() == 10
+    found = collection.get(ids=ids[10:], include=["embeddings"])
+    assert np.allclose(found["embeddings"], vectors[10:])
+
+
+def test_delete_past_the_compaction_threshold(tmp_path):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    ids, vectors = _fill(collection, count=3000)
+    
+    # Leaves more dead rows than live ones, which compacts inside delete
+    collection.delete(ids=ids[:2000])
+    
+    assert collection.count() == 1000
+    assert collection._rows == 1000
+    found = collection.get(ids=ids[2000:2005], include=["embeddings"])
+    assert np.allclose(found["embeddings"], vectors[2000:2005])
+
+
+def test_replaced_vector_survives_a_crash_before_commit(tmp_path, monkeypatch):
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    _, vectors = _fill(collection)
+    
+    def crash(entries):
+        raise RuntimeError("crashed before the log line was written")
+    
+    monkeypatch.setattr(collection, "_append_log", crash)
+    with pytest.raises(RuntimeError):
+        collection.upsert(ids=["id0"], embeddings=[[9.0] * 8], documents=["replaced"])
+    
+    reopened = LocalCollection(os.path.join(str(tmp_path), "docs"), "docs")
+    found = reopened.get(ids=["id0"], include=["embeddings", "documents"])
+    assert found["documents"] == ["text 0"]
+    assert np.allclose(found["embeddings"], vectors[:1])
+
+
+def test_missing_hnswlib_falls_back_for_this_collection_only(tmp_path, monkeypatch):
+    import builtins
+    from src.core.config import Config
+    
+    real_import = builtins.__import__
+    
+    def no_hnswlib(name, *args, **kwargs):
+        if name == "hnswlib":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, "__import__", no_hnswlib)
+    monkeypatch.setattr(Config, "LOCAL_INDEX_HNSW", True)
+    monkeypatch.setattr(Config, "LOCAL_INDEX_HNSW_MIN_ITEMS", 1)
+    collection = LocalClient(str(tmp_path)).get_or_create_collection("docs")
+    _fill(collection)
+    
+    assert len(collection.query(query_embeddings=[[1.0] * 8], n_results=3)["ids"][0]) == 3
+    assert Config.LOCAL_INDEX_HNSW is True
+    assert collection._hnsw_available is False
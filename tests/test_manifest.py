@@ -0,0 +1,97 @@
+import importlib.util
+import os
+import pytest
+from src.ingestion.manifest import Manifest, assign_chunk_ids, hash_file, make_chunk_id
+
+# The loader imports the chunkers, which import every embedding provider
+needs_providers = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+def _write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_chunk_ids_are_deterministic_and_repeats_dropped():
+    from langchain_core.documents import Document
+    
+    chunks = [Document(page_content=text, metadata={"source": "a.txt"}) for text in ("one", "two", "one")]
+    
+    kept, ids, embeddings = assign_chunk_ids(chunks, "character", [[1.0], [2.0], [3.0]])
+    
+    assert [chunk.page_content for chunk in kept] == ["one", "two"]
+    assert ids == [make_chunk_id("a.txt", "character", "one"), make_chunk_id("a.txt", "character", "two")]
+    assert embeddings == [[1.0], [2.0]]
+    assert make_chunk_id("b.txt", "character", "one") != ids[0]
+
+
+def test_diff_reports_added_changed_removed_and_unchanged(tmp_path):
+    manifest = Manifest("docs", path=str(tmp_path / "manifest.json"))
+    same = _write(tmp_path / "same.txt", "same")
+    edited = _write(tmp_path / "edited.txt", "before")
+    touched = _write(tmp_path / "touched.txt", "touched")
+    for path in (same, edited, touched):
+        manifest.record(path, ["id"])
+    manifest.record(str(tmp_path / "gone.txt"), ["id"], {"sha256": "x", "mtime": 0, "size": 0})
+    added = _write(tmp_path / "added.txt", "new")
+    _write(edited, "after")
+    # Same content with a new mtime is re-hashed and found unchanged
+    os.utime(touched, (1, 1))
+    
+    changes = manifest.diff([same, edited, touched, added])
+    
+    assert changes == {
+        "added": [added],
+        "changed": [edited],
+        "removed": [str(tmp_path / "gone.txt")],
+        "unchanged": [same, touched],
+    }
+
+
+@needs_providers
+def test_edit_during_ingestion_is_seen_by_the_next_diff(tmp_path):
+    from src.ingestion.loader import load_files
+    
+    manifest = Manifest("docs", path=str(tmp_path / "manifest.json"))
+    path = _write(tmp_path / "doc.txt", "version one")
+    snapshots = {}
+    load_files([path], snapshots)
+    
+    # Edited after it was read, before the manifest is written
+    _write(path, "version two, longer")
+    manifest.record(path, ["id"], snapshots[path])
+    
+    assert manifest.diff([path])["changed"] == [path]
+    assert manifest.files[path]["sha256"] != hash_file(path)
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.config.Config.MANIFEST_DIRECTORY", str(tmp_path))
+    path = _write(tmp_path / "doc.txt", "text")
+    manifest = Manifest.load("docs")
+    manifest.method = "character"
+    manifest.record(path, ["a", "b"])
+    manifest.save()
+    
+    loaded = Manifest.load("docs")
+    
+    assert loaded.method == "character"
+    assert loaded.chunk_ids(path) == ["a", "b"]
+    assert loaded.all_chunk_ids() == {"a", "b"}
+
+
+@needs_providers
+def test_read_file_translates_newlines_and_hashes_raw_bytes(tmp_path):
+    from src.ingestion.loader import read_file
+    
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"line one\r\nline two\rend")
+    
+    text, snapshot = read_file(str(path))
+    
+    assert text == "line one\nline two\nend"
+    assert snapshot["sha256"] == hash_file(str(path))
+    assert snapshot["size"] == len(b"line one\r\nline two\rend")
@@ -0,0 +1,77 @@
+import importlib.util
+from types import SimpleNamespace
+import pytest
+from src.retrieval import cache as cache_module
+from src.retrieval.cache import QueryCache
+
+# The search module imports every embedding provider
+needs_providers = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+VERSION = ("docs__v1", 1)
+OPTIONS = ("vector", 4)
+
+
+def test_exact_hits_ignore_case_and_whitespace():
+    cache = QueryCache(max_entries=8, ttl_seconds=60, similarity=0.9)
+    cache.put("What is  RAG?", VERSION, OPTIONS, ["result"])
+    
+    assert cache.get("what is rag?", VERSION, OPTIONS) == ["result"]
+    assert cache.get("what is rag?", ("docs__v2", 1), OPTIONS) is None
+    assert cache.get("what is rag?", VERSION, ("hybrid", 4)) is None
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similar_queries_share_results():
+    cache = QueryCache(max_entries=8, ttl_seconds=60, similarity=0.9)
+    cache.put("what is rag", VERSION, OPTIONS, ["result"], embedding=[1.0, 0.0])
+    
+    assert cache.get_similar([0.99, 0.05], VERSION, OPTIONS) == ["result"]
+    assert cache.get_similar([0.0, 1.0], VERSION, OPTIONS) is None
+    assert cache.get_similar([0.99, 0.05], ("docs__v2", 1), OPTIONS) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = QueryCache(max_entries=2, ttl_seconds=10, similarity=0.9)
+    
+    for query in ("a", "b", "c"):
+        cache.put(query, VERSION, OPTIONS, [query], embedding=[1.0, 0.0])
+    assert cache.get("a", VERSION, OPTIONS) is None
+    assert cache.get("c", VERSION, OPTIONS) == ["c"]
+    
+    now[0] = 11.0
+    assert cache.get("c", VERSION, OPTIONS) is None
+    assert cache.get_similar([1.0, 0.0], VERSION, OPTIONS) is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 2
+
+
+@needs_providers
+def test_search_results_are_cached_until_the_collection_changes(local_pipeline, monkeypatch):
+    import src.retrieval.search as search
+    from src.core.config import Config
+    from src.ingestion.pipeline import run_ingestion
+    from src.retrieval.vectorstore import get_vectorstore
+    
+    monkeypatch.setattr(Config, "QUERY_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "QUERY_CACHE_SEMANTIC", False)
+    real_retrieve = search._retrieve
+    retrievals = []
+    monkeypatch.setattr(search, "_retrieve", lambda *args: retrievals.append(args[1]) or real_retrieve(*args))
+    
+    (local_pipeline / "fruit.txt").write_text("Apples and pears grow in the orchard.")
+    run_ingestion(str(local_pipeline), "docs", "character", incremental=True, streaming=False)
+    first = search.search_documents(get_vectorstore("docs"), "apples", k=1, mode="vector", diverse=False)
+    again = search.search_documents(get_vectorstore("docs"), "  APPLES ", k=1, mode="vector", diverse=False)
+    assert len(retrievals) == 1
+    assert [doc.page_content for doc, _ in again] == [doc.page_content for doc, _ in first]
+    
+    # An incremental update rewrites the manifest, so the cached results are stale
+    (local_pipeline / "fruit.txt").write_text("Apples are now sold out at the market.")
+    run_ingestion(str(local_pipeline), "docs", "character", incremental=True, streaming=False)
+    updated = search.search_documents(get_vectorstore("docs"), "apples", k=1, mode="vector", diverse=False)
+    assert len(retrievals) == 2
+    assert "sold out" in updated[0][0].page_content
@@ -0,0 +1,55 @@
+import importlib.util
+import pytest
+import tiktoken
+
+# src.chunking imports every embedding provider
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+def test_offline_tokenizer_falls_back_to_characters(monkeypatch):
+    from src.chunking import recursive
+    from src.core.registry import invalidate
+    
+    attempts = []
+    
+    def offline(*args, **kwargs):
+        attempts.append(args)
+        raise ConnectionError("no network")
+    
+    monkeypatch.setattr(tiktoken, "get_encoding", offline)
+    monkeypatch.setattr(tiktoken, "encoding_for_model", offline)
+    invalidate("tokenizer")
+    
+    encoding = recursive.get_token_encoding()
+    
+    assert isinstance(encoding, recursive.CharacterEncoding)
+    assert recursive.get_token_encoding() is encoding
+    assert len(attempts) == 1
+    invalidate("tokenizer")
+    assert len(encoding.encode_ordinary("x" * 10)) == 3
+
+
+def test_long_pieces_still_overlap():
+    from src.chunking.recursive import CharacterEncoding, RecursiveTokenSplitter
+    
+    # Every sentence is longer than the overlap, so only a token tail can carry over
+    text = " ".join(f"Sentence {i} " + "word " * 30 + "end." for i in range(20))
+    splitter = RecursiveTokenSplitter(chunk_size=60, chunk_overlap=10, encoding=CharacterEncoding())
+    
+    chunks = splitter.split_text_with_offsets(text)
+    
+    assert len(chunks) > 5
+    for (chunk, start, end), (_, next_start, _) in zip(chunks, chunks[1:]):
+        assert text[start:end] == chunk
+        assert next_start < end
+    for chunk, _, _ in chunks:
+        assert len(CharacterEncoding().encode_ordinary(chunk)) <= 60
+
+
+def test_overlap_must_fit_the_chunk():
+    from src.chunking.recursive import CharacterEncoding, RecursiveTokenSplitter
+    
+    with pytest.raises(ValueError):
+        RecursiveTokenSplitter(chunk_size=10, chunk_overlap=10, encoding=CharacterEncoding())
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import pytest
+
+# The search module imports every embedding provider
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+def _doc(chunk_id):
+    from langchain_core.documents import Document
+    
+    return Document(page_content=chunk_id, metadata={}, id=chunk_id)
+
+
+def test_fusion_prefers_chunks_both_rankings_agree_on():
+    from src.retrieval.search import _fuse
+    
+    vector_results = [(_doc("a"), 0.1, None), (_doc("b"), 0.2, None)]
+    lexical_chunks = {"a": (_doc("a"), [1.0, 0.0]), "d": (_doc("d"), [0.0, 1.0])}
+    
+    # "gone" is not in the collection (any more) and must not take a rank
+    found, scores = _fuse(vector_results, ["gone", "d", "a"], lexical_chunks, [1.0, 0.0], k=3)
+    
+    # a: ranks 1 and 2; d (BM25 only): rank 1; b (vector only): rank 2
+    assert [doc.id for doc, _, _ in found] == ["a", "d", "b"]
+    assert scores == pytest.approx([1 / 61 + 1 / 62, 1 / 61, 1 / 62])
+    # A chunk only BM25 found is scored with the real cosine distance
+    assert found[1][1] == pytest.approx(1.0)
+
+
+def test_hybrid_search_finds_exact_part_numbers(local_pipeline, monkeypatch):
+    from src.core.config import Config
+    from src.ingestion.pipeline import run_ingestion
+    from src.retrieval.search import search_documents
+    from src.retrieval.vectorstore import get_vectorstore
+    
+    monkeypatch.setattr(Config, "QUERY_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "LEXICAL_INDEX_ENABLED", True)
+    for i in range(8):
+        (local_pipeline / f"parts{i}.txt").write_text(f"Replacement parts catalogue page {i} lists parts and prices.")
+    (local_pipeline / "order.txt").write_text("Order XJ-900-12 before Friday.")
+    run_ingestion(str(local_pipeline), "docs", "character", incremental=False, streaming=False)
+    vectorstore = get_vectorstore("docs")
+    
+    def sources(mode):
+        found = search_documents(vectorstore, "parts xj-900-12", k=5, mode=mode, diverse=False)
+        return [os.path.basename(doc.metadata["source"]) for doc, _ in found]
+    
+    # Every catalogue page is semantically closer than the order; BM25 ranks the order first
+    assert "order.txt" not in sources("vector")
+    assert "order.txt" in sources("hybrid")
@@ -0,0 +1,65 @@
+import importlib.util
+import pytest
+
+# The chunkers import every embedding provider
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+TOPICS = [
+    "The orchard grows apples and pears. Apples ripen in autumn. Pears keep for weeks.",
+    "The harbour handles container ships. Cranes unload the ships at night.",
+    "Tax returns are due in April. Late returns pay a penalty. Receipts must be kept.",
+    "The choir rehearses on Thursdays. New singers audition in spring.",
+]
+TEXT = " ".join(TOPICS * 3)
+
+
+@pytest.mark.parametrize("options", [
+    {"breakpoint_threshold_type": "percentile"},
+    {"breakpoint_threshold_type": "standard_deviation", "breakpoint_threshold_amount": 1},
+    {"breakpoint_threshold_type": "interquartile"},
+    {"breakpoint_threshold_type": "gradient"},
+    {"number_of_chunks": 4},
+    {"min_chunk_size": 120},
+])
+def test_pooled_chunks_match_semantic_chunker(hash_embeddings, options):
+    from langchain_experimental.text_splitter import SemanticChunker
+    from src.chunking.semantic import PooledSemanticChunker
+    
+    expected = SemanticChunker(hash_embeddings, **options).split_text(TEXT)
+    chunks, vectors = PooledSemanticChunker(hash_embeddings, **options).split_text_with_vectors(TEXT)
+    
+    assert chunks == expected
+    assert len(vectors) == len(chunks)
+
+
+@pytest.mark.parametrize("text", ["Only one sentence here.", "Two sentences. Gradient needs three."])
+def test_short_texts_are_embedded_per_sentence(hash_embeddings, text):
+    from langchain_experimental.text_splitter import SemanticChunker
+    from src.chunking.semantic import PooledSemanticChunker
+    
+    chunker = PooledSemanticChunker(hash_embeddings, breakpoint_threshold_type="gradient")
+    chunks, vectors = chunker.split_text_with_vectors(text)
+    
+    assert chunks == SemanticChunker(hash_embeddings, breakpoint_threshold_type="gradient").split_text(text)
+    assert vectors == hash_embeddings.embed_documents(chunks)
+
+
+def test_streaming_chunks_are_exact_source_slices(hash_embeddings, tmp_path):
+    from src.chunking.semantic import StreamingSemanticChunker
+    
+    text = "\n\n".join("  ".join(topic.split(" ")) for topic in TOPICS * 3) + "\n"
+    chunker = StreamingSemanticChunker(hash_embeddings, window_size=4)
+    
+    chunks = list(chunker.split_text(text))
+    path = tmp_path / "doc.txt"
+    path.write_text(text)
+    
+    assert len(chunks) > 1
+    assert " ".join(chunk["text"] for chunk in chunks).split() == text.split()
+    for chunk in chunks:
+        assert text[chunk["start"]:chunk["end"]] == chunk["text"]
+    # Reading in blocks that cut sentences and separators gives the same chunks
+    from_file = list(chunker.split_file(str(path), block_size=7))
+    assert [(c["text"], c["start"], c["end"]) for c in from_file] == [(c["text"], c["start"], c["end"]) for c in chunks]
@@ -0,0 +1,121 @@
+import time
+import numpy as np
+from src.core.config import Config
+from src.core.local_index import LocalClient
+from src.core.sharding import ShardedClient, ShardedCollection, shard_name, shard_of
+
+
+def _records(count=60, dim=8):
+    vectors = np.random.default_rng(0).normal(size=(count, dim)).astype(np.float32)
+    ids = [f"id{i}" for i in range(count)]
+    metadatas = [{"source": f"doc{i % 4}.txt"} for i in range(count)]
+    return ids, vectors.tolist(), metadatas, [f"text {i}" for i in range(count)]
+
+
+def _collections(tmp_path):
+    ids, vectors, metadatas, documents = _records()
+    plain = LocalClient(str(tmp_path / "plain")).get_or_create_collection("docs")
+    plain.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+    client = ShardedClient(LocalClient(str(tmp_path / "sharded")), shard_count=3)
+    sharded = client.get_or_create_collection("docs")
+    sharded.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+    return client, plain, sharded
+
+
+def test_shard_of_is_stable():
+    assert shard_of("chunk-1", 4) == shard_of("chunk-1", 4)
+    assert {shard_of(f"id{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_writes_are_spread_over_shards(tmp_path):
+    _, plain, sharded = _collections(tmp_path)
+    
+    assert isinstance(sharded, ShardedCollection)
+    assert sharded.count() == plain.count()
+    assert all(shard.count() < plain.count() for shard in sharded.shards)
+    for shard_index, shard in enumerate(sharded.shards):
+        assert all(shard_of(chunk_id, 3) == shard_index for chunk_id in shard.get()["ids"])
+
+
+def test_query_merge_equals_unsharded(tmp_path):
+    _, plain, sharded = _collections(tmp_path)
+    queries = np.random.default_rng(1).normal(size=(3, 8)).tolist()
+    
+    expected = plain.query(query_embeddings=queries, n_results=7, where={"source": "doc1.txt"})
+    merged = sharded.query(query_embeddings=queries, n_results=7, where={"source": "doc1.txt"})
+    
+    assert merged["ids"] == expected["ids"]
+    assert np.allclose(merged["distances"], expected["distances"], atol=1e-5)
+    assert merged["documents"] == expected["documents"]
+
+
+def test_get_pages_cover_every_row_once(tmp_path):
+    _, plain, sharded = _collections(tmp_path)
+    everything = sharded.get()["ids"]
+    
+    pages = []
+    for offset in range(0, len(everything), 7):
+        pages.extend(sharded.get(limit=7, offset=offset)["ids"])
+    
+    assert pages == everything
+    assert sorted(everything) == sorted(plain.get()["ids"])
+    filtered = sharded.get(where={"source": "doc2.txt"})["ids"]
+    filtered_pages = []
+    for offset in range(0, len(filtered) + 4, 4):
+        filtered_pages.extend(sharded.get(where={"source": "doc2.txt"}, limit=4, offset=offset)["ids"])
+    assert filtered_pages == filtered
+
+
+def test_delete_and_get_by_ids_are_routed(tmp_path):
+    _, _, sharded = _collections(tmp_path)
+    
+    sharded.delete(ids=["id1", "id2", "id3"])
+    
+    assert sharded.count() == 57
+    assert sorted(sharded.get(ids=["id0", "id1", "id4"])["ids"]) == ["id0", "id4"]
+
+
+def test_list_collections_uses_shard_metadata(tmp_path):
+    client, _, _ = _collections(tmp_path)
+    # A plain collection that only looks like a shard by name
+    client.client.get_or_create_collection(shard_name("notes", 0))
+    
+    names = [collection.name for collection in client.list_collections()]
+    
+    assert names == ["docs", "notes-s0"]
+    assert not isinstance(client.get_collection("notes-s0"), ShardedCollection)
+
+
+class _Slow:
+    """A shard whose queries take `delay` seconds"""
+    
+    def __init__(self, shard, delay):
+        self.shard, self.delay = shard, delay
+    
+    def query(self, **kwargs):
+        time.sleep(self.delay)
+        return self.shard.query(**kwargs)
+
+
+def test_slow_shard_is_left_out_once_another_answered(tmp_path, monkeypatch):
+    _, _, sharded = _collections(tmp_path)
+    monkeypatch.setattr(Config, "SHARD_TIMEOUT_SECONDS", 0.05)
+    query = np.random.default_rng(1).normal(size=(1, 8)).tolist()
+    sharded.shards[2] = _Slow(sharded.shards[2], 1.0)
+    
+    merged = sharded.query(query_embeddings=query, n_results=60)
+    
+    assert merged["ids"][0]
+    assert not any(shard_of(chunk_id, 3) == 2 for chunk_id in merged["ids"][0])
+
+
+def test_cold_start_waits_for_the_first_shard(tmp_path, monkeypatch):
+    _, _, sharded = _collections(tmp_path)
+    monkeypatch.setattr(Config, "SHARD_TIMEOUT_SECONDS", 0.05)
+    query = np.random.default_rng(1).normal(size=(1, 8)).tolist()
+    sharded.shards = [_Slow(sharded.shards[0], 0.2), _Slow(sharded.shards[1], 1.0), _Slow(sharded.shards[2], 1.0)]
+    
+    merged = sharded.query(query_embeddings=query, n_results=60)
+    
+    assert merged["ids"][0]
+    assert all(shard_of(chunk_id, 3) == 0 for chunk_id in merged["ids"][0])
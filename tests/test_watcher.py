@@ -0,0 +1,59 @@
+import importlib.util
+import pytest
+
+# The pipeline imports every embedding provider
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("langchain_google_genai") is None, reason="embedding providers are not installed"
+)
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _indexed_text(collection_name):
+    from src.retrieval.vectorstore import get_vectorstore
+    
+    return " ".join(get_vectorstore(collection_name).get(include=["documents"])["documents"])
+
+
+def test_edit_during_sync_is_picked_up_next_time(local_pipeline, monkeypatch):
+    import src.ingestion.pipeline as pipeline
+    from src.ingestion.watcher import sync_paths
+    
+    path = _write(local_pipeline / "notes.txt", "The first draft talks about apples.")
+    assert sync_paths("docs", "character", [path]) == [path]
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("watch mode must not read files lazily through the docstore")
+    
+    real_upsert = pipeline.upsert_chunks
+    
+    def upsert_then_edit(*args, **kwargs):
+        # The file changes after it was read but before the manifest records it
+        _write(local_pipeline / "notes.txt", "The final version talks about oranges.")
+        return real_upsert(*args, **kwargs)
+    
+    monkeypatch.setattr(pipeline, "load_into_docstore", fail)
+    monkeypatch.setattr(pipeline, "upsert_chunks", upsert_then_edit)
+    _write(local_pipeline / "notes.txt", "The second draft talks about pears.")
+    assert sync_paths("docs", "character", [path]) == [path]
+    assert "pears" in _indexed_text("docs")
+    
+    monkeypatch.setattr(pipeline, "upsert_chunks", real_upsert)
+    assert sync_paths("docs", "character", [path]) == [path]
+    assert "oranges" in _indexed_text("docs")
+    assert "pears" not in _indexed_text("docs")
+    assert sync_paths("docs", "character", [path]) == []
+
+
+def test_deleted_file_is_removed(local_pipeline):
+    from src.ingestion.watcher import sync_paths
+    
+    path = _write(local_pipeline / "gone.txt", "Soon to be deleted.")
+    sync_paths("docs", "character", [path])
+    (local_pipeline / "gone.txt").unlink()
+    
+    assert sync_paths("docs", "character", [path]) == [path]
+    assert _indexed_text("docs") == ""